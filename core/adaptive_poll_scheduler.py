@@ -0,0 +1,90 @@
+# core/adaptive_poll_scheduler.py
+
+
+class AdaptivePollScheduler:
+    """
+    Adaptív lekérdezési ütemező a generálás figyelőkhöz.
+
+    A korábbi promptok generálási idejéből megbecsüli a várható befejezési ablakot (p10-p90),
+    és ehhez igazítja a figyelő ciklus várakozását: a várható ablak előtt ritkán, körülötte
+    sűrűn kérdez le. Amíg nincs elég minta, a hívó által megadott alapértelmezett intervallumot
+    adja vissza, vagyis a viselkedés megegyezik a korábbi fix lekérdezéssel.
+
+    Az időket a generálás gomb megnyomásától (a figyelés kezdetétől) mérjük, másodpercben.
+    A mintákat a közös TimingModel tár 'stage' szakaszából olvassa és oda rögzíti; a rögzítés
+    a timing_model_mode beállítástól független (az ütemező kapcsolója az adaptive_polling_enabled).
+    timing_model nélkül a minták csak a futás idejére, memóriában élnek.
+    """
+
+    def __init__(self, timing_model=None, stage="generation", min_interval_s=0.15, max_interval_s=1.5,
+                 min_samples=3, recent_samples=50, max_history=200, window_margin_s=1.0):
+        self.timing_model = timing_model
+        self.stage = stage
+        self.min_interval_s = float(min_interval_s)
+        self.max_interval_s = float(max_interval_s)
+        self.min_samples = int(min_samples)
+        self.recent_samples = int(recent_samples)
+        self.max_history = int(max_history)
+        self.window_margin_s = float(window_margin_s)
+        self.durations = self.timing_model.samples(self.stage) if self.timing_model is not None else []
+
+    def record(self, duration_s, persist=True):
+        """Egy befejezett generálás ideje (gombnyomástól az utolsó mozgásig)."""
+        if duration_s is None or duration_s <= 0:
+            return
+        if self.timing_model is not None:
+            self.timing_model.record(self.stage, duration_s, persist=persist, force=True)
+            return
+        self.durations.append(round(float(duration_s), 3))
+        self.durations = self.durations[-self.max_history:]
+
+    def has_model(self):
+        return len(self.durations) >= self.min_samples
+
+    def percentile(self, q):
+        samples = sorted(self.durations[-self.recent_samples:])
+        if not samples:
+            return None
+        position = (len(samples) - 1) * min(max(q, 0.0), 1.0)
+        lower = int(position)
+        upper = min(lower + 1, len(samples) - 1)
+        fraction = position - lower
+        return samples[lower] + (samples[upper] - samples[lower]) * fraction
+
+    def expected_window(self):
+        """(korai, késői) befejezési idő a tanult eloszlás alapján, vagy None."""
+        if not self.has_model():
+            return None
+        return self.percentile(0.10), self.percentile(0.90)
+
+    def initial_wait_s(self, default_s):
+        """A gombnyomás utáni kezdeti várakozás: tanult modellel rövidebb, hogy a figyelés ne késsen le."""
+        window = self.expected_window()
+        if window is None:
+            return default_s
+        return min(default_s, max(0.5, window[0] * 0.25))
+
+    def next_interval_s(self, elapsed_s, default_interval_s, stable_required_s=0.0):
+        """
+        A következő lekérdezésig hátralévő idő.
+        - a várható ablak előtt: ritka (max_interval_s, de a korai határt nem lépi át)
+        - az ablakban és a stabilitás megerősítéséig: sűrű (min_interval_s)
+        - a késői határ után: az alapértelmezett intervallum
+        """
+        window = self.expected_window()
+        if window is None:
+            return default_interval_s
+        early, late = window
+        dense_start = early - self.window_margin_s
+        dense_end = late + stable_required_s + self.window_margin_s
+        if elapsed_s < dense_start:
+            return max(self.min_interval_s, min(self.max_interval_s, dense_start - elapsed_s))
+        if elapsed_s <= dense_end:
+            return self.min_interval_s
+        return default_interval_s
+
+    def describe(self):
+        window = self.expected_window()
+        if window is None:
+            return f"nincs elég minta ({len(self.durations)}/{self.min_samples}), fix lekérdezés"
+        return f"várható befejezés {window[0]:.1f}-{window[1]:.1f}s ({len(self.durations)} minta alapján)"
@@ -0,0 +1,109 @@
+# core/dedup_index.py
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from utils.frame_hash import block_difference_hash, hamming_distance
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+def prompt_key(prompt_text):
+    """A prompt szövegének azonosítója (a szélső szóközök nem számítanak)."""
+    return hashlib.sha1((prompt_text or "").strip().encode("utf-8")).hexdigest()
+
+
+def image_perceptual_hash(path, hash_size=8):
+    """64 bites (hash_size=8) dHash a kép tartalmából hex szövegként, vagy None, ha a kép nem olvasható."""
+    if Image is None:
+        return None
+    try:
+        with Image.open(path) as image:
+            gray = np.asarray(image.convert("L").resize((hash_size * 8, hash_size * 8)), dtype=np.float32)
+    except Exception as e:
+        print(f"DedupIndex: Perceptuális hash hiba ({path}): {e}")
+        return None
+    return format(block_difference_hash(gray, hash_size=hash_size), "x")
+
+
+class DedupIndex:
+    """
+    Tartós (SQLite) index a letöltött képekről: tartalom hash (SHA-256), perceptuális hash,
+    fájl útvonal és prompt. Az utófeldolgozás ebből dönti el, hogy egy új fájl pontos másolat
+    (eldobható) vagy közeli másolat (jelölendő), a worker pedig ebből tudja, hogy egy promptnak
+    már van-e kimenete. A már nem létező fájlokra mutató sorok nem számítanak találatnak.
+    """
+
+    def __init__(self, db_path, near_distance=6):
+        self.db_path = db_path
+        self.near_distance = int(near_distance)
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS images ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT, sha256 TEXT NOT NULL, phash TEXT, path TEXT NOT NULL,"
+            " prompt_no INTEGER, prompt_key TEXT, prompt TEXT, created REAL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS idx_images_sha256 ON images (sha256)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS idx_images_prompt_key ON images (prompt_key)")
+        self._connection.commit()
+        # A közeli másolat kereséshez a perceptuális hash-ek memóriában is megvannak (néhány ezer int)
+        self._phashes = [(int(phash, 16), path) for phash, path in
+                         self._connection.execute("SELECT phash, path FROM images WHERE phash IS NOT NULL")]
+
+    def _first_existing(self, rows):
+        for (path,) in rows:
+            if os.path.exists(path):
+                return path
+        return None
+
+    def find_exact(self, sha256, exclude_path=None):
+        """Egy létező, azonos tartalmú fájl útvonala, vagy None."""
+        with self._lock:
+            rows = self._connection.execute("SELECT path FROM images WHERE sha256 = ? ORDER BY id", (sha256,)).fetchall()
+        return self._first_existing(row for row in rows if row[0] != exclude_path)
+
+    def find_near(self, phash, max_distance=None, exclude_path=None):
+        """Létező, közeli másolatok [(útvonal, Hamming-távolság), ...] távolság szerint."""
+        if phash is None:
+            return []
+        max_distance = self.near_distance if max_distance is None else max_distance
+        value = int(phash, 16)
+        with self._lock:
+            candidates = [(hamming_distance(value, other), path) for other, path in self._phashes if path != exclude_path]
+        return [(path, distance) for distance, path in sorted(candidates)
+                if distance <= max_distance and os.path.exists(path)]
+
+    def output_for_prompt(self, prompt_text):
+        """A prompthoz már letöltött, létező kép útvonala, vagy None."""
+        with self._lock:
+            rows = self._connection.execute("SELECT path FROM images WHERE prompt_key = ? ORDER BY id DESC",
+                                            (prompt_key(prompt_text),)).fetchall()
+        return self._first_existing(rows)
+
+    def add(self, sha256, path, phash=None, prompt_no=None, prompt_text=None):
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO images (sha256, phash, path, prompt_no, prompt_key, prompt, created) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (sha256, phash, path, prompt_no, prompt_key(prompt_text) if prompt_text is not None else None,
+                 prompt_text, time.time())
+            )
+            self._connection.commit()
+            if phash is not None:
+                self._phashes.append((int(phash, 16), path))
+
+    def count(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM images").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
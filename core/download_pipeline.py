@@ -0,0 +1,179 @@
+# core/download_pipeline.py
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .dedup_index import image_perceptual_hash
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+    print("FIGYELEM: A 'Pillow' könyvtár nincs telepítve. A letöltött képekhez nem készül bélyegkép.")
+
+
+def slugify(text, max_length=40):
+    """Fájlnévbe illeszthető, ékezet nélküli, kisbetűs rövidítés a prompt szövegéből."""
+    text = (text or "").lower().translate(str.maketrans("áéíóöőúüű", "aeiooouuu"))
+    slug = re.sub(r"[^a-z0-9]+", "-", text).strip("-")
+    return slug[:max_length].rstrip("-") or "prompt"
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DownloadPipeline:
+    """
+    A letöltött képek utófeldolgozása háttér szálkészleten, hogy az automatizálási ciklust ne lassítsa.
+
+    Minden megérkezett fájlra (submit): átnevezés prompt sorszám + rövidítés alapján, SHA-256
+    tartalom hash, katalógus bejegyzés (JSON sor a prompt szövegével és az időzítésekkel), és
+    opcionálisan bélyegkép a 'thumbnails' almappába. A katalógus írása zárral védett.
+    Ha van DedupIndex, a pontos másolatok törlődnek (a katalógus a meglévő fájlra mutat),
+    a közeli másolatok pedig jelölést kapnak a katalógus bejegyzésben.
+    """
+
+    def __init__(self, catalog_path, max_workers=2, rename_enabled=True, thumbnails_enabled=False,
+                 thumbnail_size=256, dedup_index=None):
+        self.catalog_path = catalog_path
+        self.dedup_index = dedup_index
+        self.rename_enabled = bool(rename_enabled)
+        self.thumbnails_enabled = bool(thumbnails_enabled) and Image is not None
+        self.thumbnail_size = int(thumbnail_size)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix="download_pipeline")
+        self._catalog_lock = threading.Lock()
+        self._rename_lock = threading.Lock()
+        # A pontos másolat ellenőrzés, az átnevezés és az indexbe vétel együtt atomi (több worker esetén is)
+        self._dedup_lock = threading.Lock()
+        self._futures = []
+        self.processed = 0
+        self.failed = 0
+        self.duplicates_dropped = 0
+        self.near_duplicates = 0
+        self.total_processing_s = 0.0
+
+    def submit(self, file_path, prompt_no, prompt_text, image_index=None, timings=None):
+        """Egy megérkezett fájl sorba állítása; a Future eredménye a katalógus bejegyzés (vagy None hiba esetén)."""
+        future = self._executor.submit(self._process, file_path, prompt_no, prompt_text, image_index, dict(timings or {}))
+        self._futures.append(future)
+        return future
+
+    def _rename(self, file_path, prompt_no, prompt_text):
+        """Átnevezés '<5 jegyű prompt sorszám>_<rövidítés><kiterjesztés>' alakra; ütközéskor _2, _3, ... utótag."""
+        directory, file_name = os.path.split(file_path)
+        extension = os.path.splitext(file_name)[1].lower() or ".png"
+        base_name = f"{int(prompt_no):05d}_{slugify(prompt_text)}"
+        with self._rename_lock:
+            target_path = os.path.join(directory, base_name + extension)
+            suffix = 2
+            while os.path.exists(target_path) and os.path.abspath(target_path) != os.path.abspath(file_path):
+                target_path = os.path.join(directory, f"{base_name}_{suffix}{extension}")
+                suffix += 1
+            if os.path.abspath(target_path) != os.path.abspath(file_path):
+                os.replace(file_path, target_path)
+        return target_path
+
+    def _make_thumbnail(self, file_path):
+        thumbnail_dir = os.path.join(os.path.dirname(file_path), "thumbnails")
+        os.makedirs(thumbnail_dir, exist_ok=True)
+        thumbnail_path = os.path.join(thumbnail_dir, os.path.splitext(os.path.basename(file_path))[0] + ".jpg")
+        with Image.open(file_path) as image:
+            image.thumbnail((self.thumbnail_size, self.thumbnail_size))
+            image.convert("RGB").save(thumbnail_path, "JPEG", quality=85)
+        return thumbnail_path
+
+    def _append_catalog(self, entry):
+        if not self.catalog_path:
+            return
+        with self._catalog_lock:
+            os.makedirs(os.path.dirname(self.catalog_path), exist_ok=True)
+            with open(self.catalog_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def _process(self, file_path, prompt_no, prompt_text, image_index, timings):
+        start_time = time.time()
+        try:
+            entry = {
+                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "prompt_no": prompt_no,
+                "image_index": image_index,
+                "prompt": prompt_text,
+                "original_name": os.path.basename(file_path),
+                "size_bytes": os.path.getsize(file_path),
+                "sha256": file_sha256(file_path),
+                "timings": timings,
+            }
+            if self.dedup_index is not None:
+                # A perceptuális hash csak a tartalomtól függ, ezért a zár előtt (párhuzamosan) készül
+                phash = image_perceptual_hash(file_path)
+                with self._dedup_lock:
+                    duplicate_path = self.dedup_index.find_exact(entry["sha256"], exclude_path=file_path)
+                    if duplicate_path:
+                        return self._drop_duplicate(file_path, duplicate_path, entry, start_time)
+                    final_path = self._rename(file_path, prompt_no, prompt_text) if self.rename_enabled else file_path
+                    entry["file"] = final_path
+                    self._index_file(final_path, phash, entry)
+            else:
+                final_path = self._rename(file_path, prompt_no, prompt_text) if self.rename_enabled else file_path
+                entry["file"] = final_path
+            if self.thumbnails_enabled:
+                try:
+                    entry["thumbnail"] = self._make_thumbnail(final_path)
+                except Exception as e_thumb:
+                    print(f"DownloadPipeline: Bélyegkép hiba ({final_path}): {e_thumb}")
+            entry["processing_ms"] = round((time.time() - start_time) * 1000, 1)
+            self._append_catalog(entry)
+            with self._catalog_lock:
+                self.processed += 1
+                self.total_processing_s += time.time() - start_time
+            print(f"DownloadPipeline: #{prompt_no} feldolgozva: {os.path.basename(final_path)} ({entry['processing_ms']:.0f} ms)")
+            return entry
+        except Exception as e:
+            with self._catalog_lock:
+                self.failed += 1
+            print(f"DownloadPipeline: Hiba a letöltött fájl feldolgozásakor ({file_path}): {e}")
+            return None
+
+    def _drop_duplicate(self, file_path, duplicate_path, entry, start_time):
+        """Pontos másolat: az új fájl törlődik, a prompt a meglévő fájlhoz kerül az indexbe."""
+        os.remove(file_path)
+        self.dedup_index.add(entry["sha256"], duplicate_path, prompt_no=entry["prompt_no"], prompt_text=entry["prompt"])
+        entry.update({"file": duplicate_path, "duplicate_of": duplicate_path, "status": "duplicate_dropped",
+                      "processing_ms": round((time.time() - start_time) * 1000, 1)})
+        self._append_catalog(entry)
+        with self._catalog_lock:
+            self.duplicates_dropped += 1
+        print(f"DownloadPipeline: #{entry['prompt_no']} pontos másolat, törölve: {entry['original_name']} (meglévő: {os.path.basename(duplicate_path)})")
+        return entry
+
+    def _index_file(self, final_path, phash, entry):
+        """Közeli másolatok jelölése és felvétel a dedup indexbe (a _dedup_lock alatt hívandó)."""
+        near_duplicates = self.dedup_index.find_near(phash, exclude_path=final_path)
+        entry["phash"] = phash
+        if near_duplicates:
+            entry["near_duplicates"] = [{"file": path, "distance": distance} for path, distance in near_duplicates[:5]]
+            with self._catalog_lock:
+                self.near_duplicates += 1
+            print(f"DownloadPipeline: #{entry['prompt_no']} közeli másolat: {os.path.basename(near_duplicates[0][0])} (távolság: {near_duplicates[0][1]})")
+        self.dedup_index.add(entry["sha256"], final_path, phash=phash, prompt_no=entry["prompt_no"], prompt_text=entry["prompt"])
+
+    def pending(self):
+        return sum(1 for future in self._futures if not future.done())
+
+    def stats_text(self):
+        average_ms = self.total_processing_s * 1000 / self.processed if self.processed else 0.0
+        return (f"{self.processed} feldolgozva, {self.duplicates_dropped} pontos / {self.near_duplicates} közeli másolat, "
+                f"{self.failed} hiba, {self.pending()} függőben, átlag {average_ms:.0f} ms/kép")
+
+    def shutdown(self, wait=True):
+        """A sorban álló feladatok befejezése (wait=True) és a szálkészlet leállítása."""
+        self._executor.shutdown(wait=wait)
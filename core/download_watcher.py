@@ -0,0 +1,171 @@
+# core/download_watcher.py
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import time
+
+# A böngészők ideiglenes / részleges letöltési fájljai (Chrome/Edge: .crdownload, Firefox: .part, Safari: .download)
+PARTIAL_SUFFIXES = (".crdownload", ".part", ".tmp", ".download")
+
+# inotify konstansok (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+
+def is_partial_download(file_name):
+    lower_name = file_name.lower()
+    return lower_name.startswith(".") or lower_name.endswith(PARTIAL_SUFFIXES)
+
+
+class _InotifyWakeup:
+    """
+    inotify figyelés ctypes-on keresztül. Az eseményeket csak ébresztésre használjuk
+    (utána a mappa újra lesz olvasva), így az eseményrekordokat nem kell értelmezni.
+    """
+
+    def __init__(self, directory):
+        self.fd = None
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 sikertelen")
+        mask = IN_CREATE | IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO
+        if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+            error_number = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(error_number, f"inotify_add_watch sikertelen: {directory}")
+        self.fd = fd
+
+    def wait(self, timeout_s):
+        """Blokkol, amíg esemény nem érkezik vagy le nem jár az idő; True, ha volt esemény."""
+        readable, _, _ = select.select([self.fd], [], [], max(0.0, timeout_s))
+        if not readable:
+            return False
+        try:
+            while os.read(self.fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class DownloadWatcher:
+    """
+    Egy letöltés megérkezésének igazolása a letöltési mappában.
+
+    Az arm() a kattintás előtt pillanatképet készít a mappáról; a wait_for_download() ezután
+    az új (vagy megváltozott) végleges fájlt várja: a részleges fájlok (.crdownload, .part, ...)
+    nem számítanak, és a fájl csak akkor kész, ha nem üres, nincs mellette részleges párja, és a
+    mérete stable_for_s ideig nem változik. Linuxon inotify ébreszt, máshol (vagy ha az inotify
+    nem elérhető) poll_s időközönkénti mappa olvasás történik.
+    """
+
+    MTIME_TOLERANCE_S = 0.5 # Fájlrendszer időbélyeg pontatlanság
+
+    def __init__(self, directory, stable_for_s=0.75, poll_s=0.25, use_inotify=True, idle_wake_s=0.5):
+        self.directory = directory
+        self.stable_for_s = float(stable_for_s)
+        self.poll_s = float(poll_s)
+        self.idle_wake_s = float(idle_wake_s) # inotify mellett ennyi időnként ébred a stop kérés ellenőrzéséhez
+        self._baseline = {}
+        self._armed_at = None
+        self._wakeup = None
+        self.backend = "polling"
+        self.last_wait_s = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._wakeup = _InotifyWakeup(directory)
+                self.backend = "inotify"
+            except Exception as e:
+                print(f"DownloadWatcher: inotify nem elérhető ({e}), mappa olvasás (polling) használata.")
+
+    def _scan(self):
+        entries = {}
+        try:
+            with os.scandir(self.directory) as iterator:
+                for entry in iterator:
+                    try:
+                        if entry.is_file():
+                            stat_result = entry.stat()
+                            entries[entry.name] = (stat_result.st_size, stat_result.st_mtime)
+                    except OSError:
+                        continue
+        except OSError as e:
+            print(f"DownloadWatcher: Hiba a letöltési mappa olvasásakor ({self.directory}): {e}")
+        return entries
+
+    def arm(self):
+        """Pillanatkép a mappáról a letöltés indítása előtt."""
+        self._baseline = self._scan()
+        self._armed_at = time.time()
+
+    def _candidates(self, entries):
+        """Az arm() óta megjelent vagy megváltozott végleges fájlok, a legfrissebb elöl."""
+        found = []
+        for name, (size, mtime) in entries.items():
+            if is_partial_download(name) or self._baseline.get(name) == (size, mtime):
+                continue
+            if mtime < self._armed_at - self.MTIME_TOLERANCE_S:
+                continue # Régebbi tartalom új néven (pl. az utófeldolgozás átnevezte), nem ez a letöltés
+            if any((name + suffix) in entries for suffix in PARTIAL_SUFFIXES):
+                continue # Firefox: a végleges név üresen már létezik, a tartalom a .part fájlban készül
+            found.append((mtime, name, size))
+        return sorted(found, reverse=True)
+
+    def pending_partials(self, entries=None):
+        entries = self._scan() if entries is None else entries
+        return [name for name in entries if is_partial_download(name) and name not in self._baseline]
+
+    def wait_for_download(self, timeout_s=60.0, check_stop=None, progress_fn=None):
+        """
+        A megérkezett fájl teljes elérési útja, vagy None (időtúllépés / stop kérés).
+        progress_fn(elapsed_s, partial_names) a várakozás alatt kap visszajelzést.
+        """
+        if self._armed_at is None:
+            self.arm()
+        start_time = time.time()
+        deadline = start_time + float(timeout_s)
+        stable_since = {}
+        while True:
+            if check_stop and check_stop():
+                self.last_wait_s = time.time() - start_time
+                return None
+            now = time.time()
+            entries = self._scan()
+            for _mtime, name, size in self._candidates(entries):
+                if size <= 0:
+                    continue
+                first_seen = stable_since.get(name)
+                if first_seen is None or first_seen[0] != size:
+                    stable_since[name] = (size, now)
+                elif now - first_seen[1] >= self.stable_for_s:
+                    self.last_wait_s = now - start_time
+                    return os.path.join(self.directory, name)
+            if progress_fn:
+                progress_fn(now - start_time, self.pending_partials(entries))
+            if now >= deadline:
+                self.last_wait_s = now - start_time
+                return None
+            # Ha már van jelölt, a stabilitás ellenőrzéséhez rövid időközönként újra kell nézni
+            remaining_s = max(0.0, deadline - now)
+            if self._wakeup is not None and not stable_since:
+                self._wakeup.wait(min(self.idle_wake_s, remaining_s))
+            else:
+                time.sleep(min(self.poll_s, remaining_s))
+
+    def close(self):
+        if self._wakeup is not None:
+            self._wakeup.close()
+            self._wakeup = None
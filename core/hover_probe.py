@@ -0,0 +1,165 @@
+# core/hover_probe.py
+import json
+import math
+import os
+
+
+class GridStrategy:
+    """Rács cellaközéppontjai soronként, balról jobbra."""
+
+    name = "grid"
+
+    def __init__(self, cols=4, rows=3):
+        self.cols = max(1, int(cols))
+        self.rows = max(1, int(rows))
+
+    def cells(self):
+        return [(col, row) for row in range(self.rows) for col in range(self.cols)]
+
+    def points(self, region):
+        left, top, width, height = region
+        for col, row in self.cells():
+            yield (left + int((col + 0.5) * width / self.cols), top + int((row + 0.5) * height / self.rows))
+
+
+class CenterFirstStrategy(GridStrategy):
+    """A rács cellái a régió középpontjától mért távolság szerint (a hover overlay jellemzően középen nyílik)."""
+
+    name = "center_first"
+
+    def cells(self):
+        center_col, center_row = (self.cols - 1) / 2.0, (self.rows - 1) / 2.0
+        return sorted(super().cells(), key=lambda c: (math.hypot(c[0] - center_col, c[1] - center_row), c[1], c[0]))
+
+
+class SpiralStrategy(GridStrategy):
+    """A rács cellái négyzetes spirálban a középső cellától kifelé."""
+
+    name = "spiral"
+
+    def cells(self):
+        col, row = (self.cols - 1) // 2, (self.rows - 1) // 2
+        ordered = [(col, row)]
+        step, direction = 1, 0
+        moves = ((1, 0), (0, 1), (-1, 0), (0, -1))
+        while len(ordered) < self.cols * self.rows and step <= 2 * max(self.cols, self.rows):
+            for _ in range(2):
+                dx, dy = moves[direction % 4]
+                for _ in range(step):
+                    col, row = col + dx, row + dy
+                    if 0 <= col < self.cols and 0 <= row < self.rows:
+                        ordered.append((col, row))
+                direction += 1
+            step += 1
+        return ordered
+
+
+STRATEGIES = {
+    GridStrategy.name: GridStrategy,
+    CenterFirstStrategy.name: CenterFirstStrategy,
+    SpiralStrategy.name: SpiralStrategy,
+}
+
+
+class HoverProbeEngine:
+    """
+    Determinisztikus hover-próba sorrend a letöltés gombot felfedő overlay kiváltásához.
+
+    A sorrend: először a tanult "hot-spot" pozíciók (ahol korábban a hover mozgást váltott ki,
+    a régióhoz viszonyított arányként, gyakoriság szerint), majd a beállított stratégia
+    (grid / center_first / spiral) pontjai. A próbák száma korlátos (max_probes), és a
+    stratégiánkénti statisztika (futások, sikerek, szükséges próbák) fájlba mentődik.
+    """
+
+    HOT_SPOT_BIN = 0.05 # A tanult pozíciók aránybeli kerekítése
+
+    def __init__(self, stats_path=None, strategy="center_first", cols=4, rows=3, learning_enabled=True,
+                 max_hot_spots=5):
+        strategy_class = STRATEGIES.get(strategy, CenterFirstStrategy)
+        self.strategy = strategy_class(cols=cols, rows=rows)
+        self.stats_path = stats_path
+        self.learning_enabled = bool(learning_enabled)
+        self.max_hot_spots = int(max_hot_spots)
+        self.stats = {}
+        self.hot_spots = {}
+        self._load()
+
+    def _load(self):
+        if not self.stats_path or not os.path.exists(self.stats_path):
+            return
+        try:
+            with open(self.stats_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.stats = data.get("stats", {}) if isinstance(data, dict) else {}
+            self.hot_spots = {k: int(v) for k, v in data.get("hot_spots", {}).items()} if isinstance(data, dict) else {}
+        except Exception as e:
+            print(f"HoverProbeEngine: Statisztika betöltési hiba ({self.stats_path}): {e}")
+            self.stats, self.hot_spots = {}, {}
+
+    def _save(self):
+        if not self.stats_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.stats_path), exist_ok=True)
+            with open(self.stats_path, 'w', encoding='utf-8') as f:
+                json.dump({"stats": self.stats, "hot_spots": self.hot_spots}, f, indent=2)
+        except Exception as e:
+            print(f"HoverProbeEngine: Statisztika mentési hiba ({self.stats_path}): {e}")
+
+    def _hot_spot_key(self, x, y, region):
+        left, top, width, height = region
+        fx = round(round((x - left) / float(max(1, width)) / self.HOT_SPOT_BIN) * self.HOT_SPOT_BIN, 2)
+        fy = round(round((y - top) / float(max(1, height)) / self.HOT_SPOT_BIN) * self.HOT_SPOT_BIN, 2)
+        return f"{fx:.2f},{fy:.2f}"
+
+    def _hot_spot_points(self, region):
+        if not self.learning_enabled:
+            return []
+        left, top, width, height = region
+        points = []
+        for key, _count in sorted(self.hot_spots.items(), key=lambda item: -item[1])[:self.max_hot_spots]:
+            fx, fy = (float(v) for v in key.split(","))
+            x = min(left + width - 1, max(left, left + int(fx * width)))
+            y = min(top + height - 1, max(top, top + int(fy * height)))
+            points.append((x, y))
+        return points
+
+    def probe_points(self, region, max_probes=None):
+        """(x, y, forrás stratégia neve) hármasok a próba sorrendjében; a közeli ismétlődések kimaradnak."""
+        seen = set()
+        produced = 0
+        sources = [("hot_spot", self._hot_spot_points(region)), (self.strategy.name, self.strategy.points(region))]
+        for source_name, points in sources:
+            for x, y in points:
+                key = self._hot_spot_key(x, y, region)
+                if key in seen:
+                    continue
+                seen.add(key)
+                yield x, y, source_name
+                produced += 1
+                if max_probes is not None and produced >= max_probes:
+                    return
+
+    def _stats_for(self, source_name):
+        return self.stats.setdefault(source_name, {"runs": 0, "successes": 0, "total_probes": 0})
+
+    def record_result(self, success, probes_used, source_name=None, point=None, region=None, persist=True):
+        """Egy hover fázis eredménye: siker esetén a mozgást kiváltó pont hot-spotként tanulódik."""
+        run_stats = self._stats_for(source_name if success and source_name else self.strategy.name)
+        run_stats["runs"] += 1
+        run_stats["total_probes"] += int(probes_used)
+        if success:
+            run_stats["successes"] += 1
+            if self.learning_enabled and point and region:
+                key = self._hot_spot_key(point[0], point[1], region)
+                self.hot_spots[key] = self.hot_spots.get(key, 0) + 1
+        if persist:
+            self._save()
+
+    def describe(self):
+        parts = []
+        for source_name, run_stats in sorted(self.stats.items()):
+            runs = run_stats.get("runs", 0)
+            average = run_stats.get("total_probes", 0) / float(runs) if runs else 0.0
+            parts.append(f"{source_name}: {run_stats.get('successes', 0)}/{runs} siker, átlag {average:.1f} próba")
+        return f"stratégia: {self.strategy.name}; " + ("; ".join(parts) if parts else "nincs statisztika")
@@ -0,0 +1,110 @@
+# core/icon_location_model.py
+import json
+import os
+
+
+class IconLocationModel:
+    """
+    Kis térbeli modell arról, hol találtuk meg a letöltés ikont a legutóbbi promptoknál.
+
+    A találatok (ikon középpont, képernyő koordináta) egy rövid, fájlba mentett előzményben
+    vannak. A predict() a medián pozíciót adja, a search_regions() pedig a szűk ROI-tól
+    kiindulva egyre tágabb keresési területeket, a megadott határoló régióra vágva.
+    Amíg nincs találat, nincs jóslat, és a hívó a teljes régiót vizsgálja, mint korábban.
+    """
+
+    def __init__(self, history_path=None, max_hits=20, base_margin_px=24, widen_factor=3.0):
+        self.history_path = history_path
+        self.max_hits = int(max_hits)
+        self.base_margin_px = int(base_margin_px)
+        self.widen_factor = float(widen_factor)
+        self.hits = []
+        self.predicted_hits = 0
+        self.predicted_misses = 0
+        self._load()
+
+    def _load(self):
+        if not self.history_path or not os.path.exists(self.history_path):
+            return
+        try:
+            with open(self.history_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            hits = data.get("hits", []) if isinstance(data, dict) else []
+            self.hits = [(int(h[0]), int(h[1])) for h in hits if isinstance(h, (list, tuple)) and len(h) >= 2][-self.max_hits:]
+            print(f"IconLocationModel: {len(self.hits)} korábbi ikon találat betöltve ({self.history_path}).")
+        except Exception as e:
+            print(f"IconLocationModel: Előzmény betöltési hiba ({self.history_path}): {e}")
+            self.hits = []
+
+    def _save(self):
+        if not self.history_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.history_path), exist_ok=True)
+            with open(self.history_path, 'w', encoding='utf-8') as f:
+                json.dump({"hits": [list(h) for h in self.hits]}, f, indent=2)
+        except Exception as e:
+            print(f"IconLocationModel: Előzmény mentési hiba ({self.history_path}): {e}")
+
+    def record_hit(self, x, y, predicted=False, persist=True):
+        self.hits.append((int(x), int(y)))
+        self.hits = self.hits[-self.max_hits:]
+        if predicted:
+            self.predicted_hits += 1
+        if persist:
+            self._save()
+
+    def record_miss(self):
+        """A jósolt területeken nem volt ikon (a tágabb keresés vagy a fallback következik)."""
+        self.predicted_misses += 1
+
+    def predict(self, bounds=None):
+        """A várható ikon középpont (medián), vagy None; bounds (left, top, width, height) esetén csak azon belüli találatokból."""
+        hits = self.hits
+        if bounds:
+            left, top, width, height = bounds
+            hits = [h for h in hits if left <= h[0] < left + width and top <= h[1] < top + height]
+        if not hits:
+            return None
+        xs = sorted(h[0] for h in hits)
+        ys = sorted(h[1] for h in hits)
+        return xs[len(xs) // 2], ys[len(ys) // 2]
+
+    def _spread(self, center):
+        """A találatok legnagyobb eltérése a jósolt ponttól (px)."""
+        return max(max(abs(h[0] - center[0]), abs(h[1] - center[1])) for h in self.hits) if self.hits else 0
+
+    def search_regions(self, bounds=None, icon_size=(0, 0), levels=2):
+        """
+        Jósolt keresési területek szűktől tágig: [szűk ROI, tágabb ROI, ...], bounds-ra vágva.
+        A szűk ROI margója a találatok szórásához és az ikon méretéhez igazodik.
+        """
+        center = self.predict(bounds)
+        if center is None:
+            return []
+        margin = self.base_margin_px + max(icon_size) + min(self._spread(center), 4 * self.base_margin_px)
+        regions = []
+        for _ in range(levels):
+            region = self._box(center, margin, bounds)
+            if region and region not in regions:
+                regions.append(region)
+            margin = int(margin * self.widen_factor)
+        return regions
+
+    @staticmethod
+    def _box(center, margin, bounds):
+        left, top = center[0] - margin, center[1] - margin
+        right, bottom = center[0] + margin, center[1] + margin
+        if bounds:
+            left, top = max(left, bounds[0]), max(top, bounds[1])
+            right, bottom = min(right, bounds[0] + bounds[2]), min(bottom, bounds[1] + bounds[3])
+        if right - left <= 0 or bottom - top <= 0:
+            return None
+        return int(left), int(top), int(right - left), int(bottom - top)
+
+    def describe(self):
+        center = self.predict()
+        if center is None:
+            return "nincs korábbi ikon találat"
+        return (f"jósolt ikon pozíció ({center[0]}, {center[1]}) {len(self.hits)} találat alapján, "
+                f"jóslat találat/tévedés: {self.predicted_hits}/{self.predicted_misses}")
@@ -1,14 +1,107 @@
 # core/image_flow_handler.py
+import json
 import os
-import random
 import time
 
 import pyautogui
-from PIL import ImageChops, ImageStat
+
+from utils.frame_diff import FrameChangeDetector
+from utils.frame_hash import HashStabilityDetector
+from utils.template_matcher import TemplateMatcher
+
+from .adaptive_poll_scheduler import AdaptivePollScheduler
+from .icon_location_model import IconLocationModel
+from .hover_probe import HoverProbeEngine
+from .download_watcher import DownloadWatcher
+from .readiness import PixelColorProbe
+
+GENERATION_PIXEL_COLOR = (217, 217, 217) # A figyelt pixel színe generálás közben
+
 
 class ImageFlowHandler:
     def __init__(self, automator_ref):
         self.automator = automator_ref
+        self.last_generation_watch = None # Az utolsó terület figyelés összegzése (időtartamok)
+        self.last_downloaded_file = None # Az utolsó igazoltan megérkezett letöltés elérési útja
+        self.last_download_wait_s = None # A kattintás után a fájl megérkezéséig eltelt idő
+        self.last_download_missing = False # A letöltés elindult, de a fájl nem érkezett meg
+        self._download_watcher = None
+        self._icon_miss_recorded = False # Az aktuális letöltés keresésnél már rögzült-e jóslat tévedés
+        history_dir = getattr(self.automator, 'data_dir', None)
+        self.timing_model = getattr(self.automator, 'timing_model', None)
+        self.template_matcher = TemplateMatcher()
+        self.icon_location_model = IconLocationModel(
+            history_path=os.path.join(history_dir, "download_icon_hits.json") if history_dir else None
+        )
+        self.hover_probe_engine = HoverProbeEngine(
+            stats_path=os.path.join(history_dir, "hover_probe_stats.json") if history_dir else None,
+            strategy=self.automator._get_setting("hover_probe_strategy", "center_first"),
+            cols=self.automator._get_setting("hover_probe_grid_cols", 4),
+            rows=self.automator._get_setting("hover_probe_grid_rows", 3),
+            learning_enabled=self.automator._get_setting("hover_probe_learning_enabled", True),
+        )
+        self.poll_scheduler = AdaptivePollScheduler(timing_model=self.timing_model, stage="generation")
+
+    def _download_watch_dir(self):
+        """
+        A figyelt letöltési mappa: csak a kifejezetten beállított download_watch_dir.
+        A böngésző letöltési mappáját nem állítjuk be, ezért alapértelmezett mappát nem feltételezünk.
+        """
+        watch_dir = self.automator._get_setting("download_watch_dir", "")
+        if not watch_dir:
+            return None
+        if not os.path.isdir(watch_dir):
+            print(f"ImageFlowHandler DEBUG: A beállított letöltési mappa nem létezik: {watch_dir}")
+            return None
+        return watch_dir
+
+    def _create_download_watcher(self):
+        """Élesített DownloadWatcher a letöltés gomb megnyomása előttre, vagy None (kikapcsolva / nincs mappa: fix várakozás)."""
+        if not self.automator._get_setting("download_verification_enabled", True):
+            return None
+        watch_dir = self._download_watch_dir()
+        if not watch_dir:
+            return None
+        if self._download_watcher is not None:
+            self._download_watcher.close() # Egy korábbi, korán megszakadt letöltés figyelése
+        watcher = DownloadWatcher(
+            watch_dir,
+            stable_for_s=self.automator._get_setting("download_stable_for_s", 0.75),
+        )
+        watcher.arm()
+        self._download_watcher = watcher
+        print(f"ImageFlowHandler DEBUG: Letöltés figyelés élesítve ({watcher.backend}): {watch_dir}")
+        return watcher
+
+    def _confirm_download(self, download_watcher):
+        """Megvárja, amíg a letöltött fájl megérkezik és mérete stabil; True, ha megérkezett."""
+        timeout_s = self.automator._get_setting("download_watch_timeout_s", 60)
+        self._notify_status(f"Várakozás a letöltött fájl megérkezésére (max {timeout_s}s)...")
+        reported_partials = set()
+
+        def report_progress(elapsed_s, partial_names):
+            new_partials = set(partial_names) - reported_partials
+            if new_partials:
+                reported_partials.update(new_partials)
+                self._notify_status(f"Letöltés folyamatban: {', '.join(sorted(new_partials))} ({elapsed_s:.1f}s)")
+
+        try:
+            downloaded_path = download_watcher.wait_for_download(timeout_s, check_stop=self._check_for_stop_request,
+                                                                 progress_fn=report_progress)
+        finally:
+            download_watcher.close()
+        self.last_download_wait_s = download_watcher.last_wait_s
+        if downloaded_path:
+            self.last_downloaded_file = downloaded_path
+            self._notify_status(f"Letöltés megerősítve: {os.path.basename(downloaded_path)} ({download_watcher.last_wait_s:.1f}s).")
+            return True
+        if not self._check_for_stop_request():
+            self.last_download_missing = True
+            self._notify_status(
+                f"HIBA: A letöltött fájl {timeout_s}s alatt nem érkezett meg a letöltési mappába ({download_watcher.directory}).",
+                is_error=True
+            )
+        return False
 
     def _notify_status(self, message, is_error=False):
         mode_prefix = ""
@@ -31,6 +124,160 @@ class ImageFlowHandler:
     def _check_for_stop_request(self):
         return self.automator._check_for_stop_request()
 
+    def _create_change_detector(self, changed_ratio_threshold=None):
+        if changed_ratio_threshold is None:
+            changed_ratio_threshold = self.automator._get_setting("change_detection_ratio_threshold", 0.001)
+        return FrameChangeDetector(
+            downsample=self.automator._get_setting("change_detection_downsample", 2),
+            grayscale=self.automator._get_setting("change_detection_grayscale", True),
+            pixel_tolerance=self.automator._get_setting("change_detection_pixel_tolerance", 12),
+            changed_ratio_threshold=changed_ratio_threshold,
+        )
+
+    def _create_generation_watch_detector(self):
+        detector_type = self.automator._get_setting("generation_watch_detector", "phash")
+        if detector_type == "diff":
+            return self._create_change_detector()
+        return HashStabilityDetector(
+            hash_size=self.automator._get_setting("generation_watch_hash_size", 16),
+            distance_threshold=self.automator._get_setting("generation_watch_hash_distance", 3),
+            clock=time.time,
+        )
+
+    def _adaptive_interval_fn(self, generation_start_time, default_interval_s, stable_required_s=0.0):
+        """Visszaad egy függvényt, ami a következő lekérdezésig hátralévő időt adja (adaptív vagy fix)."""
+        if not self.automator._get_setting("adaptive_polling_enabled", True):
+            return lambda: default_interval_s
+        return lambda: self.poll_scheduler.next_interval_s(
+            time.time() - generation_start_time, default_interval_s, stable_required_s
+        )
+
+    def _timed_wait(self, stage, default_s, ready_check=None, poll_s=0.25):
+        """Várakozás a tanult időzítési modellel (ha van), különben fix ideig. Igaz, ha stop kérés jött."""
+        if self.timing_model is None:
+            time.sleep(default_s)
+            return self._check_for_stop_request()
+        outcome, elapsed_s = self.timing_model.wait(stage, default_s, ready_check=ready_check,
+                                                    check_stop=self._check_for_stop_request, poll_s=poll_s)
+        print(f"ImageFlowHandler DEBUG: Várakozás '{stage}': {outcome} {elapsed_s:.2f}s után.")
+        return outcome == "stopped"
+
+    def _generation_started_check(self, region_to_watch, pixel_coords):
+        """Készenléti jelzés a kezdeti várakozáshoz: a terület megmozdult, vagy a pixel felvette a generálás színét."""
+        if region_to_watch:
+            detector = self._create_change_detector()
+            try:
+                detector.set_reference(self.automator.screen_capture.grab(region_to_watch))
+            except Exception as e:
+                print(f"ImageFlowHandler DEBUG: Kezdeti referencia képkocka hiba: {e}")
+                return None
+            return lambda: detector.is_change(detector.compare(self.automator.screen_capture.grab(region_to_watch)))
+        if pixel_coords:
+            return PixelColorProbe(self.automator.screen_capture, pixel_coords[0], pixel_coords[1],
+                                   GENERATION_PIXEL_COLOR, tolerance=0)
+        return None
+
+    def _download_icon_template(self):
+        """A letöltés ikon előfeldolgozott sablonja a sablon nyilvántartásból, vagy None, ha a kép hiányzik."""
+        template_registry = getattr(self.automator, 'template_registry', None)
+        return template_registry.get("download_icon") if template_registry else None
+
+    def _download_icon_search_region(self):
+        """A letöltés ikon várható területe a sablon metaadatából (képernyő pixelekben), vagy None (teljes képernyő)."""
+        template_registry = getattr(self.automator, 'template_registry', None)
+        if template_registry is None:
+            return None
+        return template_registry.search_region("download_icon", self.automator.screen_width, self.automator.screen_height)
+
+    def _locate_download_icon(self, template, region=None):
+        """Letöltés ikon keresése (sablonillesztés egy rögzítésen). Visszatérés: TemplateMatch vagy None."""
+        threshold = self.automator._get_setting("template_match_threshold", 0.9)
+        icon_match = self.template_matcher.locate_on_screen(template, self.automator.screen_capture,
+                                                            region=region, threshold=threshold)
+        print(f"ImageFlowHandler DEBUG: Letöltés ikon keresés ({'régió' if region else 'teljes képernyő'}): "
+              f"{icon_match if icon_match else 'nincs találat'} [{self.template_matcher.last_search_ms:.1f} ms]")
+        return icon_match
+
+    def _locate_download_icon_predictive(self, template, bounds=None):
+        """
+        Letöltés ikon keresése először a korábbi találatok alapján jósolt szűk ROI-ban, majd tágabban,
+        végül a teljes bounds területen (None = a sablon metaadatában megadott várható terület).
+        Visszatérés: (TemplateMatch vagy None, jósolt-e).
+        """
+        if bounds is None:
+            bounds = self._download_icon_search_region()
+        if self.automator._get_setting("download_icon_prediction_enabled", True):
+            for roi in self.icon_location_model.search_regions(bounds, icon_size=template.size):
+                icon_match = self._locate_download_icon(template, region=roi)
+                if icon_match:
+                    return icon_match, True
+            self._record_icon_prediction_miss(bounds)
+        return self._locate_download_icon(template, region=bounds), False
+
+    def _record_icon_prediction_miss(self, bounds=None):
+        """Jóslat tévedés rögzítése letöltés keresésenként legfeljebb egyszer (nem a keresési ciklus minden körében)."""
+        if self._icon_miss_recorded or self.icon_location_model.predict(bounds) is None:
+            return
+        self._icon_miss_recorded = True
+        self.icon_location_model.record_miss()
+
+    def _try_predicted_download_click(self, template, bounds, hover_wait_s=0.25):
+        """
+        Gyors út: az egér a jósolt ikon pozícióra áll (a hover megjeleníti az ikont), és csak a jósolt
+        ROI-kban keres. Igaz, ha az ikont megtalálta és megnyomta; hamis esetén a hívó a régi keresésre vált.
+        """
+        if not self.automator._get_setting("download_icon_prediction_enabled", True):
+            return False
+        predicted_center = self.icon_location_model.predict(bounds)
+        if predicted_center is None:
+            return False
+        self._notify_status(f"Okos letöltés keresés: {self.icon_location_model.describe()}. Jósolt terület vizsgálata...")
+        try:
+            pyautogui.moveTo(predicted_center[0], predicted_center[1], duration=0.08)
+        except Exception as move_error:
+            self._notify_status(f"Okos letöltés keresés: Hiba az egér mozgatásakor a jósolt pozícióra: {move_error}", is_error=True)
+            return False
+        time.sleep(hover_wait_s)
+        for roi in self.icon_location_model.search_regions(bounds, icon_size=template.size):
+            if self._check_for_stop_request():
+                return False
+            icon_match = self._locate_download_icon(template, region=roi)
+            if icon_match:
+                icon_center_x, icon_center_y = icon_match.center
+                try:
+                    pyautogui.moveTo(icon_center_x, icon_center_y, duration=0.08)
+                    pyautogui.click()
+                except Exception as click_error:
+                    self._notify_status(f"Okos letöltés keresés: Hiba a letöltés ikon megnyomásakor: {click_error}", is_error=True)
+                    return False
+                self.icon_location_model.record_hit(icon_center_x, icon_center_y, predicted=True)
+                self._notify_status(
+                    f"Okos letöltés keresés: Letöltés ikon a jósolt területen megtalálva és megnyomva (X={icon_center_x}, Y={icon_center_y}, egyezés: {icon_match.score:.2f})."
+                )
+                return True
+        self._record_icon_prediction_miss(bounds)
+        self._notify_status("Okos letöltés keresés: A jósolt területen nincs ikon, teljes keresés következik.")
+        return False
+
+    def _log_generation_watch(self, summary, detector, start_time):
+        """Promptonként egy JSON sor a generálás figyelés idővonalával (hash előzménnyel)."""
+        if not self.automator._get_setting("generation_watch_log_enabled", True):
+            return
+        data_dir = getattr(self.automator, 'data_dir', None)
+        if not data_dir:
+            return
+        entry = dict(summary)
+        entry["timestamp"] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(start_time))
+        entry["image_index"] = self._get_current_image_index()
+        if hasattr(detector, 'history_for_log'):
+            entry["frames"] = detector.history_for_log(start_time)
+        try:
+            os.makedirs(data_dir, exist_ok=True)
+            with open(os.path.join(data_dir, "generation_watch_log.jsonl"), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        except Exception as e_log:
+            print(f"ImageFlowHandler DEBUG: Generálás figyelés napló írási hiba: {e_log}")
+
     def _is_manual_run(self):
         process_controller = getattr(self.automator, 'process_controller', None)
         worker = getattr(process_controller, 'worker', None) if process_controller else None
@@ -84,7 +331,8 @@ class ImageFlowHandler:
         )
         return fallback_x, fallback_y
 
-    def _watch_generation_by_region(self, region, stable_required_s=2.0, max_wait_s=60.0, check_interval_s=0.3):
+    def _watch_generation_by_region(self, region, stable_required_s=2.0, max_wait_s=60.0, check_interval_s=0.3,
+                                    interval_fn=None):
         left, top, width, height = region
         self._notify_status(
             f"Generálási státusz terület figyelése (X:{left}, Y:{top}, Szél:{width}, Mag:{height}). "
@@ -92,19 +340,32 @@ class ImageFlowHandler:
         )
         start_time = time.time()
         last_change_time = start_time
-        last_frame_bytes = None
+        first_movement_time = None
+        change_detector = self._create_generation_watch_detector()
         movement_detected = False
         info_sent = False
 
+        def finish(result, end_time):
+            summary = {
+                "result": result,
+                "region": [left, top, width, height],
+                "detector": type(change_detector).__name__,
+                "movement_start_s": round(first_movement_time - start_time, 3) if first_movement_time else None,
+                "last_movement_s": round(last_change_time - start_time, 3) if movement_detected else None,
+                "completed_s": round(end_time - start_time, 3),
+            }
+            self.last_generation_watch = summary
+            self._log_generation_watch(summary, change_detector, start_time)
+            return result == "stable"
+
         while time.time() - start_time < max_wait_s:
             if self._check_for_stop_request():
                 self._notify_status("Terület figyelése megszakítva felhasználói kéréssel.", is_error=True)
                 print("ImageFlowHandler DEBUG: Terület figyelés megszakítva stop kéréssel.")
-                return False
+                return finish("stopped", time.time())
 
             try:
-                screenshot = pyautogui.screenshot(region=(left, top, width, height))
-                current_frame = screenshot.tobytes()
+                current_frame = self.automator.screen_capture.grab((left, top, width, height))
             except Exception as e_region:
                 self._notify_status(
                     f"Hiba a generálási terület rögzítése közben (X:{left}, Y:{top}, Szél:{width}, Mag:{height}): {e_region}",
@@ -114,18 +375,18 @@ class ImageFlowHandler:
                 continue
 
             now = time.time()
-            if last_frame_bytes is None:
-                last_frame_bytes = current_frame
+            change_ratio = change_detector.update(current_frame)
+            if change_ratio is None:
                 last_change_time = now
                 continue
 
-            if current_frame != last_frame_bytes:
+            if change_detector.is_change(change_ratio):
                 if not movement_detected:
                     self._notify_status("Mozgás észlelve a generálási területen. Stabil állapot figyelése...")
+                    first_movement_time = now
                 movement_detected = True
                 info_sent = False
                 last_change_time = now
-                last_frame_bytes = current_frame
             else:
                 if movement_detected:
                     stable_time = now - last_change_time
@@ -134,7 +395,7 @@ class ImageFlowHandler:
                             f"Generálási terület stabil (mozgás nélkül {stable_time:.1f}s). Generálás befejeződött."
                         )
                         print("ImageFlowHandler DEBUG: Terület figyelés SIKERES (stabil állapot).")
-                        return True
+                        return finish("stable", now)
                     elif not info_sent and stable_required_s - stable_time <= 1.0:
                         remaining = max(0.0, stable_required_s - stable_time)
                         self._notify_status(
@@ -142,7 +403,7 @@ class ImageFlowHandler:
                         )
                         info_sent = True
 
-            time.sleep(check_interval_s)
+            time.sleep(interval_fn() if interval_fn else check_interval_s)
 
         if movement_detected:
             self._notify_status(
@@ -155,11 +416,11 @@ class ImageFlowHandler:
                 is_error=True
             )
         print("ImageFlowHandler DEBUG: Terület figyelés TIMEOUT.")
-        return False
+        return finish("timeout", time.time())
 
     def _watch_generation_by_pixel(self, pixel_x_to_watch, pixel_y_to_watch,
-                                   expected_color_during_generation=(217, 217, 217),
-                                   max_wait_s_for_pixel_change=45, check_interval_s=0.5):
+                                   expected_color_during_generation=GENERATION_PIXEL_COLOR,
+                                   max_wait_s_for_pixel_change=45, check_interval_s=0.5, interval_fn=None):
         self._notify_status(
             f"Pixel ({pixel_x_to_watch},{pixel_y_to_watch}) színének figyelése. Várt szín generálás közben: {expected_color_during_generation}."
         )
@@ -185,7 +446,7 @@ class ImageFlowHandler:
             except Exception as e_pixel:
                 self._notify_status(f"Hiba a pixel ({pixel_x_to_watch},{pixel_y_to_watch}) színének olvasása közben: {e_pixel}", is_error=True)
                 time.sleep(check_interval_s * 2)
-            time.sleep(check_interval_s)
+            time.sleep(interval_fn() if interval_fn else check_interval_s)
 
         self._notify_status(
             f"Időtúllépés: A pixel színe nem változott meg {max_wait_s_for_pixel_change}s alatt.",
@@ -198,7 +459,7 @@ class ImageFlowHandler:
                                        movement_detection_timeout_s=10.0,
                                        movement_probe_window_s=1.5,
                                        movement_probe_interval_s=0.18,
-                                       change_threshold_ratio=0.01,
+                                       change_threshold_ratio=0.01, # megváltozott pixelek aránya
                                        icon_search_timeout_s=4.0,
                                        icon_search_interval_s=0.35):
         left, top, width, height = region
@@ -206,27 +467,39 @@ class ImageFlowHandler:
             return False
 
         self._notify_status("Okos letöltés keresés indítása a generálási területen belül...")
+        self._icon_miss_recorded = False
+        icon_template = self._download_icon_template()
+        if icon_template is not None and self._try_predicted_download_click(icon_template, region):
+            return True
         movement_deadline = time.time() + movement_detection_timeout_s
         movement_detected = False
-        last_random_coords = None
-
-        while time.time() < movement_deadline:
+        last_probe_coords = None
+        probes_used = 0
+        probe_source = None
+        hover_start_time = time.time()
+        max_probes = self.automator._get_setting("hover_probe_max_probes", 12)
+        change_detector = self._create_change_detector(changed_ratio_threshold=change_threshold_ratio)
+
+        # Determinisztikus, korlátos próba sorrend: tanult hot-spotok, majd a beállított stratégia (grid / center_first / spiral)
+        for probe_x, probe_y, source_name in self.hover_probe_engine.probe_points(region, max_probes=max_probes):
+            if time.time() >= movement_deadline:
+                break
             if self._check_for_stop_request():
                 self._notify_status("Okos letöltés keresés megszakítva felhasználói kérésre.", is_error=True)
                 return False
 
-            random_x = random.randint(left, left + width - 1)
-            random_y = random.randint(top, top + height - 1)
-            last_random_coords = (random_x, random_y)
+            probes_used += 1
+            last_probe_coords = (probe_x, probe_y)
+            probe_source = source_name
             self._notify_status(
-                f"Okos letöltés keresés: Véletlenszerű pozíció vizsgálata ({random_x}, {random_y})."
+                f"Okos letöltés keresés: {probes_used}. próba pozíció ({probe_x}, {probe_y}), forrás: {source_name}."
             )
 
             try:
-                pyautogui.moveTo(random_x, random_y, duration=0.08)
+                pyautogui.moveTo(probe_x, probe_y, duration=0.08)
             except Exception as move_error:
                 self._notify_status(
-                    f"Okos letöltés keresés: Hiba az egér mozgatásakor ({random_x},{random_y}): {move_error}",
+                    f"Okos letöltés keresés: Hiba az egér mozgatásakor ({probe_x},{probe_y}): {move_error}",
                     is_error=True
                 )
                 return False
@@ -234,7 +507,7 @@ class ImageFlowHandler:
             time.sleep(movement_probe_interval_s)
 
             try:
-                reference_image = pyautogui.screenshot(region=(left, top, width, height))
+                change_detector.set_reference(self.automator.screen_capture.grab((left, top, width, height)))
             except Exception as screen_error:
                 self._notify_status(
                     f"Okos letöltés keresés: Hiba a terület rögzítésekor: {screen_error}",
@@ -250,7 +523,7 @@ class ImageFlowHandler:
 
                 time.sleep(movement_probe_interval_s)
                 try:
-                    comparison_image = pyautogui.screenshot(region=(left, top, width, height))
+                    comparison_image = self.automator.screen_capture.grab((left, top, width, height))
                 except Exception as screen_error:
                     self._notify_status(
                         f"Okos letöltés keresés: Hiba a terület rögzítésekor: {screen_error}",
@@ -258,30 +531,34 @@ class ImageFlowHandler:
                     )
                     break
 
-                if self._calculate_change_ratio(reference_image, comparison_image) >= change_threshold_ratio:
+                if change_detector.has_changed(comparison_image):
                     movement_detected = True
                     break
 
-                reference_image = comparison_image
-
             if movement_detected:
                 break
 
+        hover_elapsed_s = time.time() - hover_start_time
+        self.hover_probe_engine.record_result(movement_detected, probes_used, source_name=probe_source,
+                                              point=last_probe_coords, region=region)
+        print(f"ImageFlowHandler DEBUG: Hover fázis: {probes_used} próba, {hover_elapsed_s:.2f} mp, "
+              f"mozgás: {movement_detected}. {self.hover_probe_engine.describe()}")
+
         if not movement_detected:
             self._notify_status(
-                "Okos letöltés keresés: Nem észleltünk mozgást a területen, fallback koordináták következnek."
+                f"Okos letöltés keresés: {probes_used} próba után sem észleltünk mozgást a területen, fallback koordináták következnek."
             )
-            if last_random_coords:
+            if last_probe_coords:
                 try:
-                    pyautogui.moveTo(last_random_coords[0], last_random_coords[1], duration=0.05)
+                    pyautogui.moveTo(last_probe_coords[0], last_probe_coords[1], duration=0.05)
                 except Exception:
                     pass
             return False
 
-        self._notify_status("Okos letöltés keresés: Mozgás érzékelve. Letöltés ikon keresése a területen belül...")
-        icon_path = os.path.join(os.path.dirname(__file__), "..", "utils", "letoltes ikon.png")
-        icon_path = os.path.abspath(icon_path)
-        if not os.path.exists(icon_path):
+        self._notify_status(
+            f"Okos letöltés keresés: Mozgás érzékelve {probes_used}. próbára ({probe_source}, {hover_elapsed_s:.1f} mp). Letöltés ikon keresése a területen belül..."
+        )
+        if icon_template is None:
             self._notify_status(
                 "Okos letöltés keresés: Letöltés ikon képe nem található (utils/letoltes ikon.png). Fallback koordináták használata.",
                 is_error=True
@@ -294,7 +571,7 @@ class ImageFlowHandler:
                 self._notify_status("Okos letöltés ikon keresés megszakítva felhasználói kérésre.", is_error=True)
                 return False
             try:
-                icon_location = pyautogui.locateOnScreen(icon_path, region=(left, top, width, height))
+                icon_location, icon_predicted = self._locate_download_icon_predictive(icon_template, bounds=(left, top, width, height))
             except Exception as locate_error:
                 self._notify_status(
                     f"Okos letöltés keresés: Hiba a letöltés ikon keresésekor: {locate_error}",
@@ -303,9 +580,9 @@ class ImageFlowHandler:
                 icon_location = None
 
             if icon_location:
-                icon_center = pyautogui.center(icon_location)
+                icon_center_x, icon_center_y = icon_location.center
                 try:
-                    pyautogui.moveTo(icon_center.x, icon_center.y, duration=0.12)
+                    pyautogui.moveTo(icon_center_x, icon_center_y, duration=0.12)
                     pyautogui.click()
                 except Exception as click_error:
                     self._notify_status(
@@ -314,8 +591,9 @@ class ImageFlowHandler:
                     )
                     return False
                 self._notify_status(
-                    f"Okos letöltés keresés: Letöltés ikon megtalálva és megnyomva (X={icon_center.x}, Y={icon_center.y})."
+                    f"Okos letöltés keresés: Letöltés ikon megtalálva és megnyomva (X={icon_center_x}, Y={icon_center_y}, egyezés: {icon_location.score:.2f})."
                 )
+                self.icon_location_model.record_hit(icon_center_x, icon_center_y, predicted=icon_predicted)
                 return True
 
             time.sleep(icon_search_interval_s)
@@ -333,67 +611,76 @@ class ImageFlowHandler:
             return False
         return False
 
-    @staticmethod
-    def _calculate_change_ratio(reference_image, comparison_image):
-        if not reference_image or not comparison_image:
-            return 0.0
-        if reference_image.size != comparison_image.size:
-            return 0.0
-
-        diff_image = ImageChops.difference(reference_image, comparison_image)
-        stat = ImageStat.Stat(diff_image)
-        total_diff = sum(stat.sum)
-        max_possible = reference_image.size[0] * reference_image.size[1] * 255 * len(reference_image.getbands())
-        if max_possible == 0:
-            return 0.0
-        return total_diff / max_possible
-
     def monitor_generation_and_download(self):
         print("ImageFlowHandler DEBUG: monitor_generation_and_download KEZDÉS.")
         if self._check_for_stop_request():
             print("ImageFlowHandler DEBUG: Stop kérés a metódus elején.")
             return False
 
+        self.last_downloaded_file = None
+        self.last_download_wait_s = None
+        self.last_download_missing = False
         self._notify_status("KÉP FELDOLGOZÁS: Generálás figyelése és letöltés indítása...")
         region_to_watch = self._extract_generation_status_region()
         if region_to_watch:
             self._notify_status("Kép generálásának figyelése a kijelölt terület mozgása alapján...")
         else:
             self._notify_status("Kép generálásának figyelése pixel alapján...")
+        pixel_coords = None
+        if not region_to_watch:
+            pixel_coords = self._determine_generation_status_pixel()
+            if not pixel_coords:
+                return False
+        generation_start_time = time.time()
+        adaptive_polling = bool(self.automator._get_setting("adaptive_polling_enabled", True))
         initial_wait_after_generate_click_s = 2
-        self._notify_status(f"Várakozás {initial_wait_after_generate_click_s}s a generálás tényleges megkezdésére...")
-        time.sleep(initial_wait_after_generate_click_s)
-        if self._check_for_stop_request():
+        if adaptive_polling:
+            initial_wait_after_generate_click_s = self.poll_scheduler.initial_wait_s(initial_wait_after_generate_click_s)
+            self._notify_status(f"Adaptív lekérdezés: {self.poll_scheduler.describe()}.")
+        self._notify_status(f"Várakozás legfeljebb {initial_wait_after_generate_click_s:.1f}s a generálás tényleges megkezdésére...")
+        if self._timed_wait("generation_start", initial_wait_after_generate_click_s,
+                            ready_check=self._generation_started_check(region_to_watch, pixel_coords), poll_s=0.1):
             print("ImageFlowHandler DEBUG: Stop kérés a kezdeti várakozás után.")
             return False
 
         completion_source_text = "pixel figyelés alapján"
         wait_after_color_change_s = 1
         max_wait_s_for_completion = 60
+        stable_required_s = 2.0
+        generation_duration_s = None
 
         if region_to_watch:
-            region_success = self._watch_generation_by_region(region_to_watch, stable_required_s=2.0,
+            watch_start_time = time.time()
+            region_success = self._watch_generation_by_region(region_to_watch, stable_required_s=stable_required_s,
                                                               max_wait_s=max_wait_s_for_completion,
-                                                              check_interval_s=0.3)
+                                                              check_interval_s=0.3,
+                                                              interval_fn=self._adaptive_interval_fn(generation_start_time, 0.3, stable_required_s))
             if not region_success:
                 return False
             completion_source_text = "terület figyelése alapján"
+            last_movement_s = (self.last_generation_watch or {}).get("last_movement_s")
+            if last_movement_s is not None:
+                generation_duration_s = (watch_start_time - generation_start_time) + last_movement_s
         else:
-            pixel_coords = self._determine_generation_status_pixel()
-            if not pixel_coords:
-                return False
             pixel_x_to_watch, pixel_y_to_watch = pixel_coords
             pixel_success = self._watch_generation_by_pixel(
                 pixel_x_to_watch,
                 pixel_y_to_watch,
-                expected_color_during_generation=(217, 217, 217),
+                expected_color_during_generation=GENERATION_PIXEL_COLOR,
                 max_wait_s_for_pixel_change=max_wait_s_for_completion,
-                check_interval_s=0.5
+                check_interval_s=0.5,
+                interval_fn=self._adaptive_interval_fn(generation_start_time, 0.5)
             )
             if not pixel_success:
                 return False
+            generation_duration_s = time.time() - generation_start_time
+
+        if generation_duration_s is not None and adaptive_polling:
+            self.poll_scheduler.record(generation_duration_s)
+            print(f"ImageFlowHandler DEBUG: Generálási idő rögzítve: {generation_duration_s:.2f}s.")
 
         self._notify_status(f"Generálás befejeződött ({completion_source_text}). Várakozás {wait_after_color_change_s}s a letöltés előtt...")
+        # Fix várakozás: nincs megbízható készenléti jelzés (az ikon csak hoverre jelenik meg), így nem tanulható
         time.sleep(wait_after_color_change_s)
         if self._check_for_stop_request():
             print("ImageFlowHandler DEBUG: Stop kérés a színváltozás utáni várakozáskor.")
@@ -427,6 +714,7 @@ class ImageFlowHandler:
                 download_button_y = 704
                 self._notify_status(f"FIGYELEM: Letöltés gomb koordinátái nem voltak betöltve. Fallback pozíció használata: X={download_button_x}, Y={download_button_y}. Ez valószínűleg hiba a koordináták kezelésében!", is_error=True)
 
+        download_watcher = self._create_download_watcher()
         click_completed = False
         smart_search_used = False
         if region_to_watch and not manual_mode_active:
@@ -450,19 +738,19 @@ class ImageFlowHandler:
                 if manual_mode_active:
                     icon_search_timeout_s = 5
                     icon_search_interval_s = 0.5
-                    icon_path = os.path.join(os.path.dirname(__file__), "..", "utils", "letoltes ikon.png")
-                    icon_path = os.path.abspath(icon_path)
-                    if os.path.exists(icon_path):
+                    icon_template = self._download_icon_template()
+                    if icon_template is not None:
                         self._notify_status(
                             f"Manuális mód: Letöltés ikon keresése a képernyőn (max {icon_search_timeout_s}s)..."
                         )
+                        self._icon_miss_recorded = False
                         search_start = time.time()
                         while time.time() - search_start <= icon_search_timeout_s:
                             if self._check_for_stop_request():
                                 print("ImageFlowHandler DEBUG: Stop kérés a letöltés ikon keresése közben.")
                                 return False
                             try:
-                                icon_location = pyautogui.locateOnScreen(icon_path)
+                                icon_location, icon_predicted = self._locate_download_icon_predictive(icon_template)
                             except Exception as locate_error:
                                 print(
                                     "ImageFlowHandler DEBUG: Hiba a letöltés ikon keresése közben:",
@@ -470,12 +758,13 @@ class ImageFlowHandler:
                                 )
                                 icon_location = None
                             if icon_location:
-                                icon_center = pyautogui.center(icon_location)
+                                icon_center_x, icon_center_y = icon_location.center
                                 self._notify_status(
-                                    f"Manuális mód: Letöltés ikon megtalálva a képernyőn: X={icon_center.x}, Y={icon_center.y}."
+                                    f"Manuális mód: Letöltés ikon megtalálva a képernyőn: X={icon_center_x}, Y={icon_center_y} (egyezés: {icon_location.score:.2f})."
                                 )
-                                pyautogui.moveTo(icon_center.x, icon_center.y, duration=0.15)
+                                pyautogui.moveTo(icon_center_x, icon_center_y, duration=0.15)
                                 pyautogui.click()
+                                self.icon_location_model.record_hit(icon_center_x, icon_center_y, predicted=icon_predicted)
                                 click_completed = True
                                 break
                             time.sleep(icon_search_interval_s)
@@ -530,18 +819,23 @@ class ImageFlowHandler:
                 self._notify_status(f"Hiba (Manuális mód): A képsorszám bevitele sikertelen: {e_typewrite}", is_error=True)
                 return False
 
-        remaining_confirmation_wait_s = download_confirmation_wait_s
-        if manual_wait_duration_s > 0:
-            remaining_confirmation_wait_s = max(0, download_confirmation_wait_s - manual_wait_duration_s)
-
-        if remaining_confirmation_wait_s > 0:
-            wait_value_for_message = remaining_confirmation_wait_s
-            if isinstance(wait_value_for_message, float) and wait_value_for_message.is_integer():
-                wait_value_for_message = int(wait_value_for_message)
-            self._notify_status(f"Rövid várakozás ({wait_value_for_message}s) a letöltés elindulására...")
-            time.sleep(remaining_confirmation_wait_s)
-
-        self._notify_status("Kép letöltése elindítva (feltételezett).")
+        if download_watcher is not None:
+            self._download_watcher = None
+            if not self._confirm_download(download_watcher):
+                return False
+        else:
+            remaining_confirmation_wait_s = download_confirmation_wait_s
+            if manual_wait_duration_s > 0:
+                remaining_confirmation_wait_s = max(0, download_confirmation_wait_s - manual_wait_duration_s)
+
+            if remaining_confirmation_wait_s > 0:
+                wait_value_for_message = remaining_confirmation_wait_s
+                if isinstance(wait_value_for_message, float) and wait_value_for_message.is_integer():
+                    wait_value_for_message = int(wait_value_for_message)
+                self._notify_status(f"Rövid várakozás ({wait_value_for_message}s) a letöltés elindulására...")
+                time.sleep(remaining_confirmation_wait_s)
+
+            self._notify_status("Kép letöltése elindítva (feltételezett).")
         self._notify_status("KÉP FELDOLGOZÁS: Sikeres.") 
         print("ImageFlowHandler DEBUG: monitor_generation_and_download SIKERES.") 
         return True
@@ -0,0 +1,105 @@
+# core/ocr_cache.py
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def frame_digest(image):
+    """Gyors tartalom-hash a rögzített pixelekből (alak és dtype is beleszámít)."""
+    image = np.ascontiguousarray(image)
+    hasher = hashlib.blake2b(digest_size=16)
+    hasher.update(f"{image.shape}|{image.dtype.str}".encode("ascii"))
+    hasher.update(image.data)
+    return hasher.hexdigest()
+
+
+class CachingOcrReader:
+    """
+    Korlátos méretű LRU gyorsítótár egy OCR olvasó readtext() hívása előtt.
+
+    A kulcs a képkocka tartalom-hash-e, a régió (cache_region paraméter, csak a kulcshoz)
+    és a readtext paraméterei, így egy változatlan régió ismételt OCR-je azonnal visszatér.
+    A hits / misses számlálók és a dump() a hibakereséshez érhetők el. Minden más attribútum
+    (pl. a pool set_stop_check-je) a becsomagolt olvasóhoz továbbítódik.
+    """
+
+    def __init__(self, inner, max_entries=64):
+        self.inner = inner
+        self.max_entries = max(1, int(max_entries))
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def _make_key(self, image, region, kwargs):
+        params = json.dumps(kwargs, sort_keys=True, default=str)
+        region_key = tuple(int(v) for v in region) if region else None
+        return (frame_digest(image), region_key, params)
+
+    def readtext(self, image, cache_region=None, **kwargs):
+        key = self._make_key(image, cache_region, kwargs)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                entry["hits"] += 1
+                return entry["results"]
+        results = self.inner.readtext(image, **kwargs)
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = {"results": results, "created": time.time(), "hits": 0}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return results
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {"entries": len(self._entries), "max_entries": self.max_entries,
+                    "hits": self.hits, "misses": self.misses,
+                    "hit_ratio": round(self.hits / total, 3) if total else 0.0}
+
+    def stats_text(self):
+        stats = self.stats()
+        return f"{stats['hits']} találat / {stats['misses']} hiány (arány: {stats['hit_ratio']:.0%}), {stats['entries']}/{stats['max_entries']} bejegyzés"
+
+    def dump(self, path):
+        """A gyorsítótár tartalmának (felismert szövegek) mentése JSON-ba hibakereséshez."""
+        with self._lock:
+            entries = list(self._entries.items())
+        dump_entries = []
+        for (digest, region, params), entry in entries:
+            texts = []
+            for item in entry["results"]:
+                if isinstance(item, (list, tuple)) and len(item) == 3:
+                    texts.append({"text": item[1], "prob": round(float(item[2]), 3),
+                                  "bbox": [[float(c) for c in point] for point in item[0]]})
+                else:
+                    texts.append({"text": str(item)})
+            dump_entries.append({"frame_hash": digest, "region": list(region) if region else None,
+                                 "params": json.loads(params), "hits": entry["hits"],
+                                 "created": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entry["created"])),
+                                 "results": texts})
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({"stats": self.stats(), "entries": dump_entries}, f, indent=2, ensure_ascii=False)
+            print(f"OcrCache: Gyorsítótár mentve: {path}")
+            return True
+        except Exception as e:
+            print(f"OcrCache: Hiba a gyorsítótár mentésekor ({path}): {e}")
+            return False
@@ -0,0 +1,138 @@
+# core/ocr_service.py
+import importlib.util
+import threading
+import time
+from concurrent.futures import Future
+
+from .ocr_cache import CachingOcrReader
+from .ocr_worker_pool import OcrWorkerPool
+
+
+class OcrService:
+    """
+    Megosztott, lustán betöltött EasyOCR olvasó.
+
+    A start() háttérszálon importálja az easyocr-t és betölti a modellt, így az alkalmazás
+    ablaka azonnal megjelenik. A future / is_ready() jelzi az állapotot; a get_reader()
+    megvárja a betöltést (ha még el sem indult, elindítja), a peek_reader() sosem blokkol.
+    Minden OCR-t használó komponens ugyanazt a példányt kapja (get_ocr_service()).
+
+    backend="process" esetén az olvasó egy OcrWorkerPool (külön processzben futó EasyOCR,
+    azonos readtext() aláírással); ha a pool nem indul el, a szálon betöltött olvasóra vált.
+    Az olvasó mindkét esetben egy CachingOcrReader LRU gyorsítótár mögött érhető el, így a
+    hívók mindig átadhatják a readtext() cache_region paraméterét (nyers olvasót nem ad ki).
+    """
+
+    BACKENDS = ("process", "thread")
+
+    def __init__(self, languages=('en', 'hu'), gpu=False, backend="process", pool_size=1, request_timeout_s=60.0,
+                 cache_size=64):
+        self.languages = list(languages)
+        self.gpu = bool(gpu)
+        self.backend = backend if backend in self.BACKENDS else "process"
+        self.pool_size = int(pool_size)
+        self.request_timeout_s = float(request_timeout_s)
+        self.cache_size = int(cache_size)
+        self.future = Future()
+        self.error = None
+        self.load_time_s = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """A modell betöltésének indítása háttérszálon (többszöri hívás esetén csak egyszer fut)."""
+        with self._lock:
+            if self._thread is not None:
+                return self.future
+            self._thread = threading.Thread(target=self._load, name="OcrServiceLoader", daemon=True)
+            self._thread.start()
+        return self.future
+
+    def _load(self):
+        start_time = time.time()
+        try:
+            if importlib.util.find_spec("easyocr") is None:
+                print("FIGYELEM: Az 'easyocr' könyvtár nincs telepítve. Telepítsd: pip install easyocr")
+                raise ImportError("easyocr")
+            if self.backend == "process":
+                print(f"OcrService: OCR munkafolyamat(ok) indítása ({self.pool_size} db, {', '.join(self.languages)})...")
+                pool = OcrWorkerPool(self.languages, gpu=self.gpu, size=self.pool_size,
+                                     request_timeout_s=self.request_timeout_s)
+                try:
+                    pool_started = pool.start()
+                except Exception as e_pool:
+                    print(f"OcrService: OCR munkafolyamat indítási hiba: {e_pool}")
+                    pool_started = False
+                if pool_started:
+                    self.load_time_s = time.time() - start_time
+                    print(f"OcrService: OCR munkafolyamat kész ({self.load_time_s:.1f}s).")
+                    self.future.set_result(CachingOcrReader(pool, self.cache_size))
+                    return
+                pool.shutdown()
+                print("OcrService: Visszaállás a folyamaton belüli EasyOCR olvasóra.")
+                self.backend = "thread"
+            import easyocr
+            print(f"OcrService: EasyOCR olvasó betöltése háttérben ({', '.join(self.languages)}, gpu={self.gpu})...")
+            reader = easyocr.Reader(self.languages, gpu=self.gpu)
+            self.load_time_s = time.time() - start_time
+            print(f"OcrService: EasyOCR olvasó kész ({self.load_time_s:.1f}s).")
+            self.future.set_result(CachingOcrReader(reader, self.cache_size))
+        except Exception as e:
+            self.error = e
+            print(f"OcrService: Hiba az EasyOCR olvasó betöltésekor: {e}")
+            self.future.set_result(None)
+
+    def is_ready(self):
+        return self.future.done() and self.future.result() is not None
+
+    def is_loading(self):
+        return self._thread is not None and not self.future.done()
+
+    def is_available(self):
+        """Hamis, ha a betöltés már hibával véget ért (pl. nincs telepítve az easyocr)."""
+        return not (self.future.done() and self.future.result() is None)
+
+    def get_reader(self, timeout_s=None):
+        """Az olvasó (szükség esetén a betöltés megvárásával); hiba vagy időtúllépés esetén None."""
+        self.start()
+        try:
+            return self.future.result(timeout=timeout_s)
+        except Exception:
+            return None
+
+    def peek_reader(self):
+        """Az olvasó, ha már kész; egyébként None (nem blokkol)."""
+        return self.future.result() if self.future.done() else None
+
+    def readtext(self, image, **kwargs):
+        reader = self.get_reader()
+        if reader is None:
+            raise RuntimeError("EasyOCR olvasó nem érhető el.")
+        return reader.readtext(image, **kwargs)
+
+    def status_text(self):
+        if self._thread is None:
+            return "nincs elindítva"
+        if not self.future.done():
+            return "betöltés folyamatban"
+        if self.future.result() is None:
+            return f"nem érhető el ({self.error})"
+        return f"kész ({self.backend}, {self.load_time_s:.1f}s alatt betöltve)"
+
+    def shutdown(self):
+        reader = self.peek_reader()
+        if reader is not None and isinstance(reader.inner, OcrWorkerPool):
+            reader.inner.shutdown()
+
+
+_default_ocr_service = None
+_default_ocr_service_lock = threading.Lock()
+
+
+def get_ocr_service():
+    """A folyamat szintű megosztott OcrService (első híváskor jön létre, de nem indul el)."""
+    global _default_ocr_service
+    with _default_ocr_service_lock:
+        if _default_ocr_service is None:
+            _default_ocr_service = OcrService()
+        return _default_ocr_service
@@ -0,0 +1,214 @@
+# core/ocr_worker_pool.py
+import itertools
+import multiprocessing
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+def _ocr_worker_main(languages, gpu, request_queue, response_queue):
+    """
+    OCR munkafolyamat belépési pontja (külön processzben fut).
+    Betölti az EasyOCR modellt, jelzi a készenlétet, majd a kéréseket dolgozza fel:
+    (kérés azonosító, megosztott memória neve, alak, dtype, readtext paraméterek).
+    """
+    try:
+        import easyocr
+        reader = easyocr.Reader(languages, gpu=gpu)
+    except Exception as e:
+        response_queue.put(("init_error", None, repr(e)))
+        return
+    response_queue.put(("ready", None, None))
+
+    while True:
+        request = request_queue.get()
+        if request is None:
+            break
+        request_id, shm_name, shape, dtype, kwargs = request
+        try:
+            shm = shared_memory.SharedMemory(name=shm_name)
+            try:
+                frame = np.ndarray(shape, dtype=dtype, buffer=shm.buf).copy()
+            finally:
+                shm.close()
+            results = reader.readtext(frame, **kwargs)
+            # A torch/numpy típusokat egyszerű Python típusokra alakítjuk, hogy olcsón pickle-elhető legyen
+            plain_results = []
+            for item in results:
+                if isinstance(item, (list, tuple)) and len(item) == 3:
+                    bbox, text, prob = item
+                    plain_results.append(([[float(c) for c in point] for point in bbox], str(text), float(prob)))
+                else:
+                    plain_results.append(item)
+            response_queue.put(("result", request_id, plain_results))
+        except Exception as e:
+            response_queue.put(("error", request_id, repr(e)))
+
+
+class OcrRequestCancelled(Exception):
+    pass
+
+
+class _OcrWorker:
+    def __init__(self, context, languages, gpu, index):
+        self.index = index
+        self.request_queue = context.Queue()
+        self.response_queue = context.Queue()
+        self.process = context.Process(target=_ocr_worker_main, name=f"OcrWorker-{index}",
+                                       args=(languages, gpu, self.request_queue, self.response_queue),
+                                       daemon=True)
+        self.ready = False
+        self.failed = False
+        self.process.start()
+
+    def wait_ready(self, timeout_s):
+        try:
+            kind, _request_id, payload = self.response_queue.get(timeout=timeout_s)
+        except queue.Empty:
+            self.failed = True
+            return False
+        if kind == "ready":
+            self.ready = True
+            return True
+        self.failed = True
+        print(f"OcrWorkerPool: OCR munkafolyamat #{self.index} indítási hiba: {payload}")
+        return False
+
+    def kill(self):
+        try:
+            if self.process.is_alive():
+                self.process.kill()
+            self.process.join(timeout=2)
+        except Exception as e:
+            print(f"OcrWorkerPool: Hiba az OCR munkafolyamat #{self.index} leállításakor: {e}")
+        self.ready = False
+
+
+class OcrWorkerPool:
+    """
+    Külön processzben futó EasyOCR munkások kis készlete.
+
+    A képkockák megosztott memórián keresztül jutnak a munkáshoz (nincs pickle-ölt kép),
+    minden kérés egyedi azonosítót kap, a válaszra várva a hívó rendszeresen lefuttatja a
+    stop ellenőrzést, és időtúllépéskor a munkás processz leáll és újraindul, a futás pedig
+    folytatódhat. A readtext() aláírása megegyezik az easyocr.Reader-ével, így a pool
+    olvasóként átadható bármelyik OCR-t használó komponensnek.
+    """
+
+    def __init__(self, languages=('en', 'hu'), gpu=False, size=1, request_timeout_s=60.0, startup_timeout_s=300.0):
+        self.languages = list(languages)
+        self.gpu = bool(gpu)
+        self.size = max(1, int(size))
+        self.request_timeout_s = float(request_timeout_s)
+        self.startup_timeout_s = float(startup_timeout_s)
+        self._context = multiprocessing.get_context("spawn")
+        self._workers = []
+        self._idle_workers = queue.Queue()
+        self._request_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._stop_check = None
+        self.timeouts = 0
+        self.restarts = 0
+
+    def start(self):
+        """Elindítja a munkásokat, és megvárja, hogy legalább egy betöltse a modellt. Igaz, ha van kész munkás."""
+        workers = [_OcrWorker(self._context, self.languages, self.gpu, i) for i in range(self.size)]
+        for worker in workers:
+            if worker.wait_ready(self.startup_timeout_s):
+                self._idle_workers.put(worker)
+            else:
+                worker.kill()
+            self._workers.append(worker)
+        ready_count = self._idle_workers.qsize()
+        print(f"OcrWorkerPool: {ready_count}/{self.size} OCR munkafolyamat kész.")
+        return ready_count > 0
+
+    def set_stop_check(self, stop_check):
+        """A válaszra várakozás közben hívott stop ellenőrzés (igaz érték esetén a kérés megszakad)."""
+        self._stop_check = stop_check
+
+    def _restart_worker(self, old_worker):
+        old_worker.kill()
+        self.restarts += 1
+
+        def restart():
+            new_worker = _OcrWorker(self._context, self.languages, self.gpu, old_worker.index)
+            with self._lock:
+                self._workers = [new_worker if w is old_worker else w for w in self._workers]
+            if new_worker.wait_ready(self.startup_timeout_s):
+                self._idle_workers.put(new_worker)
+                print(f"OcrWorkerPool: OCR munkafolyamat #{new_worker.index} újraindítva.")
+            else:
+                new_worker.kill()
+
+        threading.Thread(target=restart, name=f"OcrWorkerRestart-{old_worker.index}", daemon=True).start()
+
+    def _acquire_worker(self, deadline):
+        while True:
+            if self._stop_check and self._stop_check():
+                raise OcrRequestCancelled("OCR kérés megszakítva (stop kérés).")
+            remaining_s = deadline - time.time()
+            if remaining_s <= 0:
+                raise TimeoutError("Nincs szabad OCR munkafolyamat.")
+            try:
+                return self._idle_workers.get(timeout=min(0.1, remaining_s))
+            except queue.Empty:
+                continue
+
+    def readtext(self, image, timeout_s=None, **kwargs):
+        image = np.ascontiguousarray(image)
+        timeout_s = self.request_timeout_s if timeout_s is None else float(timeout_s)
+        deadline = time.time() + timeout_s
+        worker = self._acquire_worker(deadline)
+        request_id = next(self._request_ids)
+        shm = shared_memory.SharedMemory(create=True, size=max(1, image.nbytes))
+        return_worker = True
+        try:
+            np.ndarray(image.shape, dtype=image.dtype, buffer=shm.buf)[...] = image
+            worker.request_queue.put((request_id, shm.name, image.shape, image.dtype.str, kwargs))
+            while True:
+                if self._stop_check and self._stop_check():
+                    # A munkás befejezi a kérést; a késve érkező választ a következő kérés eldobja
+                    raise OcrRequestCancelled("OCR kérés megszakítva (stop kérés).")
+                if time.time() >= deadline:
+                    self.timeouts += 1
+                    return_worker = False
+                    print(f"OcrWorkerPool: OCR kérés #{request_id} időtúllépés ({timeout_s:.0f}s), munkafolyamat #{worker.index} újraindítása.")
+                    self._restart_worker(worker)
+                    raise TimeoutError(f"OCR kérés időtúllépés ({timeout_s:.0f}s).")
+                if not worker.process.is_alive():
+                    return_worker = False
+                    self._restart_worker(worker)
+                    raise RuntimeError(f"OCR munkafolyamat #{worker.index} váratlanul leállt.")
+                try:
+                    kind, response_id, payload = worker.response_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if response_id != request_id:
+                    continue # Korábbi, megszakított kérés késői válasza
+                if kind == "error":
+                    raise RuntimeError(f"OCR hiba a munkafolyamatban: {payload}")
+                return payload
+        finally:
+            if return_worker:
+                self._idle_workers.put(worker)
+            shm.close()
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+    def shutdown(self):
+        with self._lock:
+            workers = list(self._workers)
+            self._workers = []
+        for worker in workers:
+            try:
+                worker.request_queue.put(None)
+                worker.process.join(timeout=2)
+            except Exception:
+                pass
+            worker.kill()
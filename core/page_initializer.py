@@ -2,9 +2,13 @@
 import pyautogui
 import time
 import os
-import numpy as np # Az _find_text_with_easyocr_and_click metódushoz kell
+from PIL import Image
 
-# EasyOCR importálása (a PyAutoGuiAutomator adja át az ocr_reader-t)
+from utils.frame_diff import FrameChangeDetector
+
+from .readiness import AnyProbe, OcrTextPresentProbe, RegionStableProbe, TemplatePresentProbe
+
+# EasyOCR: a megosztott OcrService (core/ocr_service.py) olvasóját a PyAutoGuiAutomator adja át
 
 class PageInitializer:
     def __init__(self, automator_ref):
@@ -15,7 +19,11 @@ class PageInitializer:
                            hogy elérje annak segédfüggvényeit és tagváltozóit.
         """
         self.automator = automator_ref
-        self.ocr_reader = self.automator.ocr_reader
+
+    @property
+    def ocr_reader(self):
+        # A megosztott OcrService olvasója; az első használatkor várja meg a háttérbetöltést
+        return self.automator.ocr_reader
 
     def _notify_status(self, message, is_error=False):
         self.automator._notify_status(message, is_error=is_error)
@@ -23,6 +31,56 @@ class PageInitializer:
     def _check_for_stop_request(self):
         return self.automator._check_for_stop_request()
 
+    def _timed_wait(self, stage, default_s, ready_check=None, min_s=0.0):
+        """Várakozás a tanult időzítési modellel (ha van). Hamis, ha közben stop kérés érkezett."""
+        timing_model = getattr(self.automator, 'timing_model', None)
+        if timing_model is None:
+            for _ in range(int(default_s)):
+                if self._check_for_stop_request(): return False
+                time.sleep(1)
+            return True
+        self._notify_status(f"Időzítés: {timing_model.describe(stage, default_s, min_s)}")
+        outcome, elapsed_s = timing_model.wait(stage, default_s, ready_check=ready_check,
+                                               check_stop=self._check_for_stop_request, min_s=min_s)
+        print(f"PageInitializer DEBUG: Várakozás '{stage}': {outcome} {elapsed_s:.2f}s után.")
+        return outcome != "stopped"
+
+    def _open_tool_region(self):
+        """Az 'ESZKÖZ MEGNYITÁSA' / 'ENTER TOOL' gomb várható területe (left, top, width, height)."""
+        return (int(self.automator.screen_width * 0.28), int(self.automator.screen_height * 0.33),
+                int(self.automator.screen_width * 0.44), int(self.automator.screen_height * 0.15))
+
+    def build_browser_ready_probe(self):
+        """
+        Készenléti próba a böngésző indítása utáni várakozáshoz: kész, ha az eszköz gomb felirata
+        már olvasható, vagy ha a képernyő a megnyitás után megváltozott és 2 s óta nyugalomban van.
+        """
+        screen_capture = self.automator.screen_capture
+        return AnyProbe(
+            OcrTextPresentProbe(screen_capture, self.automator.ocr_service.peek_reader,
+                                ["ESZKÖZ MEGNYITÁSA", "ENTER TOOL"], region=self._open_tool_region(),
+                                min_confidence=0.4, min_interval_s=1.5),
+            RegionStableProbe(screen_capture, stable_for_s=2.0, require_change_first=True)
+        )
+
+    def build_tool_open_probe(self):
+        """
+        Készenléti próba az eszköz megnyitása utáni várakozáshoz: kész, ha a csak a megnyitott
+        eszközön látható 'KÉPEK HOZZÁADÁSA' gomb sablonja a várható területén megtalálható, vagy
+        ha a képernyő a kattintás után megváltozott és 1 s óta nyugalomban van.
+        """
+        screen_capture = self.automator.screen_capture
+        probes = []
+        template_registry = getattr(self.automator, 'template_registry', None)
+        kh_button = template_registry.get("kh_button") if template_registry else None
+        if kh_button is not None:
+            probes.append(TemplatePresentProbe(
+                screen_capture, kh_button,
+                region=template_registry.search_region("kh_button", self.automator.screen_width, self.automator.screen_height),
+                confidence=self.automator._get_setting("tool_open_template_threshold", 0.8)))
+        probes.append(RegionStableProbe(screen_capture, stable_for_s=1.0, require_change_first=True))
+        return AnyProbe(*probes)
+
     def _find_text_with_easyocr_and_click(self, target_text, description,
                                           timeout_s=20,
                                           initial_confidence_threshold=0.6,
@@ -30,91 +88,117 @@ class PageInitializer:
                                           confidence_step=0.1,
                                           click_element=True,
                                           search_region=None):
+        """Egyetlen célszöveg keresése (a többcélú kereső kényelmi burkolója)."""
+        match = self._find_any_text_with_easyocr_and_click(
+            [target_text], description, timeout_s=timeout_s,
+            initial_confidence_threshold=initial_confidence_threshold,
+            min_confidence_threshold=min_confidence_threshold,
+            confidence_step=confidence_step, click_element=click_element,
+            search_region=search_region)
+        return (match["x"], match["y"]) if match else None
+
+    def _score_ocr_results(self, ocr_results, target_texts, confidence_thresholds, search_region):
+        """
+        Az egyszer lefuttatott OCR eredményhalmazon minden célszöveget minden küszöbbel pontoz.
+        A legmagasabb teljesített küszöb nyer; azon belül a nagyobb valószínűség, majd a célok sorrendje.
+        """
+        best_match = None
+        best_key = None
+        for (bbox, text, prob) in ocr_results:
+            text_strip = text.strip()
+            text_lower = text_strip.lower()
+            for target_index, target in enumerate(target_texts):
+                if target.lower() not in text_lower:
+                    continue
+                passed_thresholds = [t for t in confidence_thresholds if prob >= t]
+                if not passed_thresholds:
+                    continue
+                key = (max(passed_thresholds), prob, -target_index)
+                if best_key is None or key > best_key:
+                    x_coords = [p[0] for p in bbox]
+                    y_coords = [p[1] for p in bbox]
+                    center_x_rel = (min(x_coords) + max(x_coords)) // 2
+                    center_y_rel = (min(y_coords) + max(y_coords)) // 2
+                    best_key = key
+                    best_match = {
+                        "x": int(center_x_rel + (search_region[0] if search_region else 0)),
+                        "y": int(center_y_rel + (search_region[1] if search_region else 0)),
+                        "text": text_strip, "target": target, "prob": prob, "threshold": key[0]
+                    }
+        return best_match
+
+    def _find_any_text_with_easyocr_and_click(self, target_texts, description,
+                                              timeout_s=20,
+                                              initial_confidence_threshold=0.6,
+                                              min_confidence_threshold=0.2,
+                                              confidence_step=0.1,
+                                              click_element=True,
+                                              search_region=None,
+                                              frame_check_interval_s=0.3):
+        """
+        Több célszöveg keresése egyetlen OCR futtatással képkockánként.
+        A képkockán csak akkor fut újra az OCR, ha az előző OCR-rel feldolgozott képkockához képest
+        megváltozott; a találatokat az összes konfidencia küszöbbel egyszerre pontozza.
+        Visszatérés: a találat dict-je (x, y, text, target, prob, threshold) vagy None.
+        """
         if self._check_for_stop_request(): return None
         if not self.ocr_reader:
             self._notify_status("HIBA: EasyOCR olvasó nincs inicializálva a szövegkereséshez (PageInitializer).", is_error=True)
             return None
 
+        confidence_thresholds = []
+        attempt_confidence = initial_confidence_threshold
+        while attempt_confidence > min_confidence_threshold + 1e-6:
+            confidence_thresholds.append(round(attempt_confidence, 3))
+            attempt_confidence -= confidence_step
+        confidence_thresholds.append(round(min_confidence_threshold, 3))
+
+        targets_log_str = " / ".join(f"'{t}'" for t in target_texts)
         region_log_str = f"({search_region[0]},{search_region[1]},{search_region[2]},{search_region[3]})" if search_region else "Teljes képernyő"
-        self._notify_status(f"Szöveg keresése (PageInitializer): '{target_text}' ({description}) (max {timeout_s}s, régió: {region_log_str}). Kezdeti konf.: {initial_confidence_threshold:.2f}")
+        self._notify_status(f"Szöveg keresése (PageInitializer): {targets_log_str} ({description}) (max {timeout_s}s, régió: {region_log_str}). Küszöbök: {', '.join(f'{t:.2f}' for t in confidence_thresholds)}")
 
+        change_detector = FrameChangeDetector(downsample=2, pixel_tolerance=12, changed_ratio_threshold=0.001)
         overall_start_time = time.time()
-        attempt_confidence = initial_confidence_threshold
-        last_screenshot_pil = None
+        last_screenshot_np = None
+        ocr_pass_count = 0
 
-        while attempt_confidence >= min_confidence_threshold:
+        while time.time() - overall_start_time <= timeout_s:
             if self._check_for_stop_request(): return None
-
-            elapsed_time = time.time() - overall_start_time
-            if elapsed_time > timeout_s:
-                self._notify_status(f"Időkorlát ({timeout_s}s) lejárt '{target_text}' keresése közben (utolsó konf.: {attempt_confidence:.2f}).", is_error=True) # is_error=True helyett lehetne False, ha ez csak egy próbálkozás a sok közül
-                break
-
-            # Logolás ritkítása, vagy csak ha a konfidencia változik
-            # self._notify_status(f"Keresés '{target_text}' ({description}) konfidenciával: {attempt_confidence:.2f}. Fennmaradó idő: {max(0, timeout_s - elapsed_time):.1f}s")
-
             try:
-                last_screenshot_pil = pyautogui.screenshot(region=search_region)
+                screenshot_np = self.automator.screen_capture.grab(search_region)
+                if ocr_pass_count > 0 and not change_detector.is_change(change_detector.compare(screenshot_np)):
+                    time.sleep(frame_check_interval_s)
+                    continue
+                change_detector.set_reference(screenshot_np)
+                last_screenshot_np = screenshot_np
                 if self._check_for_stop_request(): return None
 
-                screenshot_np = np.array(last_screenshot_pil)
-                ocr_results = self.ocr_reader.readtext(screenshot_np, detail=1, paragraph=False)
-
-                best_match_for_current_confidence = None
-
-                for (bbox, text, prob) in ocr_results:
-                    if self._check_for_stop_request(): return None
-                    text_strip = text.strip()
-                    if prob >= attempt_confidence and target_text.lower() in text_strip.lower():
-                        x_coords = [p[0] for p in bbox]
-                        y_coords = [p[1] for p in bbox]
-                        min_x_rel, max_x_rel = min(x_coords), max(x_coords)
-                        min_y_rel, max_y_rel = min(y_coords), max(y_coords)
-
-                        center_x_rel = (min_x_rel + max_x_rel) // 2
-                        center_y_rel = (min_y_rel + max_y_rel) // 2
-
-                        abs_center_x = center_x_rel + (search_region[0] if search_region else 0)
-                        abs_center_y = center_y_rel + (search_region[1] if search_region else 0)
-
-                        current_match = {"x": abs_center_x, "y": abs_center_y, "text": text_strip, "prob": prob}
-                        if best_match_for_current_confidence is None or prob > best_match_for_current_confidence["prob"]:
-                            best_match_for_current_confidence = current_match
+                ocr_results = self.ocr_reader.readtext(screenshot_np, cache_region=search_region, detail=1, paragraph=False)
+                ocr_pass_count += 1
+                found_text_info = self._score_ocr_results(ocr_results, target_texts, confidence_thresholds, search_region)
 
-                if best_match_for_current_confidence:
-                    found_text_info = best_match_for_current_confidence
-                    self._notify_status(f"Szöveg '{found_text_info['text']}' (cél: '{target_text}') MEGTALÁLVA itt: ({found_text_info['x']}, {found_text_info['y']}) konfidenciával: {found_text_info['prob']:.2f} (keresési konf.: {attempt_confidence:.2f})")
+                if found_text_info:
+                    self._notify_status(f"Szöveg '{found_text_info['text']}' (cél: '{found_text_info['target']}') MEGTALÁLVA itt: ({found_text_info['x']}, {found_text_info['y']}) konfidenciával: {found_text_info['prob']:.2f} (küszöb: {found_text_info['threshold']:.2f}, OCR futás: {ocr_pass_count})")
                     if click_element:
                         pyautogui.moveTo(found_text_info['x'], found_text_info['y'], duration=0.1)
                         pyautogui.click()
                         self._notify_status(f"'{description}' (EasyOCR alapján) gombra/helyre kattintva.")
-                    return (found_text_info['x'], found_text_info['y'])
-
+                    return found_text_info
             except Exception as e_ocr_loop:
-                self._notify_status(f"Hiba az EasyOCR feldolgozási ciklusban (konf: {attempt_confidence:.2f}): {e_ocr_loop}", is_error=True)
+                self._notify_status(f"Hiba az EasyOCR feldolgozási ciklusban: {e_ocr_loop}", is_error=True)
                 time.sleep(0.3)
 
-            attempt_confidence -= confidence_step
-            if attempt_confidence < min_confidence_threshold and min_confidence_threshold > 0: # Hogy a ciklus lefusson a min_confidence_threshold értéken is.
-                if abs(attempt_confidence + confidence_step - min_confidence_threshold) < 0.001 : # Ha pont a min_confidence_threshold volt az előző
-                     break
-                attempt_confidence = min_confidence_threshold # Utolsó próba a minimális konfidenciával
-
-        # self._notify_status(f"'{target_text}' szöveg nem található EasyOCR-rel {timeout_s} másodperc alatt, még {min_confidence_threshold:.2f} minimális konfidenciával sem a(z) {'Teljes képernyő' if not search_region else str(search_region)} régióban.", is_error=True) # Ezt csak akkor jelezzük, ha az összes kísérlet sikertelen volt.
-        # Hibakereső kép mentése (opcionális, de hasznos lehet)
-        # Ezt a hívó oldalon kellene kezelni, ha az ÖSSZES próbálkozás sikertelen.
-        # Itt csak akkor mentjük, ha EZ a konkrét keresés (ezzel a target_text-tel) volt sikertelen.
-        # De mivel ezt egy ciklusban hívjuk, a debug kép mentése jobb, ha a ciklus végén történik, ha semmi sem lett találva.
-        # Egyelőre hagyjuk itt, de tudatában vagyunk, hogy többször is menthet.
+        self._notify_status(f"{targets_log_str} nem található {timeout_s}s alatt ({ocr_pass_count} OCR futás, régió: {region_log_str}).")
+        # Hibakereső kép mentése az utolsó OCR-rel feldolgozott képkockáról
         try:
-            if last_screenshot_pil and self.automator.assets_dir and os.path.exists(self.automator.assets_dir):
+            if last_screenshot_np is not None and self.automator.assets_dir and os.path.exists(self.automator.assets_dir):
                 region_str_file = f"region_{search_region[0]}_{search_region[1]}_{search_region[2]}_{search_region[3]}" if search_region else "fullscreen"
                 ts = time.strftime("%Y%m%d_%H%M%S")
-                safe_target_text = "".join(c if c.isalnum() else "_" for c in target_text[:20])
+                safe_target_text = "".join(c if c.isalnum() else "_" for c in target_texts[0][:20])
                 debug_img_name = f"debug_ocr_PI_indiv_fail_{safe_target_text}_{region_str_file}_{ts}.png"
                 debug_screenshot_path = os.path.join(self.automator.assets_dir, debug_img_name)
-                last_screenshot_pil.save(debug_screenshot_path)
-                self._notify_status(f"Hibakeresési képernyőkép mentve (PageInitializer, egyedi OCR sikertelen: '{target_text}'): {debug_screenshot_path}", is_error=False) # is_error=False, mert ez csak egy részleges hiba lehet
+                Image.fromarray(last_screenshot_np).save(debug_screenshot_path)
+                self._notify_status(f"Hibakeresési képernyőkép mentve (PageInitializer, OCR keresés sikertelen: {targets_log_str}): {debug_screenshot_path}", is_error=False) # is_error=False, mert ez csak egy részleges hiba lehet
         except Exception as e_screenshot:
             self._notify_status(f"Hiba a hibakeresési képernyőkép mentése közben (PageInitializer): {e_screenshot}", is_error=True)
         return None
@@ -136,68 +220,57 @@ class PageInitializer:
 
         self._notify_status("OLDAL ELŐKÉSZÍTÉS: Kezdeti műveletek indítása...")
         initial_wait_s = 3
-        self._notify_status(f"Extra várakozás {initial_wait_s}s az oldalinterakció előtt...")
-        for _ in range(initial_wait_s):
-            if self._check_for_stop_request(): return False
-            time.sleep(1)
+        self._notify_status(f"Extra várakozás (legfeljebb {initial_wait_s}s) az oldalinterakció előtt...")
+        page_settle_probe = RegionStableProbe(self.automator.screen_capture, region=self._open_tool_region(), stable_for_s=1.0)
+        if not self._timed_wait("page_settle", initial_wait_s, ready_check=page_settle_probe, min_s=0.5): return False
         self._notify_status("Oldal stabilizálódott (feltételezett).")
 
         # Keresési paraméterek
-        open_tool_region_top = int(self.automator.screen_height * 0.33)
-        open_tool_region_left = int(self.automator.screen_width * 0.28)
-        open_tool_region_width = int(self.automator.screen_width * 0.44)
-        open_tool_region_height = int(self.automator.screen_height * 0.15)
-        precise_open_tool_region = (open_tool_region_left, open_tool_region_top, open_tool_region_width, open_tool_region_height)
+        precise_open_tool_region = self._open_tool_region()
 
         texts_to_find = [
             {"text": "ESZKÖZ MEGNYITÁSA", "lang": "HU"},
             {"text": "ENTER TOOL", "lang": "EN"}
         ]
-        button_pos = None
-        search_timeout_per_attempt = 10 # Másodperc minden egyes _find_text_with_easyocr_and_click hívásra
+        target_texts = [item["text"] for item in texts_to_find]
+        target_langs = {item["text"]: item["lang"] for item in texts_to_find}
+        button_match = None
+        search_timeout_per_attempt = 10 # Másodperc keresési szakaszonként (pontosított régió / teljes képernyő)
 
-        # 1. Keresés a pontosított régióban
+        # 1. Keresés a pontosított régióban (mindkét felirat egyszerre, képkockánként egy OCR futás)
         self._notify_status(f"Gomb keresése a pontosított régióban ({precise_open_tool_region})...")
-        for item in texts_to_find:
+        button_match = self._find_any_text_with_easyocr_and_click(
+            target_texts,
+            description="'ESZKÖZ MEGNYITÁSA' / 'ENTER TOOL' gomb (EasyOCR, pontosított régió)",
+            timeout_s=search_timeout_per_attempt,
+            initial_confidence_threshold=0.60,
+            min_confidence_threshold=0.25,
+            confidence_step=0.1,
+            search_region=precise_open_tool_region,
+            click_element=True
+        )
+        if button_match:
+            self._notify_status(f"'{button_match['target']}' ({target_langs[button_match['target']]}) gomb MEGTALÁLVA a pontosított régióban.")
+
+        # 2. Ha nem található a pontosított régióban, keresés teljes képernyőn (OCR csak változott képkockán)
+        if not button_match:
             if self._check_for_stop_request(): return False
-            # self._notify_status(f"'{item['text']}' ({item['lang']}) keresése a pontosított régióban...") # Ezt a _find_text_... már logolja
-            button_pos = self._find_text_with_easyocr_and_click(
-                target_text=item['text'],
-                description=f"'{item['text']}' ({item['lang']}) gomb (EasyOCR, pontosított régió)",
+            self._notify_status("Gomb nem található a pontosított régióban. Keresés teljes képernyőn...", is_error=False)
+            button_match = self._find_any_text_with_easyocr_and_click(
+                target_texts,
+                description="'ESZKÖZ MEGNYITÁSA' / 'ENTER TOOL' gomb (EasyOCR, fallback teljes képernyő)",
                 timeout_s=search_timeout_per_attempt,
-                initial_confidence_threshold=0.60,
-                min_confidence_threshold=0.25,
+                initial_confidence_threshold=0.55,
+                min_confidence_threshold=0.20,
                 confidence_step=0.1,
-                search_region=precise_open_tool_region,
+                search_region=None, # Teljes képernyő
                 click_element=True
             )
-            if button_pos:
-                self._notify_status(f"'{item['text']}' ({item['lang']}) gomb MEGTALÁLVA a pontosított régióban.")
-                break
-
-        # 2. Ha nem található a pontosított régióban, keresés teljes képernyőn
-        if not button_pos:
-            if self._check_for_stop_request(): return False
-            self._notify_status("Gomb nem található a pontosított régióban. Keresés teljes képernyőn...", is_error=False)
-            for item in texts_to_find:
-                if self._check_for_stop_request(): return False
-                # self._notify_status(f"'{item['text']}' ({item['lang']}) keresése teljes képernyőn...") # Ezt a _find_text_... már logolja
-                button_pos = self._find_text_with_easyocr_and_click(
-                    target_text=item['text'],
-                    description=f"'{item['text']}' ({item['lang']}) gomb (EasyOCR, fallback teljes képernyő)",
-                    timeout_s=search_timeout_per_attempt, # Növelhetjük a timeout-ot teljes képernyős keresésnél, pl. 15s
-                    initial_confidence_threshold=0.55,
-                    min_confidence_threshold=0.20,
-                    confidence_step=0.1,
-                    search_region=None, # Teljes képernyő
-                    click_element=True
-                )
-                if button_pos:
-                    self._notify_status(f"'{item['text']}' ({item['lang']}) gomb MEGTALÁLVA teljes képernyőn.")
-                    break
+            if button_match:
+                self._notify_status(f"'{button_match['target']}' ({target_langs[button_match['target']]}) gomb MEGTALÁLVA teljes képernyőn.")
 
         # 3. Ellenőrzés, hogy megtaláltuk-e végül
-        if not button_pos:
+        if not button_match:
             # if self._check_for_stop_request(): return False # A ciklusokban már ellenőriztük
             self._notify_status("HIBA: Sem az 'ESZKÖZ MEGNYITÁSA', sem az 'ENTER TOOL' gombot nem sikerült megtalálni. Az automatizálás nem folytatható.", is_error=True)
             # Itt is menthetnénk egy utolsó képernyőképet, ha van `last_screenshot_pil` a `_find_text_with_easyocr_and_click`-ből (de az lokális ott)
@@ -215,10 +288,8 @@ class PageInitializer:
 
         self._notify_status("'ESZKÖZ MEGNYITÁSA' / 'ENTER TOOL' gombra kattintás sikeresnek tűnik.")
         wait_after_button_click_s = 8
-        self._notify_status(f"Várakozás {wait_after_button_click_s}s az eszköz felületének betöltődésére...")
-        for _ in range(wait_after_button_click_s):
-            if self._check_for_stop_request(): return False
-            time.sleep(1)
+        self._notify_status(f"Várakozás (legfeljebb {wait_after_button_click_s}s) az eszköz felületének betöltődésére...")
+        if not self._timed_wait("tool_open", wait_after_button_click_s, ready_check=self.build_tool_open_probe(), min_s=1.0): return False
         self._notify_status("Eszköz felülete betöltődött (feltételezett).")
 
         self._notify_status("OLDAL ELŐKÉSZÍTÉS: Sikeres (ESZKÖZ MEGNYITÁSA / ENTER TOOL megtörtént).")
@@ -9,6 +9,8 @@ from .pyautogui_automator import PyAutoGuiAutomator
 from .vpn_manager import VpnManager
 from .browser_manager import BrowserManager
 from .global_hotkey_listener import GlobalHotkeyListener
+from .download_pipeline import DownloadPipeline
+from .dedup_index import DedupIndex
 from utils.ip_geolocation import get_public_ip_info
 from PySide6.QtCore import QMetaObject, Qt, Q_ARG, Slot, QObject, QThread, Signal
 from PySide6.QtWidgets import QApplication
@@ -58,6 +60,79 @@ class AutomationWorker(QObject):
             self.status_updated.emit("Worker: Kemény stop kérés feldolgozva.", False)
             raise InterruptedByUserError("Kemény stop kérés.")
 
+    def _timed_wait(self, stage, default_s, ready_check=None, progress_label=None, min_s=0.0):
+        """
+        Várakozás a tanult időzítési modellel (TimingModel.wait), QThread alvással.
+        Stop kérésnél a _check_pause_and_stop() kivételt dob, mint a korábbi fix ciklusokban.
+        """
+        current_qthread = QThread.currentThread()
+        sleep_fn = (lambda s: current_qthread.msleep(int(s * 1000))) if current_qthread else time.sleep
+        timing_model = getattr(self.pc_ref.gui_automator, 'timing_model', None)
+        if timing_model is None:
+            remaining_s = float(default_s)
+            while remaining_s > 0:
+                self._check_pause_and_stop()
+                sleep_fn(min(1.0, remaining_s))
+                remaining_s -= 1.0
+            return "elapsed", float(default_s)
+
+        last_reported = {"bucket": 0}
+        def report_progress(elapsed_s, target_s):
+            bucket = int(elapsed_s // 5)
+            if progress_label and bucket > last_reported["bucket"]:
+                last_reported["bucket"] = bucket
+                self.status_updated.emit(f"{progress_label} ({max(0, target_s - elapsed_s):.0f}s)", False)
+
+        def check_stop():
+            self._check_pause_and_stop()
+            return False
+
+        return timing_model.wait(stage, default_s, ready_check=ready_check, check_stop=check_stop,
+                                 poll_s=0.5, min_s=min_s, sleep_fn=sleep_fn, progress_fn=report_progress)
+
+    def _create_dedup_index(self, gui_automator):
+        """
+        A letöltött képek tartós másolat-indexe (Data/dedup_index.sqlite), ha be van kapcsolva és
+        használja valami: a letöltés utófeldolgozás vagy a meglévő promptok kihagyása.
+        """
+        if not self.pc_ref.get_setting("dedup_index_enabled", True):
+            return None
+        if not (self.pc_ref.get_setting("download_pipeline_enabled", False)
+                or self.pc_ref.get_setting("skip_existing_prompts", False)):
+            return None
+        try:
+            return DedupIndex(os.path.join(gui_automator.data_dir, "dedup_index.sqlite"),
+                              near_distance=self.pc_ref.get_setting("dedup_near_distance", 6))
+        except Exception as e:
+            print(f"AutomationWorker DEBUG: Dedup index nem nyitható meg: {e}")
+            return None
+
+    def _create_download_pipeline(self, gui_automator, dedup_index=None):
+        """Háttér utófeldolgozás a letöltött képekhez (átnevezés, hash, katalógus), ha be van kapcsolva."""
+        if not self.pc_ref.get_setting("download_pipeline_enabled", False):
+            return None
+        return DownloadPipeline(
+            catalog_path=os.path.join(gui_automator.data_dir, "download_catalog.jsonl"),
+            max_workers=self.pc_ref.get_setting("download_pipeline_workers", 2),
+            rename_enabled=self.pc_ref.get_setting("download_pipeline_rename_enabled", True),
+            thumbnails_enabled=self.pc_ref.get_setting("download_pipeline_thumbnails_enabled", False),
+            thumbnail_size=self.pc_ref.get_setting("download_pipeline_thumbnail_size", 256),
+            dedup_index=dedup_index,
+        )
+
+    def _submit_downloaded_file(self, download_pipeline, gui_automator, prompt_no, prompt_text, image_index, prompt_elapsed_s):
+        """Az imént igazoltan megérkezett fájl átadása az utófeldolgozásnak (nem blokkol)."""
+        image_flow_handler = gui_automator.image_flow_handler
+        if download_pipeline is None or not image_flow_handler.last_downloaded_file:
+            return
+        timings = {
+            "prompt_total_s": round(prompt_elapsed_s, 3),
+            "download_wait_s": round(image_flow_handler.last_download_wait_s or 0.0, 3),
+            "generation_watch": image_flow_handler.last_generation_watch,
+        }
+        download_pipeline.submit(image_flow_handler.last_downloaded_file, prompt_no, prompt_text,
+                                 image_index=image_index, timings=timings)
+
     @Slot()
     def request_hard_stop_from_main(self): 
         self.status_updated.emit("Worker: Kemény leállítási kérelem fogadva.", False)
@@ -97,6 +172,10 @@ class AutomationWorker(QObject):
         
         prompts_processed_count = 0
         total_prompts_to_process = 0
+        missing_download_prompts = [] # (prompt sorszám, prompt szöveg) párok, amelyeknél a letöltött fájl nem érkezett meg
+        download_pipeline = None
+        dedup_index = None
+        prompts_skipped_count = 0
 
         try:
             print(f"AutomationWorker DEBUG ({mode_text}): [TRY_BLOCK_START]") 
@@ -122,17 +201,18 @@ class AutomationWorker(QObject):
             self.status_updated.emit(f"Worker ({mode_text}): Promptok betöltése: '{os.path.basename(self.prompt_file_path)}'", False)
             print(f"AutomationWorker DEBUG ({mode_text}): [3] Státusz elküldve: 'Promptok betöltése'.") 
 
-            prompts = prompt_handler.load_prompts(self.prompt_file_path, self.start_line, self.end_line)
-            print(f"AutomationWorker DEBUG ({mode_text}): [4] Promptok betöltve (darabszám: {len(prompts) if prompts else 0}).") 
+            # Lusta olvasás: a promptok feldolgozás közben, kötegenként jönnek a sor-indexelt fájlból
+            prompt_stream = prompt_handler.iter_prompts(self.prompt_file_path, self.start_line, self.end_line)
+            print(f"AutomationWorker DEBUG ({mode_text}): [4] Prompt tartomány megnyitva (darabszám: {prompt_stream.total if prompt_stream else 0}).") 
             
-            if not prompts:
+            if not prompt_stream or prompt_stream.total == 0:
                 self.status_updated.emit(f"Worker Hiba ({mode_text}): Nem sikerült promptokat betölteni.", True)
                 self.automation_finished.emit("Sikertelen prompt betöltés")
                 self._is_task_running_in_worker = False
                 print(f"AutomationWorker DEBUG ({mode_text}): Nincsenek promptok, a worker befejeződik (prompt hiba).") 
                 return
             
-            total_prompts_to_process = len(prompts)
+            total_prompts_to_process = prompt_stream.total
             self.status_updated.emit(f"Worker ({mode_text}): {total_prompts_to_process} prompt betöltve.", False)
             self.progress_updated.emit(0, total_prompts_to_process)
             self.image_count_updated.emit(0, total_prompts_to_process)
@@ -202,17 +282,18 @@ class AutomationWorker(QObject):
                     self.show_overlay_requested.emit()
 
                     wait_s = 15
-                    self.status_updated.emit(f"Worker ({mode_text}): Várakozás a böngészőre ({wait_s}s)...", False)
-                    for i in range(wait_s):
-                        self._check_pause_and_stop()
-                        if current_qthread:
-                            current_qthread.msleep(1000)
-                        else:
-                            time.sleep(1)
-                        if (i + 1) % 5 == 0 or i == wait_s - 1:
-                            print(f"AutomationWorker DEBUG ({mode_text}): [13a] Böngésző várakozás... ({wait_s - 1 - i}s hátra)")
-                            self.status_updated.emit(f"Worker ({mode_text}): Böngésző töltődik... ({wait_s - 1 - i}s)", False)
-                    print(f"AutomationWorker DEBUG ({mode_text}): [14] Böngésző várakozási idő letelt.")
+                    timing_model = getattr(gui_automator, 'timing_model', None)
+                    if timing_model is not None:
+                        print(f"AutomationWorker DEBUG ({mode_text}): [13a] Időzítés: {timing_model.describe('browser_load', wait_s, 3.0)}")
+                        wait_s = timing_model.effective_wait('browser_load', wait_s, 3.0)
+                    self.status_updated.emit(f"Worker ({mode_text}): Várakozás a böngészőre ({wait_s:.0f}s)...", False)
+                    browser_ready_probe = None
+                    if gui_automator and getattr(gui_automator, 'page_initializer', None):
+                        browser_ready_probe = gui_automator.page_initializer.build_browser_ready_probe()
+                    wait_outcome, waited_s = self._timed_wait('browser_load', 15, min_s=3.0,
+                                                              ready_check=browser_ready_probe,
+                                                              progress_label=f"Worker ({mode_text}): Böngésző töltődik...")
+                    print(f"AutomationWorker DEBUG ({mode_text}): [14] Böngésző várakozás vége ({wait_outcome}, {waited_s:.1f}s).")
                 else:
                     if not self._stop_requested_by_main:
                         self.status_updated.emit(f"Worker ({mode_text}) Hiba: Böngésző megnyitása sikertelen.", True)
@@ -259,16 +340,33 @@ class AutomationWorker(QObject):
             # --- Prompt Feldolgozási Ciklus ---
             if browser_opened_successfully and initial_gui_setup_success:
                 print(f"AutomationWorker DEBUG ({mode_text}): [19] Prompt feldolgozási ciklus indítása...") 
+                dedup_index = self._create_dedup_index(gui_automator)
+                download_pipeline = self._create_download_pipeline(gui_automator, dedup_index)
+                skip_existing_prompts = bool(self.pc_ref.get_setting("skip_existing_prompts", False)) and dedup_index is not None
                 self.status_updated.emit(f"Worker ({mode_text}): Promptok feldolgozásának indítása...", False)
-                for i, prompt_text in enumerate(prompts):
+                for i, (current_prompt_no, prompt_text) in enumerate(prompt_stream):
                     self._check_pause_and_stop() 
-                    current_prompt_no = self.start_line + i
+                    if prompt_stream.total != total_prompts_to_process: # A fájl futás közben megváltozott
+                        total_prompts_to_process = prompt_stream.total
+                        self.progress_updated.emit(prompts_processed_count, total_prompts_to_process)
                     print(f"AutomationWorker DEBUG ({mode_text}): [20] Feldolgozás: Prompt #{current_prompt_no} ({i+1}/{total_prompts_to_process})") 
                     self.status_updated.emit(f"Worker ({mode_text}): Feldolgozás: Prompt #{current_prompt_no} ({i+1}/{total_prompts_to_process})", False)
                     self.image_count_updated.emit(i + 1, total_prompts_to_process)
 
+                    existing_output = dedup_index.output_for_prompt(prompt_text) if skip_existing_prompts else None
+                    if existing_output:
+                        prompts_skipped_count += 1
+                        prompts_processed_count += 1
+                        self.progress_updated.emit(prompts_processed_count, total_prompts_to_process)
+                        self.status_updated.emit(f"Worker ({mode_text}): Prompt #{current_prompt_no} kihagyva, a kép már létezik: {os.path.basename(existing_output)}", False)
+                        print(f"AutomationWorker DEBUG ({mode_text}): [20a] Prompt #{current_prompt_no} kihagyva (meglévő kimenet: {existing_output}).") 
+                        continue
+
+                    prompt_start_time = time.time()
                     if gui_automator.process_single_prompt(prompt_text): 
                         prompts_processed_count += 1
+                        self._submit_downloaded_file(download_pipeline, gui_automator, current_prompt_no, prompt_text,
+                                                     i + 1, time.time() - prompt_start_time)
                         self.progress_updated.emit(prompts_processed_count, total_prompts_to_process)
                         print(f"AutomationWorker DEBUG ({mode_text}): [21] Prompt #{current_prompt_no} sikeresen feldolgozva.") 
                     else: 
@@ -276,12 +374,16 @@ class AutomationWorker(QObject):
                             self.status_updated.emit(f"Worker ({mode_text}): Prompt #{current_prompt_no} feldolgozása megszakítva.", False)
                             print(f"AutomationWorker DEBUG ({mode_text}): [21a] Prompt #{current_prompt_no} feldolgozása megszakítva felhasználó által.") 
                             break 
+                        elif getattr(gui_automator.image_flow_handler, 'last_download_missing', False):
+                            missing_download_prompts.append((current_prompt_no, prompt_text))
+                            self.status_updated.emit(f"Worker ({mode_text}) Hiba: Prompt #{current_prompt_no} letöltött fájlja nem érkezett meg. A futás végén újrapróbáljuk.", True)
+                            print(f"AutomationWorker DEBUG ({mode_text}): [21c] Prompt #{current_prompt_no} letöltése hiányzik, újrapróbálási listára téve.") 
                         else: 
                             self.status_updated.emit(f"Worker ({mode_text}) Hiba: Prompt #{current_prompt_no} feldolgozásakor. Kihagyva.", True)
                             print(f"AutomationWorker DEBUG ({mode_text}): [21b] Hiba Prompt #{current_prompt_no} feldolgozásakor.") 
                     
                     self._check_pause_and_stop() 
-                    if i < total_prompts_to_process - 1:
+                    if current_prompt_no < self.start_line + prompt_stream.total - 1:
                         self._check_pause_and_stop()
                         pause_s = self.pc_ref.get_setting("pause_between_prompts_s", 2) # Beállításból
                         print(f"AutomationWorker DEBUG ({mode_text}): [22] Szünet ({pause_s}s) a promptok között...") 
@@ -291,11 +393,49 @@ class AutomationWorker(QObject):
                             if current_qthread: current_qthread.msleep(1000)
                             else: time.sleep(1) 
                 print(f"AutomationWorker DEBUG ({mode_text}): [23] Prompt feldolgozási ciklus vége.") 
+
+                # --- Hiányzó letöltések újrapróbálása ---
+                retry_attempts = self.pc_ref.get_setting("download_retry_attempts", 1)
+                for attempt in range(retry_attempts):
+                    if not missing_download_prompts or self._stop_requested_by_main:
+                        break
+                    self._check_pause_and_stop()
+                    self.status_updated.emit(f"Worker ({mode_text}): {len(missing_download_prompts)} prompt letöltése hiányzik, újrapróbálás ({attempt + 1}/{retry_attempts})...", False)
+                    still_missing = []
+                    for retry_index, (current_prompt_no, prompt_text) in enumerate(missing_download_prompts):
+                        self._check_pause_and_stop()
+                        print(f"AutomationWorker DEBUG ({mode_text}): [23a] Újrapróbálás: Prompt #{current_prompt_no}") 
+                        prompt_start_time = time.time()
+                        if gui_automator.process_single_prompt(prompt_text):
+                            prompts_processed_count += 1
+                            self._submit_downloaded_file(download_pipeline, gui_automator, current_prompt_no, prompt_text,
+                                                         None, time.time() - prompt_start_time)
+                            self.progress_updated.emit(prompts_processed_count, total_prompts_to_process)
+                        elif self._stop_requested_by_main or (hasattr(gui_automator, 'stop_requested') and gui_automator.stop_requested):
+                            still_missing.extend(missing_download_prompts[retry_index:])
+                            break
+                        else:
+                            still_missing.append((current_prompt_no, prompt_text))
+                    missing_download_prompts = still_missing
+                if missing_download_prompts:
+                    missing_numbers = ", ".join(f"#{prompt_no}" for prompt_no, _ in missing_download_prompts)
+                    self.status_updated.emit(f"Worker ({mode_text}) Hiba: Letöltött fájl nem érkezett meg ezekhez a promptokhoz: {missing_numbers}", True)
             
             self._check_pause_and_stop() 
             summary_msg_end = f"Feldolgozva: {prompts_processed_count}/{total_prompts_to_process}."
+            if prompts_skipped_count:
+                summary_msg_end += f" Meglévő kép miatt kihagyva: {prompts_skipped_count}."
             if self._stop_requested_by_main : 
                 summary_msg_end = f"Felhasználó által leállítva. {summary_msg_end}"
+            timing_model = getattr(gui_automator, 'timing_model', None) if gui_automator else None
+            if timing_model is not None:
+                print(f"AutomationWorker DEBUG ({mode_text}): Időzítési modell összegzés: {timing_model.summary()}")
+            ocr_service = getattr(gui_automator, 'ocr_service', None) if gui_automator else None
+            ocr_cache = ocr_service.peek_reader() if ocr_service else None
+            if ocr_cache is not None:
+                print(f"AutomationWorker DEBUG ({mode_text}): OCR gyorsítótár: {ocr_cache.stats_text()}")
+                if self.pc_ref.get_setting("ocr_cache_dump_enabled", False):
+                    ocr_cache.dump(os.path.join(gui_automator.data_dir, "ocr_cache_dump.json"))
             self.automation_finished.emit(summary_msg_end)
             print(f"AutomationWorker DEBUG ({mode_text}): [24] Automatizálás befejezve. Üzenet: {summary_msg_end}") 
 
@@ -310,6 +450,12 @@ class AutomationWorker(QObject):
             self.automation_finished.emit(f"Kritikus hiba. Feldolgozva: {prompts_processed_count}/{total_prompts_to_process}.")
             print(f"AutomationWorker DEBUG ({mode_text}): [EXCEPT] Kritikus hiba: {e}") 
         finally:
+            if download_pipeline is not None:
+                # A sorban álló utófeldolgozás befejezése (a worker szálon, a GUI-t nem blokkolja)
+                download_pipeline.shutdown(wait=True)
+                print(f"AutomationWorker DEBUG ({mode_text}): Letöltés utófeldolgozás: {download_pipeline.stats_text()}")
+            if dedup_index is not None:
+                dedup_index.close()
             self._is_task_running_in_worker = False
             self.hide_overlay_requested.emit()
             print(f"AutomationWorker DEBUG ({mode_text}): [FINALLY] run_automation_task finally blokk lefutott.") 
@@ -362,7 +508,54 @@ class ProcessController(QObject):
             "vpn_target_country_code": "SG",
             "launch_vpn_on_startup": True,
             "last_prompt_file_path": "",
-            "prompt_line_ranges": {}
+            "prompt_line_ranges": {},
+            "screen_capture_backend": "auto", # auto | mss | pyautogui | fake
+            "screen_capture_fake_frames_dir": "",
+            "change_detection_downsample": 2,
+            "change_detection_grayscale": True,
+            "change_detection_pixel_tolerance": 12,
+            "change_detection_ratio_threshold": 0.001,
+            "generation_watch_detector": "phash", # phash | diff
+            "generation_watch_hash_size": 16,
+            "generation_watch_hash_distance": 3,
+            "generation_watch_log_enabled": True,
+            "adaptive_polling_enabled": True,
+            "timing_model_mode": "apply", # off | suggest | apply
+            "timing_model_percentile": 0.9,
+            "timing_model_safety_margin": 1.25,
+            "timing_model_min_samples": 5,
+            "ocr_load_timeout_s": 180,
+            "generate_button_color_tolerance": 12,
+            "download_icon_prediction_enabled": True, # Letöltés ikon keresése előbb a korábbi találatok körül
+            "hover_probe_strategy": "center_first", # Hover próba sorrend: grid / center_first / spiral
+            "hover_probe_grid_cols": 4,
+            "hover_probe_grid_rows": 3,
+            "hover_probe_max_probes": 12, # A hover fázis próbáinak felső korlátja
+            "hover_probe_learning_enabled": True, # A mozgást kiváltó pozíciók tanulása (hot-spot) a következő promptokhoz
+            "download_verification_enabled": True, # A letöltés igazolása a letöltési mappában megjelenő fájllal
+            "download_watch_dir": "", # A böngésző letöltési mappája; üresen nincs igazolás (fix várakozás)
+            "download_watch_timeout_s": 60,
+            "download_stable_for_s": 0.75, # Ennyi ideig változatlan méret után kész a fájl
+            "download_retry_attempts": 1, # Hiányzó letöltésű promptok újrapróbálása a futás végén
+            "download_pipeline_enabled": False, # Letöltött képek háttér utófeldolgozása (átnevezés, hash, katalógus)
+            "download_pipeline_workers": 2,
+            "download_pipeline_rename_enabled": True, # '<prompt sorszám>_<rövidítés>.png' fájlnév
+            "download_pipeline_thumbnails_enabled": False,
+            "download_pipeline_thumbnail_size": 256,
+            "dedup_index_enabled": True, # Letöltött képek másolat-indexe (pontos másolat törlése, közeli jelölése)
+            "dedup_near_distance": 6, # Perceptuális hash Hamming-távolság, ameddig közeli másolatnak számít
+            "skip_existing_prompts": False, # Azon promptok kihagyása, amelyekhez már van letöltött kép az indexben
+            "prompt_input_method": "clipboard", # Prompt bevitel: clipboard (Ctrl+V) vagy typewrite; a typewrite mindig tartalék
+            "prompt_typewrite_interval_s": 0.01,
+            "prompt_clipboard_restore_delay_s": 1.0, # Bevitel ellenőrzés nélkül ennyivel a beillesztés után áll vissza a vágólap
+            "prompt_verification_enabled": True, # Bevitel ellenőrzése a generálás előtt (régió változás, szükség esetén OCR)
+            "prompt_verification_retries": 1,
+            "prompt_verification_ocr_sample_every": 0, # Minden N-edik bevitelnél mintavételes OCR is (0 = soha; szinkron, lassítja a bevitelt)
+            "prompt_verification_min_ocr_score": 0.6,
+            "template_match_threshold": 0.9, # Sablonillesztés (letöltés ikon) minimális egyezése
+            "tool_open_template_threshold": 0.8, # A 'KÉPEK HOZZÁADÁSA' gomb sablon egyezése az eszköz megnyitásának jelzéséhez
+            "screen_index_max_age_s": 10, # A teljes képernyős UI elem index újrahasznosítási ideje
+            "ocr_cache_dump_enabled": False, # Futás végén Data/ocr_cache_dump.json (hibakereséshez)
             # Ide jöhetnek további alapértelmezett értékek
         }
         try:
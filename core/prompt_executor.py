@@ -1,6 +1,8 @@
 # core/prompt_executor.py
 import pyautogui
 import time
+from .text_injection import TextInjector
+from .prompt_verifier import PromptEntryVerifier
 # import os # Nem tűnik használtnak itt közvetlenül
 
 try:
@@ -14,6 +16,41 @@ except ImportError:
 class PromptExecutor:
     def __init__(self, automator_ref):
         self.automator = automator_ref
+        self.text_injector = TextInjector.from_settings(
+            method=self.automator._get_setting("prompt_input_method", "clipboard"),
+            typewrite_interval_s=self.automator._get_setting("prompt_typewrite_interval_s", 0.01),
+        )
+        self.entry_verifier = PromptEntryVerifier(
+            self.automator.screen_capture,
+            reader_getter=self.automator.ocr_service.peek_reader,
+            ocr_sample_every=self.automator._get_setting("prompt_verification_ocr_sample_every", 0),
+            min_ocr_score=self.automator._get_setting("prompt_verification_min_ocr_score", 0.6),
+        )
+
+    def _prompt_entry_region(self):
+        """A prompt mező régiója (left, top, width, height): a mentett prompt_rect, vagy egy sáv a kattintási pont körül."""
+        rect = self.automator.last_known_prompt_rect
+        if isinstance(rect, dict) and all(key in rect for key in ("x", "y", "width", "height")):
+            return int(rect["x"]), int(rect["y"]), int(rect["width"]), int(rect["height"])
+        coordinates = self.automator.coordinates
+        if "prompt_click_x" in coordinates and "prompt_click_y" in coordinates:
+            left = max(0, int(coordinates["prompt_click_x"]) - 300)
+            top = max(0, int(coordinates["prompt_click_y"]) - 40)
+            width = min(600, self.automator.screen_width - left)
+            height = min(80, self.automator.screen_height - top)
+            if width > 0 and height > 0:
+                return left, top, width, height
+        return None
+
+    def _enter_prompt_text(self, prompt_text):
+        """A mező törlése és a prompt bevitele; visszaadja a TextInjector összegzését."""
+        pyautogui.hotkey('ctrl', 'a'); time.sleep(0.05) 
+        pyautogui.press('delete'); time.sleep(0.1) 
+        injection = self.text_injector.inject(prompt_text); time.sleep(0.2)
+        if injection["fallback"]:
+            self._notify_status(f"FIGYELEM: Prompt beírása tartalék módszerrel ({injection['strategy']}): {'; '.join(injection['errors'])}")
+        print(f"PromptExecutor DEBUG: Prompt beírása kész ({injection['strategy']}, {len(prompt_text)} karakter, {injection['elapsed_ms']:.0f} ms). Összesítés: {self.text_injector.describe()}") # ÚJ DEBUG
+        return injection
 
     def _notify_status(self, message, is_error=False):
         # Ez a metódus már létezik és használva van, a hívásainak kellene megjelenniük.
@@ -40,16 +77,45 @@ class PromptExecutor:
         print("PromptExecutor DEBUG: Prompt mező aktiválva.") # ÚJ DEBUG
 
         self._notify_status(f"Prompt beírása: '{prompt_text[:30]}...'")
+        verification_region = self._prompt_entry_region() if self.automator._get_setting("prompt_verification_enabled", True) else None
+        entry_attempts = 1 + (self.automator._get_setting("prompt_verification_retries", 1) if verification_region else 0)
         try:
-            print(f"PromptExecutor DEBUG: Prompt beírása pyautogui-val: '{prompt_text[:30]}...'") # ÚJ DEBUG
-            pyautogui.hotkey('ctrl', 'a'); time.sleep(0.05) 
-            pyautogui.press('delete'); time.sleep(0.1) 
-            pyautogui.typewrite(prompt_text, interval=0.01); time.sleep(0.2)
-            print("PromptExecutor DEBUG: Prompt beírása kész.") # ÚJ DEBUG
-        except Exception as e_type:
-            self._notify_status(f"Hiba a prompt beírása közben: {e_type}", is_error=True)
-            print(f"PromptExecutor DEBUG: Hiba a prompt beírása közben: {e_type}") # ÚJ DEBUG
-            return False
+            for entry_attempt in range(entry_attempts):
+                if entry_attempt > 0:
+                    if self._check_for_stop_request():
+                        return False
+                    self._notify_status(f"Prompt bevitel újrapróbálása ({entry_attempt}/{entry_attempts - 1}): prompt mező újra-aktiválása...")
+                    if not self.automator._find_and_activate_prompt_field():
+                        self._notify_status("HIBA: A prompt mező újra-aktiválása sikertelen az ismételt bevitelhez.", is_error=True)
+                        return False
+                try:
+                    print(f"PromptExecutor DEBUG: Prompt beírása: '{prompt_text[:30]}...'") # ÚJ DEBUG
+                    if verification_region:
+                        self.entry_verifier.arm(verification_region)
+                    self._enter_prompt_text(prompt_text)
+                except Exception as e_type:
+                    self._notify_status(f"Hiba a prompt beírása közben: {e_type}", is_error=True)
+                    print(f"PromptExecutor DEBUG: Hiba a prompt beírása közben: {e_type}") # ÚJ DEBUG
+                    return False
+                if not verification_region:
+                    break
+                check = self.entry_verifier.verify(prompt_text)
+                print(f"PromptExecutor DEBUG: Bevitel ellenőrzés: {check}. Összesítés: {self.entry_verifier.describe()}") # ÚJ DEBUG
+                if check["ok"]:
+                    break
+                self._notify_status(
+                    f"FIGYELEM: A prompt mező tartalma nem tűnik helyesnek (régió változott: {check['changed']}, OCR egyezés: {check['score']}).",
+                    is_error=True
+                )
+            else:
+                self._notify_status("HIBA: A prompt bevitele ismételt próbálkozás után sem ellenőrizhető, a generálás nem indul el.", is_error=True)
+                return False
+        finally:
+            # A korábbi vágólap tartalom csak az ellenőrzött bevitel után áll vissza (a böngésző aszinkron olvas);
+            # ellenőrzés nélkül legalább prompt_clipboard_restore_delay_s-mal a beillesztés után
+            self.text_injector.restore_clipboard(
+                delay_s=0.0 if verification_region else self.automator._get_setting("prompt_clipboard_restore_delay_s", 1.0)
+            )
 
         # ... (Generálás Gomb kezelése változatlan, de a _notify_status hívásai miatt már tartalmaznak print-et) ...
         # A generálás gomb kezelésének végén is jó lenne egy debug print, hogy tudjuk, sikeres volt-e.
@@ -68,7 +134,9 @@ class PromptExecutor:
                 self.automator.last_known_prompt_rect, 
                 self.automator.screen_width, 
                 self.automator.screen_height, 
-                notify_callback=self._notify_status
+                notify_callback=self._notify_status,
+                color_tolerance=self.automator._get_setting("generate_button_color_tolerance", 12),
+                screen_index=None # Friss, csak a gomb részterületére szűkített rögzítés: a bevitel utáni, aktív színű gomb
             )
             if pos:
                 gen_x, gen_y = pos
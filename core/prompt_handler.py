@@ -1,6 +1,11 @@
 # core/prompt_handler.py
 import re # <<< HOZZÁADVA: Reguláris kifejezésekhez
 
+from .prompt_source import PromptStream, open_prompt_source
+
+# Sor eleji sorszámozás: számjegyek, utána pont / zárójel / kötőjel, majd legalább egy whitespace
+NUMBERING_PATTERN = re.compile(r"^\s*\d+[\.\)\-]\s+")
+
 class PromptHandler:
     def __init__(self, process_controller_ref=None):
         self.process_controller = process_controller_ref #
@@ -25,47 +30,56 @@ class PromptHandler:
         # \d+      : Egy vagy több számjegy (a sorszám)
         # [\.\)\-] : Egy karakter a csoportból: pont, zárójel bezáró, vagy kötőjel
         # \s+      : Legalább egy whitespace karakter (a sorszám és a szöveg között)
-        pattern = r"^\s*\d+[\.\)\-]\s+"
-        stripped_line = re.sub(pattern, '', line_text)
+        # (A minta a modul szintjén egyszer fordul: NUMBERING_PATTERN)
+        stripped_line = NUMBERING_PATTERN.sub('', line_text)
         return stripped_line
 
-    def load_prompts(self, file_path, start_line, end_line): # <<< MÓDOSÍTOTT METÓDUS
-        prompts_to_process = [] #
+    def _open_prompt_range(self, file_path, start_line, end_line):
+        """
+        A prompt fájl indexének megnyitása és a kért tartomány ellenőrzése.
+        Visszaadja a (PromptSource, effektív befejező sor) párt, vagy (None, None) hiba esetén (az üzenet már elküldve).
+        """
         if not file_path: #
             self._notify_status("Hiba: Nincs megadva prompt fájl elérési útja.") #
-            return prompts_to_process #
+            return None, None
 
         try:
-            with open(file_path, 'r', encoding='utf-8') as f: #
-                all_lines = [line.strip() for line in f if line.strip()] # Üres sorok kihagyása #
+            prompt_source = open_prompt_source(file_path) # Sor-index (üres sorok nélkül), a fájl többi része nem töltődik be
         except FileNotFoundError: #
             self._notify_status(f"Hiba: A '{file_path}' fájl nem található.") #
-            return prompts_to_process #
+            return None, None
         except Exception as e: #
             self._notify_status(f"Hiba a '{file_path}' fájl olvasása közben: {e}") #
-            return prompts_to_process #
+            return None, None
 
-        total_prompts_in_file = len(all_lines) #
+        total_prompts_in_file = prompt_source.count #
         if total_prompts_in_file == 0: #
             self._notify_status(f"Hiba: A '{file_path}' fájl üres vagy csak üres sorokat tartalmaz.") #
-            return prompts_to_process #
+            return None, None
 
         actual_start_index = start_line - 1 #
         effective_end_index = min(end_line, total_prompts_in_file) #
 
         if actual_start_index < 0: #
             self._notify_status("Hiba: A kezdő sorszám érvénytelen (túl kicsi).") #
-            return prompts_to_process #
+            return None, None
         
         if actual_start_index >= total_prompts_in_file: #
             self._notify_status(f"Hiba: A kezdő sorszám ({start_line}) nagyobb, mint a fájlban lévő promptok száma ({total_prompts_in_file}).") #
-            return prompts_to_process #
+            return None, None
 
         if actual_start_index >= effective_end_index: #
              self._notify_status(f"Hiba: A kezdő sor ({start_line}) nem kisebb, mint a befejező sor ({effective_end_index}) a fájl tartalmához igazítva.") #
-             return prompts_to_process #
+             return None, None
+
+        return prompt_source, effective_end_index
+
+    def load_prompts(self, file_path, start_line, end_line): # <<< MÓDOSÍTOTT METÓDUS
+        prompt_source, effective_end_index = self._open_prompt_range(file_path, start_line, end_line)
+        if prompt_source is None:
+            return []
 
-        selected_prompts = all_lines[actual_start_index:effective_end_index] #
+        selected_prompts = prompt_source.lines(start_line, effective_end_index) #
         
         # <<< ÚJ: Sorszámok eltávolítása
         prompts_without_numbering = []
@@ -82,3 +96,21 @@ class PromptHandler:
         else:
             self._notify_status("Nincsenek feldolgozandó promptok a megadott tartományban.") #
             return []
+
+    def iter_prompts(self, file_path, start_line, end_line, batch_size=64):
+        """
+        Lusta (sor sorszám, prompt) iterátor a tartományra (PromptStream), vagy None hiba esetén.
+        A sorszámozás eltávolítása soronként, olvasáskor történik; a futás közben szerkesztett
+        fájl változásai a még nem olvasott sorokra érvényesülnek.
+        """
+        prompt_source, effective_end_index = self._open_prompt_range(file_path, start_line, end_line)
+        if prompt_source is None:
+            return None
+
+        def report_reload(new_count):
+            self._notify_status(f"A prompt fájl megváltozott futás közben, index frissítve ({new_count} nem üres sor).")
+
+        prompt_stream = PromptStream(prompt_source, start_line, end_line, transform=self._strip_numbering,
+                                     batch_size=batch_size, on_reload=report_reload)
+        self._notify_status(f"{prompt_stream.total} prompt feldolgozása a(z) '{file_path.split('/')[-1]}' fájlból ({start_line}-{effective_end_index}. sor), soronkénti olvasással.")
+        return prompt_stream
@@ -0,0 +1,237 @@
+# core/prompt_source.py
+import io
+import mmap
+import os
+import threading
+
+import numpy as np
+
+INDEX_SUFFIX = ".promptidx.npz" # A sor-index gyorsítótár a prompt fájl mellett
+INDEX_VERSION = 2
+INDEX_CHUNK_BYTES = 1 << 24 # Az index építése ekkora darabokban halad (korlátos memória)
+# ASCII whitespace bájtok (amiket a str.strip() is levág): az ezekből álló sor üresnek számít
+_WHITESPACE_BYTES = np.array([9, 10, 11, 12, 13, 28, 29, 30, 31, 32], dtype=np.uint8)
+
+
+def _line_counts(mask, line_starts, line_ends):
+    """Soronként a maszk igaz bájtjainak száma (kumulatív összeggel, vektorizáltan)."""
+    cumulative = np.concatenate(([0], np.cumsum(mask, dtype=np.int64)))
+    return cumulative[line_ends] - cumulative[line_starts]
+
+
+def _index_block(block, base_offset):
+    """
+    Egy sorhatárra igazított blokk nem üres sorainak (kezdő, záró) bájt pozíciói.
+    A csak whitespace-ből és nem ASCII bájtokból álló sorok (pl. NBSP, U+3000) dekódolva,
+    str.strip()-pel döntenek, így az üresség megegyezik a szöveges feldolgozással.
+    """
+    newline_positions = np.flatnonzero(block == 10)
+    line_starts = np.concatenate(([0], newline_positions + 1))
+    line_ends = np.concatenate((newline_positions, [len(block)]))
+    non_whitespace = ~np.isin(block, _WHITESPACE_BYTES)
+    keep = _line_counts(non_whitespace, line_starts, line_ends) > 0
+    ascii_text_counts = _line_counts(non_whitespace & (block < 128), line_starts, line_ends)
+    for line_index in np.flatnonzero(keep & (ascii_text_counts == 0)):
+        line_bytes = block[line_starts[line_index]:line_ends[line_index]].tobytes()
+        if not line_bytes.decode('utf-8', errors='replace').strip():
+            keep[line_index] = False
+    return line_starts[keep] + base_offset, line_ends[keep] + base_offset
+
+
+def build_line_index(file_path, chunk_bytes=INDEX_CHUNK_BYTES):
+    """A fájl nem üres sorainak (kezdő, záró) bájt pozíciói mmap-en keresztül, két int64 tömbben."""
+    size = os.path.getsize(file_path)
+    if size == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    starts, ends = [], []
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        position = 0
+        while position < size:
+            block_end = min(size, position + chunk_bytes)
+            if block_end < size:
+                last_newline = mapped.rfind(b"\n", position, block_end)
+                if last_newline >= position:
+                    block_end = last_newline + 1
+                else: # A blokknál hosszabb sor: a sor végéig olvasunk
+                    block_end = (mapped.find(b"\n", block_end) + 1) or size
+            block_starts, block_ends = _index_block(np.frombuffer(mapped[position:block_end], dtype=np.uint8), position)
+            starts.append(block_starts)
+            ends.append(block_ends)
+            position = block_end
+    return np.concatenate(starts).astype(np.int64), np.concatenate(ends).astype(np.int64)
+
+
+class PromptSource:
+    """
+    Sor-indexelt prompt fájl olvasó.
+
+    A nem üres sorok bájt pozícióit egyszer építi fel (mmap), és a fájl mellé menti
+    (<fájl>.promptidx.npz, a fájl módosítási ideje és mérete alapján érvényes). A sorszámozás
+    a nem üres sorokra vonatkozik (1-től), ahogy a GUI és a PromptHandler is számol. A darabszám
+    azonnali, egy sor vagy egy tartomány olvasása csak az adott bájt tartományt olvassa be.
+    A fájlt nem tartja nyitva, így futás közben szerkeszthető; az is_stale() / refresh() észleli.
+    """
+
+    def __init__(self, file_path, use_disk_cache=True):
+        self.file_path = file_path
+        self.use_disk_cache = bool(use_disk_cache)
+        self._lock = threading.Lock()
+        self._starts = np.zeros(0, dtype=np.int64)
+        self._ends = np.zeros(0, dtype=np.int64)
+        self._signature = None
+        self.refresh(force=True)
+
+    @property
+    def index_path(self):
+        return self.file_path + INDEX_SUFFIX
+
+    def _current_signature(self):
+        stat_result = os.stat(self.file_path)
+        return int(stat_result.st_mtime_ns), int(stat_result.st_size)
+
+    def _load_cached_index(self, signature):
+        if not self.use_disk_cache or not os.path.exists(self.index_path):
+            return None
+        try:
+            with np.load(self.index_path) as data:
+                meta = data["meta"]
+                if int(meta[0]) != INDEX_VERSION or (int(meta[1]), int(meta[2])) != signature:
+                    return None
+                return data["starts"].astype(np.int64), data["ends"].astype(np.int64)
+        except Exception as e:
+            print(f"PromptSource: Index gyorsítótár nem olvasható ({self.index_path}): {e}")
+            return None
+
+    def _save_cached_index(self, signature, starts, ends):
+        if not self.use_disk_cache:
+            return
+        temporary_path = self.index_path + ".tmp"
+        try:
+            buffer = io.BytesIO()
+            np.savez(buffer, meta=np.array([INDEX_VERSION, signature[0], signature[1]], dtype=np.int64),
+                     starts=starts, ends=ends)
+            with open(temporary_path, 'wb') as f:
+                f.write(buffer.getvalue())
+            os.replace(temporary_path, self.index_path)
+        except Exception as e:
+            print(f"PromptSource: Index gyorsítótár nem menthető ({self.index_path}): {e}")
+
+    def is_stale(self):
+        """True, ha a fájl az index felépítése óta megváltozott (vagy eltűnt)."""
+        try:
+            return self._current_signature() != self._signature
+        except OSError:
+            return True
+
+    def refresh(self, force=False):
+        """Az index újraépítése (vagy betöltése a gyorsítótárból), ha a fájl megváltozott; True, ha frissült."""
+        with self._lock:
+            signature = self._current_signature()
+            if not force and signature == self._signature:
+                return False
+            cached = self._load_cached_index(signature)
+            if cached is None:
+                starts, ends = build_line_index(self.file_path)
+                self._save_cached_index(signature, starts, ends)
+            else:
+                starts, ends = cached
+            self._starts, self._ends, self._signature = starts, ends, signature
+            return True
+
+    @property
+    def count(self):
+        return len(self._starts)
+
+    def __len__(self):
+        return self.count
+
+    def _read_span(self, first_index, last_index):
+        """A [first_index, last_index) nem üres sorok szövege egyetlen bájt tartomány beolvasásával."""
+        with self._lock:
+            starts = self._starts[first_index:last_index]
+            ends = self._ends[first_index:last_index]
+        if len(starts) == 0:
+            return []
+        span_start = int(starts[0])
+        with open(self.file_path, 'rb') as f:
+            f.seek(span_start)
+            data = f.read(int(ends[-1]) - span_start)
+        return [data[int(s) - span_start:int(e) - span_start].decode('utf-8', errors='replace').strip()
+                for s, e in zip(starts, ends)]
+
+    def line(self, line_no):
+        """Az 1-től számozott line_no-adik nem üres sor (None, ha nincs ilyen)."""
+        if line_no < 1 or line_no > self.count:
+            return None
+        return self._read_span(line_no - 1, line_no)[0]
+
+    def lines(self, start_line, end_line):
+        """Az 1-től számozott [start_line, end_line] tartomány sorai (a fájl végére vágva)."""
+        first_index = max(0, int(start_line) - 1)
+        last_index = min(self.count, int(end_line))
+        if first_index >= last_index:
+            return []
+        return self._read_span(first_index, last_index)
+
+
+_sources = {}
+_sources_lock = threading.Lock()
+
+
+def open_prompt_source(file_path):
+    """Megosztott PromptSource a fájlhoz (a GUI és a worker ugyanazt az indexet használja); szükség esetén frissítve."""
+    key = os.path.abspath(file_path)
+    with _sources_lock:
+        source = _sources.get(key)
+        if source is None:
+            source = PromptSource(file_path)
+            _sources[key] = source
+            return source
+    source.refresh()
+    return source
+
+
+class PromptStream:
+    """
+    Lusta (sor sorszám, prompt) iterátor egy PromptSource tartományán.
+
+    Egyszerre csak batch_size sort olvas be, így a memóriahasználat a tartomány méretétől
+    független. Minden prompt előtt ellenőrzi (egy os.stat), hogy a fájl megváltozott-e; ha igen,
+    az index frissül, és a tartomány hátralévő része már az új tartalomból jön (a sorszámok a nem
+    üres sorokra vonatkoznak). A total mindig az aktuális fájlhoz igazított tartomány mérete.
+    """
+
+    def __init__(self, source, start_line, end_line, transform=None, batch_size=64, on_reload=None):
+        self.source = source
+        self.start_line = int(start_line)
+        self.end_line = int(end_line)
+        self.transform = transform
+        self.batch_size = max(1, int(batch_size))
+        self.on_reload = on_reload
+        self.reloads = 0
+
+    @property
+    def total(self):
+        return max(0, min(self.end_line, self.source.count) - self.start_line + 1)
+
+    def __iter__(self):
+        line_no = self.start_line
+        while True:
+            if self.source.is_stale():
+                try:
+                    if self.source.refresh():
+                        self.reloads += 1
+                        if self.on_reload:
+                            self.on_reload(self.source.count)
+                except OSError as e:
+                    print(f"PromptStream: A prompt fájl nem olvasható újra ({self.source.file_path}): {e}")
+                    return
+            last_line = min(self.end_line, self.source.count, line_no + self.batch_size - 1)
+            if line_no > last_line:
+                return
+            batch_start = line_no
+            for offset, text in enumerate(self.source.lines(batch_start, last_line)):
+                if offset and self.source.is_stale():
+                    break # A köteg maradéka már a régi tartalom: újraolvasás a frissített indexből
+                yield batch_start + offset, self.transform(text) if self.transform else text
+                line_no = batch_start + offset + 1
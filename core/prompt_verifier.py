@@ -0,0 +1,97 @@
+# core/prompt_verifier.py
+import difflib
+import re
+import time
+
+from utils.frame_diff import FrameChangeDetector
+
+
+def _normalize(text):
+    return re.sub(r"[^0-9a-záéíóöőúüű]+", "", (text or "").lower())
+
+
+def ocr_match_score(ocr_text, prompt_text):
+    """
+    A felismert szöveg mekkora része található meg (sorrendben) a promptban, 0..1.
+    A mező hosszú promptnál csak egy részletet mutat, ezért a felismert szöveghez viszonyítunk.
+    """
+    seen = _normalize(ocr_text)
+    if not seen:
+        return 0.0
+    matcher = difflib.SequenceMatcher(None, seen, _normalize(prompt_text), autojunk=False)
+    return sum(block.size for block in matcher.get_matching_blocks()) / float(len(seen))
+
+
+class PromptEntryVerifier:
+    """
+    A prompt bevitel ellenőrzése a generálás gomb megnyomása előtt.
+
+    Olcsó út: a prompt mező régiójának képe a bevitel előtt (arm) és után (verify) összevetve;
+    ha változott, a bevitel rendben. OCR csak akkor fut, ha a régió nem változott (gyanús:
+    elveszett fókusz, de lehet ugyanaz a szöveg újra bevive is), vagy ha be van kapcsolva
+    (ocr_sample_every > 0), minden N-edik bevitelnél mintavételként. Az OCR olvasót nem várja
+    meg: ha még töltődik vagy nem elérhető, az eredmény bizonytalan, és a bevitel elfogadott.
+    """
+
+    def __init__(self, screen_capture, reader_getter=None, ocr_sample_every=0, min_ocr_score=0.6,
+                 pixel_tolerance=12, changed_ratio_threshold=0.002):
+        self.screen_capture = screen_capture
+        self.reader_getter = reader_getter
+        self.ocr_sample_every = int(ocr_sample_every)
+        self.min_ocr_score = float(min_ocr_score)
+        self._detector = FrameChangeDetector(downsample=2, grayscale=True, pixel_tolerance=pixel_tolerance,
+                                             changed_ratio_threshold=changed_ratio_threshold)
+        self._region = None
+        self._arm_ms = 0.0
+        self.verifications = 0
+        self.ocr_runs = 0
+        self.failures = 0
+        self.total_overhead_ms = 0.0
+
+    def arm(self, region):
+        """A mező képe a bevitel előtt (régió: left, top, width, height)."""
+        start_time = time.perf_counter()
+        self._region = tuple(int(v) for v in region)
+        self._detector.reset()
+        self._detector.set_reference(self.screen_capture.grab(self._region))
+        self._arm_ms = (time.perf_counter() - start_time) * 1000
+
+    def _ocr_text(self, frame):
+        reader = self.reader_getter() if self.reader_getter else None
+        if reader is None:
+            return None
+        self.ocr_runs += 1
+        results = reader.readtext(frame, cache_region=self._region, detail=1, paragraph=False)
+        return " ".join(str(result[1]) for result in results if len(result) >= 2)
+
+    def verify(self, prompt_text):
+        """{'ok', 'changed', 'ocr_used', 'score', 'inconclusive', 'elapsed_ms'} összegzés a bevitt prompt ellenőrzéséről."""
+        start_time = time.perf_counter()
+        self.verifications += 1
+        frame = self.screen_capture.grab(self._region)
+        changed = bool(self._detector.has_changed(frame))
+        sample_due = self.ocr_sample_every > 0 and self.verifications % self.ocr_sample_every == 0
+        result = {"ok": changed, "changed": changed, "ocr_used": False, "score": None, "inconclusive": False}
+        if not changed or sample_due:
+            try:
+                ocr_text = self._ocr_text(frame)
+            except Exception as e:
+                print(f"PromptEntryVerifier: OCR hiba az ellenőrzéskor: {e}")
+                ocr_text = None
+            if ocr_text is not None:
+                score = ocr_match_score(ocr_text, prompt_text)
+                result.update({"ocr_used": True, "score": round(score, 2), "ok": score >= self.min_ocr_score})
+            elif not changed:
+                # Nincs OCR (még töltődik / nem elérhető): a változatlan régió nem bizonyítja a hibát
+                result.update({"ok": True, "inconclusive": True})
+                print("PromptEntryVerifier: A régió nem változott és nincs OCR olvasó, az ellenőrzés bizonytalan (elfogadva).")
+        if not result["ok"]:
+            self.failures += 1
+        result["elapsed_ms"] = round((time.perf_counter() - start_time) * 1000 + self._arm_ms, 1)
+        self.total_overhead_ms += result["elapsed_ms"]
+        return result
+
+    def describe(self):
+        average_ms = self.total_overhead_ms / self.verifications if self.verifications else 0.0
+        return (f"{self.verifications} ellenőrzés, {self.ocr_runs} OCR, {self.failures} eltérés, "
+                f"átlag többletidő {average_ms:.0f} ms")
@@ -5,14 +5,6 @@ import os
 import json
 import numpy as np
 
-easyocr = None 
-try:
-    import easyocr 
-except ImportError:
-    print("FIGYELEM: Az 'easyocr' könyvtár nincs telepítve. Telepítsd: pip install easyocr")
-except Exception as e: 
-    print(f"FIGYELEM: Hiba történt az 'easyocr' könyvtár importálása közben: {e}")
-
 try:
     from utils.ui_scanner import (find_prompt_area_dynamically,
                                   find_generate_button_dynamic,
@@ -26,7 +18,12 @@ except ImportError:
     get_screen_size_util = lambda: pyautogui.size() # Fallback
     GENERATE_BUTTON_COLOR_TARGET = None
 
+from utils.screen_capture import ScreenCapture, get_default_screen_capture, set_default_screen_capture
+from utils.screen_index import ScreenIndex
+from utils.template_registry import TemplateRegistry
 
+from .timing_model import TimingModel
+from .ocr_service import get_ocr_service
 from .page_initializer import PageInitializer
 from .prompt_executor import PromptExecutor
 from .image_flow_handler import ImageFlowHandler
@@ -44,6 +41,7 @@ class PyAutoGuiAutomator:
             umkgl_solutions_folder = os.path.join(documents_path, "UMKGL Solutions")
             app_specific_folder = os.path.join(umkgl_solutions_folder, "Automatikus-Kepgenerator")
             self.config_dir = os.path.join(app_specific_folder, "Config")
+            self.data_dir = os.path.join(app_specific_folder, "Data") # Futási naplók, előzmények
             
             self.script_dir = os.path.dirname(os.path.abspath(__file__))
             self.project_root = os.path.dirname(self.script_dir)
@@ -51,6 +49,8 @@ class PyAutoGuiAutomator:
 
             if not os.path.exists(self.config_dir):
                 os.makedirs(self.config_dir, exist_ok=True)
+            if not os.path.exists(self.data_dir):
+                os.makedirs(self.data_dir, exist_ok=True)
             if not os.path.exists(self.assets_dir): # Assets mappa létrehozása, ha hiányzik
                 os.makedirs(self.assets_dir, exist_ok=True)
 
@@ -59,9 +59,11 @@ class PyAutoGuiAutomator:
             self.script_dir = os.path.dirname(os.path.abspath(__file__))
             self.project_root = os.path.dirname(self.script_dir)
             self.config_dir = os.path.join(self.project_root, "config") # Fallback config
+            self.data_dir = os.path.join(self.project_root, "data") # Fallback data
             self.assets_dir = os.path.join(self.project_root, "automation_assets") # Fallback assets
             try:
                 if not os.path.exists(self.config_dir): os.makedirs(self.config_dir, exist_ok=True)
+                if not os.path.exists(self.data_dir): os.makedirs(self.data_dir, exist_ok=True)
                 if not os.path.exists(self.assets_dir): os.makedirs(self.assets_dir, exist_ok=True)
             except Exception as e_mkdir_fallback:
                 self._notify_status(f"Hiba a fallback config/assets mappa létrehozásakor: {e_mkdir_fallback}", is_error=True)
@@ -71,21 +73,24 @@ class PyAutoGuiAutomator:
         # self.ui_coords_file_manual = os.path.join(self.config_dir, "ui_coordinates_manual.json")
 
 
-        self.ocr_reader = None
-        if easyocr:
-            try:
-                self._notify_status("EasyOCR olvasó inicializálása ('en', 'hu')...")
-                self.ocr_reader = easyocr.Reader(['en', 'hu'], gpu=False) # GPU False alapértelmezetten
-                self._notify_status("EasyOCR olvasó sikeresen inicializálva.")
-            except Exception as e_ocr_init:
-                self._notify_status(f"Hiba az EasyOCR olvasó inicializálásakor: {e_ocr_init}", is_error=True)
-                self.ocr_reader = None 
-        else:
-            self._notify_status("EasyOCR modul nem érhető el, OCR funkciók korlátozottak (PyAutoGuiAutomator init).", is_error=False)
+        # Az EasyOCR olvasót a megosztott OcrService tölti be háttérszálon (a main.py már az induláskor elindítja).
+        # Az ocr_reader tulajdonság első használatkor várja meg a betöltést.
+        self.ocr_service = get_ocr_service()
+        self.ocr_service.start()
+        self._notify_status(f"EasyOCR olvasó: {self.ocr_service.status_text()}.")
 
 
         pyautogui.FAILSAFE = True
         pyautogui.PAUSE = 0.1 # Alapértelmezett PyAutoGUI szünet
+
+        self.screen_capture = self._create_screen_capture()
+        self.timing_model = TimingModel(
+            store_path=os.path.join(self.data_dir, "timing_model.json"),
+            mode=self._get_setting("timing_model_mode", "apply"),
+            percentile=self._get_setting("timing_model_percentile", 0.9),
+            safety_margin=self._get_setting("timing_model_safety_margin", 1.25),
+            min_samples=self._get_setting("timing_model_min_samples", 5),
+        )
         
         screen_util_func = get_screen_size_util if 'get_screen_size_util' in globals() and callable(globals()['get_screen_size_util']) else None
         
@@ -101,6 +106,9 @@ class PyAutoGuiAutomator:
             
         # A self.coordinates-t a _load_coordinates fogja feltölteni a megfelelő fájlból.
         self.last_known_prompt_rect = None # Ezt is a _load_coordinates után állítjuk be
+        self.screen_index = None # Az utolsó teljes képernyős UI elem index (ScreenIndex)
+        # Sablonképek egyszeri betöltése és előfeldolgozása (futás közben csak név szerinti lekérdezés)
+        self.template_registry = TemplateRegistry.discover(self.project_root)
 
         self.page_initializer = PageInitializer(self)
         self.prompt_executor = PromptExecutor(self)
@@ -108,6 +116,51 @@ class PyAutoGuiAutomator:
         self._notify_status("PyAutoGuiAutomator sikeresen inicializálva.")
 
 
+    def _get_setting(self, key, default_value=None):
+        if self.process_controller and hasattr(self.process_controller, 'get_setting'):
+            return self.process_controller.get_setting(key, default_value)
+        return default_value
+
+    @property
+    def ocr_reader(self):
+        """A megosztott EasyOCR olvasó; ha még töltődik, megvárja (legfeljebb ocr_load_timeout_s-ig)."""
+        if not self.ocr_service.is_ready():
+            if not self.ocr_service.is_available():
+                return None
+            self._notify_status("EasyOCR olvasó még töltődik, várakozás...")
+        reader = self.ocr_service.get_reader(timeout_s=self._get_setting("ocr_load_timeout_s", 180))
+        if reader is not None and hasattr(reader, 'set_stop_check'):
+            # Külön processzes OCR: a válaszra várakozás a stop kérésre megszakad
+            reader.set_stop_check(self._check_for_stop_request)
+        return reader
+
+    def get_screen_index(self, refresh=False, max_age_s=None):
+        """
+        A megosztott ScreenIndex; újraépül, ha refresh=True, ha még nincs, vagy ha régebbi max_age_s-nél
+        (alapértelmezés: screen_index_max_age_s beállítás). Elrendezés-változás után refresh=True-val hívd.
+        """
+        if max_age_s is None:
+            max_age_s = self._get_setting("screen_index_max_age_s", 10)
+        if refresh or self.screen_index is None or self.screen_index.age_s() > max_age_s:
+            self.screen_index = ScreenIndex.capture(self.screen_capture)
+            print(f"PyAutoGuiAutomator DEBUG: Képernyő index frissítve: {self.screen_index.describe()}")
+        return self.screen_index
+
+    def _create_screen_capture(self):
+        """A beállított backenddel létrehozza a megosztott képernyő-rögzítőt (fallback: auto)."""
+        backend_name = self._get_setting("screen_capture_backend", "auto")
+        try:
+            if backend_name == "fake":
+                capture = ScreenCapture(backend="fake", frames_dir=self._get_setting("screen_capture_fake_frames_dir", ""))
+            else:
+                capture = ScreenCapture(backend=backend_name)
+            set_default_screen_capture(capture)
+        except Exception as e_capture:
+            self._notify_status(f"Figyelmeztetés: '{backend_name}' képernyő-rögzítő nem hozható létre ({e_capture}), automatikus backend használata.", is_error=True)
+            capture = get_default_screen_capture()
+        self._notify_status(f"Képernyő-rögzítő backend: {capture.backend_name}")
+        return capture
+
     # *** ÚJ SEGÉDFÜGGVÉNY ***
     def _determine_coords_file_path(self, use_manual_coords_flag=False):
         """Meghatározza a használandó koordinátafájl elérési útját."""
@@ -253,7 +306,8 @@ class PyAutoGuiAutomator:
             if not is_manual_run: # Csak automatikus módban futtatunk dinamikus keresést itt
                 self._notify_status("Automatikus mód: Dinamikus prompt mező keresés INDUL...", is_error=False)
                 if find_prompt_area_dynamically: # Ellenőrizzük, hogy elérhető-e
-                    rect = find_prompt_area_dynamically(self.screen_width, self.screen_height, notify_callback=self._notify_status)
+                    rect = find_prompt_area_dynamically(self.screen_width, self.screen_height, notify_callback=self._notify_status,
+                                                        screen_index=self.get_screen_index(refresh=True))
                     if rect:
                         self._notify_status(f"Dinamikusan talált prompt terület: {rect}. Kattintási pont számítása és koordináták frissítése/mentése...", is_error=False)
                         self.last_known_prompt_rect = rect
@@ -314,6 +368,7 @@ class PyAutoGuiAutomator:
 
     def process_single_prompt(self, prompt_text):
         self.stop_requested = False 
+        self.image_flow_handler.last_download_missing = False
         if self._check_for_stop_request(): return False
 
         if not self.page_is_prepared:
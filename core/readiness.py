@@ -0,0 +1,169 @@
+# core/readiness.py
+import time
+
+import numpy as np
+
+from utils.frame_diff import FrameChangeDetector
+from utils.template_matcher import TemplateMatcher, load_template
+
+
+def wait_until(probe, timeout_s, poll_s=0.25, check_stop=None, sleep_fn=None, progress_fn=None):
+    """
+    Addig hívja a probe()-ot, amíg igazat nem ad, vagy le nem jár a timeout_s.
+    A check_stop() igaz értékénél azonnal kilép; a probe kivételét hamis eredménynek veszi.
+    probe=None esetén csak vár (stop kérésre figyelve). A progress_fn(eltelt_s, timeout_s)
+    minden sikertelen lekérdezés után meghívódik.
+    Visszatérés: ("ready" | "timeout" | "stopped", eltelt másodpercek)
+    """
+    if sleep_fn is None:
+        sleep_fn = time.sleep
+    start_time = time.time()
+    while True:
+        elapsed_s = time.time() - start_time
+        if check_stop and check_stop():
+            return "stopped", elapsed_s
+        is_ready = False
+        if probe is not None:
+            try:
+                is_ready = bool(probe())
+            except Exception as e:
+                print(f"Readiness: Próba hiba ({getattr(probe, 'name', probe)}): {e}")
+            elapsed_s = time.time() - start_time
+        if is_ready:
+            return "ready", elapsed_s
+        if elapsed_s >= timeout_s:
+            return "timeout", elapsed_s
+        if progress_fn:
+            progress_fn(elapsed_s, timeout_s)
+        sleep_fn(max(0.0, min(poll_s, timeout_s - elapsed_s)))
+
+
+class RegionStableProbe:
+    """
+    Igaz, ha a régió (None = teljes képernyő) legalább stable_for_s ideje nem változott.
+    require_change_first=True esetén előbb változást is látnia kell (pl. új oldal kirajzolása),
+    így egy még el sem kezdett betöltés nem számít "stabilnak".
+    """
+
+    def __init__(self, screen_capture, region=None, stable_for_s=1.0, require_change_first=False,
+                 downsample=4, pixel_tolerance=12, changed_ratio_threshold=0.002):
+        self.name = "region-stable"
+        self.screen_capture = screen_capture
+        self.region = region
+        self.stable_for_s = float(stable_for_s)
+        self.require_change_first = bool(require_change_first)
+        self.detector = FrameChangeDetector(downsample=downsample, grayscale=True,
+                                            pixel_tolerance=pixel_tolerance,
+                                            changed_ratio_threshold=changed_ratio_threshold)
+        self.seen_change = False
+        self.last_change_time = None
+
+    def __call__(self):
+        now = time.time()
+        ratio = self.detector.update(self.screen_capture.grab(self.region))
+        if ratio is None:
+            self.last_change_time = now
+            return False
+        if self.detector.is_change(ratio):
+            self.seen_change = True
+            self.last_change_time = now
+            return False
+        if self.require_change_first and not self.seen_change:
+            return False
+        return now - self.last_change_time >= self.stable_for_s
+
+
+class PixelColorProbe:
+    """Igaz, ha az (x, y) pixel színe csatornánként legfeljebb tolerance eltéréssel megegyezik a várt RGB színnel."""
+
+    def __init__(self, screen_capture, x, y, color, tolerance=10):
+        self.name = "pixel-color"
+        self.screen_capture = screen_capture
+        self.region = (int(x), int(y), 1, 1)
+        self.color = np.array(color[:3], dtype=np.int16)
+        self.tolerance = int(tolerance)
+
+    def __call__(self):
+        pixel = self.screen_capture.grab(self.region)[0, 0, :3].astype(np.int16)
+        return bool(np.all(np.abs(pixel - self.color) <= self.tolerance))
+
+
+class TemplatePresentProbe:
+    """
+    Igaz, ha a sablonkép megtalálható a régióban (TemplateMatcher, egyetlen képernyőkép alapján).
+    A template lehet előfeldolgozott Template (pl. a TemplateRegistry-ből) vagy egy képfájl útja.
+    """
+
+    def __init__(self, screen_capture, template, region=None, confidence=0.8, matcher=None):
+        self.name = "template-present"
+        self.screen_capture = screen_capture
+        self.template_path = template if isinstance(template, str) else None
+        self.region = region
+        self.confidence = confidence
+        self.matcher = matcher or TemplateMatcher()
+        self._template = None if isinstance(template, str) else template
+        self.last_location = None
+
+    def __call__(self):
+        if self._template is None:
+            self._template = load_template(self.template_path)
+        match = self.matcher.locate_on_screen(self._template, self.screen_capture, region=self.region,
+                                              threshold=self.confidence)
+        if match is None:
+            return False
+        self.last_location = match.as_box()
+        return True
+
+
+class OcrTextPresentProbe:
+    """
+    Igaz, ha a texts bármelyike (kis- és nagybetű érzéketlenül) olvasható a régióban.
+    Az OCR drága, ezért legfeljebb min_interval_s-enként fut; közben az előző eredményt adja.
+    A reader_getter hívható, így a még betöltés alatt álló OCR olvasó is átadható (None = nincs kész);
+    az olvasó az OcrService CachingOcrReader-e, így a régió a gyorsítótár kulcsába kerül (cache_region).
+    """
+
+    def __init__(self, screen_capture, reader_getter, texts, region=None, min_confidence=0.3, min_interval_s=1.0):
+        self.name = "ocr-text-present"
+        self.screen_capture = screen_capture
+        self.reader_getter = reader_getter
+        self.texts = [texts] if isinstance(texts, str) else list(texts)
+        self.region = region
+        self.min_confidence = float(min_confidence)
+        self.min_interval_s = float(min_interval_s)
+        self._last_run = 0.0
+        self.last_match = None
+
+    def __call__(self):
+        now = time.time()
+        if now - self._last_run < self.min_interval_s:
+            return False
+        reader = self.reader_getter()
+        if reader is None:
+            return False
+        self._last_run = now
+        frame = self.screen_capture.grab(self.region)
+        for (_bbox, text, prob) in reader.readtext(frame, cache_region=self.region, detail=1, paragraph=False):
+            if prob < self.min_confidence:
+                continue
+            for target in self.texts:
+                if target.lower() in text.strip().lower():
+                    self.last_match = (target, text.strip(), prob)
+                    return True
+        return False
+
+
+class AnyProbe:
+    """Igaz, ha bármelyik próba igaz (sorrendben értékel, az első találatnál megáll)."""
+
+    def __init__(self, *probes):
+        self.name = "any(" + ", ".join(getattr(p, 'name', '?') for p in probes) + ")"
+        self.probes = probes
+        self.last_ready = None
+
+    def __call__(self):
+        for probe in self.probes:
+            if probe():
+                self.last_ready = probe
+                return True
+        return False
@@ -0,0 +1,147 @@
+# core/text_injection.py
+import time
+
+import pyautogui
+
+try:
+    import pyperclip
+except ImportError:
+    pyperclip = None
+    print("FIGYELEM: A 'pyperclip' könyvtár nincs telepítve. A prompt beillesztése vágólapról nem elérhető (pip install pyperclip).")
+
+
+class TextInjectionError(Exception):
+    """A szöveg bevitele az adott stratégiával nem sikerült (a következő stratégia jön)."""
+    pass
+
+
+class ClipboardPasteInjector:
+    """
+    Bevitel vágólapon keresztül: a szöveg a vágólapra kerül, visszaolvasással ellenőrizzük,
+    majd Ctrl+V. Az idő nem függ a prompt hosszától, és az ékezetes karakterek is pontosan
+    átmennek. A böngésző a vágólapot aszinkron olvassa, ezért a korábbi tartalom nem a
+    beillesztés után, hanem csak a restore() hívásra áll vissza (a bevitel ellenőrzése után).
+    """
+
+    name = "clipboard"
+
+    def __init__(self, paste_keys=('ctrl', 'v'), settle_s=0.1, restore_clipboard=True):
+        self.paste_keys = tuple(paste_keys)
+        self.settle_s = float(settle_s)
+        self.restore_clipboard = bool(restore_clipboard)
+        self._saved_clipboard = None # A visszaállításra váró korábbi vágólap tartalom
+        self._pasted_at = None
+
+    def is_available(self):
+        return pyperclip is not None
+
+    def inject(self, text):
+        if pyperclip is None:
+            raise TextInjectionError("pyperclip nincs telepítve")
+        try:
+            if self.restore_clipboard and self._saved_clipboard is None:
+                # Ismételt bevitelnél a vágólapon már a prompt van: az eredeti tartalom marad mentve
+                self._saved_clipboard = pyperclip.paste()
+            pyperclip.copy(text)
+            if pyperclip.paste() != text:
+                raise TextInjectionError("a vágólap tartalma nem egyezik a prompttal")
+        except TextInjectionError:
+            raise
+        except Exception as e:
+            raise TextInjectionError(f"vágólap hiba: {e}")
+        pyautogui.hotkey(*self.paste_keys)
+        self._pasted_at = time.monotonic()
+        time.sleep(self.settle_s) # A böngésző a beillesztést aszinkron dolgozza fel
+
+    def restore(self, delay_s=0.0):
+        """A korábbi vágólap tartalom visszaállítása, legkorábban delay_s másodperccel a beillesztés után."""
+        if self._saved_clipboard is None:
+            return
+        if self._pasted_at is not None:
+            remaining_s = delay_s - (time.monotonic() - self._pasted_at)
+            if remaining_s > 0:
+                time.sleep(remaining_s)
+        try:
+            pyperclip.copy(self._saved_clipboard)
+        except Exception as e:
+            print(f"ClipboardPasteInjector: A korábbi vágólap tartalom visszaállítása sikertelen: {e}")
+        finally:
+            self._saved_clipboard = None
+            self._pasted_at = None
+
+
+class TypewriteInjector:
+    """Karakterenkénti gépelés pyautogui.typewrite-tal (a korábbi viselkedés, tartalék stratégia)."""
+
+    name = "typewrite"
+
+    def __init__(self, interval_s=0.01):
+        self.interval_s = float(interval_s)
+
+    def is_available(self):
+        return True
+
+    def inject(self, text):
+        if any(ord(character) > 127 for character in text):
+            print("TypewriteInjector FIGYELEM: A prompt ékezetes / nem ASCII karaktert tartalmaz, a typewrite ezeket kihagyhatja.")
+        pyautogui.typewrite(text, interval=self.interval_s)
+
+
+INJECTORS = {
+    ClipboardPasteInjector.name: ClipboardPasteInjector,
+    TypewriteInjector.name: TypewriteInjector,
+}
+
+
+class TextInjector:
+    """
+    Szövegbevitel stratégiák sorrendjével: az első elérhető és sikeres stratégia nyer,
+    hiba esetén a következő jön. Minden bevitel ideje mérve van (stratégiánkénti statisztika).
+    """
+
+    def __init__(self, strategies):
+        self.strategies = list(strategies)
+        self.stats = {}
+        self.last_result = None
+
+    @classmethod
+    def from_settings(cls, method="clipboard", typewrite_interval_s=0.01):
+        """A beállított módszer elöl, a typewrite mindig tartalékként a végén."""
+        strategies = []
+        if method in INJECTORS and method != TypewriteInjector.name:
+            strategies.append(INJECTORS[method]())
+        strategies.append(TypewriteInjector(interval_s=typewrite_interval_s))
+        return cls(strategies)
+
+    def inject(self, text):
+        """A szöveg bevitele; visszaadja a {'strategy', 'elapsed_ms', 'fallback', 'errors'} összegzést."""
+        errors = []
+        for index, strategy in enumerate(self.strategies):
+            if not strategy.is_available():
+                continue
+            start_time = time.perf_counter()
+            try:
+                strategy.inject(text)
+            except TextInjectionError as e:
+                errors.append(f"{strategy.name}: {e}")
+                continue
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            strategy_stats = self.stats.setdefault(strategy.name, {"count": 0, "total_ms": 0.0, "chars": 0})
+            strategy_stats["count"] += 1
+            strategy_stats["total_ms"] += elapsed_ms
+            strategy_stats["chars"] += len(text)
+            self.last_result = {"strategy": strategy.name, "elapsed_ms": round(elapsed_ms, 1),
+                                "fallback": index > 0, "errors": errors}
+            return self.last_result
+        raise TextInjectionError("; ".join(errors) or "nincs elérhető bevitel stratégia")
+
+    def restore_clipboard(self, delay_s=0.0):
+        """A vágólapot használó stratégiák visszaállítják a korábbi tartalmat (a bevitel ellenőrzése után hívandó)."""
+        for strategy in self.strategies:
+            if hasattr(strategy, "restore"):
+                strategy.restore(delay_s=delay_s)
+
+    def describe(self):
+        parts = [f"{name}: {s['count']}x, átlag {s['total_ms'] / s['count']:.0f} ms"
+                 for name, s in self.stats.items() if s["count"]]
+        return ", ".join(parts) if parts else "még nem volt bevitel"
@@ -0,0 +1,168 @@
+# core/timing_model.py
+import json
+import os
+import threading
+
+from .readiness import wait_until
+
+
+class TimingModel:
+    """
+    Tanult időzítési modell a pipeline fix várakozásai helyett.
+
+    Szakaszonként (pl. "browser_load", "tool_open", "generation") tárolja a ténylegesen
+    mért időtartamokat egy helyi JSON fájlban, és ezekből percentilis alapú, biztonsági
+    szorzóval megnövelt várakozási időt javasol. A javaslat soha nem hosszabb a szakasz
+    eredeti (alapértelmezett) várakozásánál, és elég minta nélkül az alapértelmezett marad.
+
+    Módok:
+      - "off":     mindig az alapértelmezett várakozás, nincs rögzítés
+      - "suggest": rögzít és javasol (naplóz), de az alapértelmezett ideig vár
+      - "apply":   rögzít, és a javasolt időt alkalmazza
+
+    A wait() minden módban visszatér, ha a megadott készenléti jelzés (ready_check) teljesül
+    (de legkorábban min_s után); ilyenkor a készenlétig eltelt idő új mintaként rögzül.
+    Ha a jelzés a (tanult) határidőn belül nem jön meg, az is mintaként rögzül a határidő értékével
+    (cenzorált minta), és amíg a következő készenlét nem mérhető, a szakasz az alapértelmezett
+    ideig vár; így a modell a lassuló szakaszokhoz is felfelé igazodik, nem csak rövidül.
+    """
+
+    MODES = ("off", "suggest", "apply")
+
+    def __init__(self, store_path=None, mode="apply", percentile=0.9, safety_margin=1.25,
+                 min_samples=5, max_samples=200):
+        self.store_path = store_path
+        self.mode = mode if mode in self.MODES else "apply"
+        self.percentile = float(percentile)
+        self.safety_margin = float(safety_margin)
+        self.min_samples = int(min_samples)
+        self.max_samples = int(max_samples)
+        self._stages = {}
+        self._censored = {} # Szakaszonként az egymást követő cenzorált (határidőig ki nem váró) várakozások száma
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.store_path or not os.path.exists(self.store_path):
+            return
+        try:
+            with open(self.store_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            stages = data.get("stages", {}) if isinstance(data, dict) else {}
+            for stage, samples in stages.items():
+                if isinstance(samples, list):
+                    self._stages[stage] = [float(s) for s in samples if isinstance(s, (int, float)) and s >= 0][-self.max_samples:]
+            censored = data.get("censored", {}) if isinstance(data, dict) else {}
+            self._censored = {stage: int(count) for stage, count in censored.items() if isinstance(count, int) and count > 0}
+            print(f"TimingModel: Időzítési előzmények betöltve ({self.store_path}): {', '.join(f'{k}={len(v)}' for k, v in self._stages.items()) or 'üres'}")
+        except Exception as e:
+            print(f"TimingModel: Hiba az időzítési előzmények betöltésekor ({self.store_path}): {e}")
+            self._stages = {}
+
+    def _save(self):
+        if not self.store_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.store_path), exist_ok=True)
+            with open(self.store_path, 'w', encoding='utf-8') as f:
+                json.dump({"stages": self._stages, "censored": self._censored}, f, indent=2)
+        except Exception as e:
+            print(f"TimingModel: Hiba az időzítési előzmények mentésekor ({self.store_path}): {e}")
+
+    def save(self):
+        with self._lock:
+            self._save()
+
+    def samples(self, stage):
+        """A szakasz mintáinak listája (élő referencia, ne módosítsd kívülről)."""
+        with self._lock:
+            return self._stages.setdefault(stage, [])
+
+    def record(self, stage, duration_s, persist=True, censored=False, force=False):
+        """
+        Egy mért időtartam. censored=True: a készenléti jelzés a várakozás végéig nem jött meg, a valódi
+        idő ennél hosszabb; a határidő értéke mintaként kerül be, és a következő készenlétig az
+        alapértelmezett várakozás érvényes (suggest). force=True: "off" módban is rögzít (a közös tárat
+        használó, saját kapcsolóval rendelkező komponensek, pl. az AdaptivePollScheduler).
+        """
+        if (self.mode == "off" and not force) or duration_s is None or duration_s < 0:
+            return
+        with self._lock:
+            samples = self._stages.setdefault(stage, [])
+            samples.append(round(float(duration_s), 3))
+            if len(samples) > self.max_samples:
+                del samples[:len(samples) - self.max_samples]
+            if censored:
+                self._censored[stage] = self._censored.get(stage, 0) + 1
+            else:
+                self._censored.pop(stage, None)
+            if persist:
+                self._save()
+
+    def _percentile(self, samples, q):
+        ordered = sorted(samples)
+        position = (len(ordered) - 1) * min(max(q, 0.0), 1.0)
+        lower = int(position)
+        upper = min(lower + 1, len(ordered) - 1)
+        return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+    def suggest(self, stage, default_s, min_s=0.0):
+        """
+        Percentilis * biztonsági szorzó, [min_s, default_s] közé szorítva; kevés mintánál, vagy ha az
+        utolsó várakozás cenzorált volt (a jelzés a tanult határidő után jönne), default_s.
+        """
+        with self._lock:
+            samples = list(self._stages.get(stage, []))
+            censored = self._censored.get(stage, 0)
+        if len(samples) < self.min_samples or censored:
+            return default_s
+        suggested = self._percentile(samples, self.percentile) * self.safety_margin
+        return min(default_s, max(min_s, suggested))
+
+    def effective_wait(self, stage, default_s, min_s=0.0):
+        if self.mode == "apply":
+            return self.suggest(stage, default_s, min_s)
+        return default_s
+
+    def describe(self, stage, default_s, min_s=0.0):
+        with self._lock:
+            sample_count = len(self._stages.get(stage, []))
+            censored = self._censored.get(stage, 0)
+        suggested = self.suggest(stage, default_s, min_s)
+        censored_text = f", {censored} cenzorált" if censored else ""
+        return f"'{stage}': alapértelmezett {default_s:.1f}s, javasolt {suggested:.1f}s ({sample_count} minta{censored_text}, mód: {self.mode})"
+
+    def wait(self, stage, default_s, ready_check=None, check_stop=None, poll_s=0.25, min_s=0.0,
+             sleep_fn=None, progress_fn=None):
+        """
+        Legfeljebb az effektív ideig vár (readiness.wait_until), de visszatér, ha a ready_check()
+        igazat ad (ilyenkor az eltelt időt mintaként rögzíti), vagy ha a check_stop() igazat ad.
+        A "ready" visszatérés sem korábbi min_s-nél: a szakasz alsó korlátja a korai készenlét
+        esetén is érvényes. A progress_fn(eltelt_s, cél_s) minden lekérdezéskor meghívódik.
+        Visszatérés: ("ready" | "elapsed" | "stopped", eltelt másodpercek)
+        """
+        target_s = self.effective_wait(stage, default_s, min_s)
+        outcome, elapsed_s = wait_until(ready_check, target_s, poll_s=poll_s, check_stop=check_stop,
+                                        sleep_fn=sleep_fn, progress_fn=progress_fn)
+        if outcome == "timeout":
+            if ready_check is not None:
+                self.record(stage, elapsed_s, censored=True) # A jelzés nem jött meg: a valódi idő ennél hosszabb
+            return "elapsed", elapsed_s
+        if outcome == "ready":
+            self.record(stage, elapsed_s) # A valódi készenléti idő a minta, a min_s-ig várás nem
+            if elapsed_s < min_s:
+                floor_outcome, floor_elapsed_s = wait_until(None, min_s - elapsed_s, poll_s=poll_s,
+                                                            check_stop=check_stop, sleep_fn=sleep_fn)
+                elapsed_s += floor_elapsed_s
+                if floor_outcome == "stopped":
+                    return "stopped", elapsed_s
+        return outcome, elapsed_s
+
+    def summary(self):
+        """Rövid, naplózható összegzés szakaszonként (mintaszám, medián, p90)."""
+        with self._lock:
+            stages = {k: list(v) for k, v in self._stages.items() if v}
+        parts = []
+        for stage, samples in sorted(stages.items()):
+            parts.append(f"{stage}: n={len(samples)}, medián={self._percentile(samples, 0.5):.1f}s, p90={self._percentile(samples, 0.9):.1f}s")
+        return "; ".join(parts) if parts else "nincs mért adat"
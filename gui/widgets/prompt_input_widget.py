@@ -1,10 +1,12 @@
 # gui/widgets/prompt_input_widget.py
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QPushButton,
                                QLineEdit, QSpinBox, QHBoxLayout, QFileDialog,
-                               QListWidget, QSizePolicy)
+                               QListView, QSizePolicy)
 from PySide6.QtCore import Qt, Signal
 import os
 
+from .prompt_list_model import PromptListModel, PromptSourceLoader
+
 class PromptInputWidget(QWidget):
     manual_mode_requested = Signal()
     # *** ÚJ SIGNAL ***
@@ -19,6 +21,11 @@ class PromptInputWidget(QWidget):
         self.layout = QVBoxLayout(self)
         self.layout.setSpacing(10)
         self.selected_file_path = "" # Inicializáljuk itt
+        self._pending_line_range = None # Mentett tartomány, ami a fájl betöltése (sorszám ismerete) után kerül alkalmazásra
+        self._loading = False
+        self.prompt_source_loader = PromptSourceLoader(self)
+        self.prompt_source_loader.loaded.connect(self._on_prompt_source_loaded)
+        self.prompt_source_loader.failed.connect(self._on_prompt_source_failed)
 
         # --- 1. Fájl kiválasztása ---
         self.file_path_label = QLabel("Prompt fájl (.txt): Még nincs kiválasztva")
@@ -56,16 +63,19 @@ class PromptInputWidget(QWidget):
         self.prompt_list_label = QLabel("Promptok:") 
         self.layout.addWidget(self.prompt_list_label)
 
-        self.prompt_list_widget = QListWidget()
+        # Virtualizált előnézet: a modell csak a látható sorokat olvassa be a sor-indexelt fájlból
+        self.prompt_list_model = PromptListModel(self)
+        self.prompt_list_widget = QListView()
+        self.prompt_list_widget.setModel(self.prompt_list_model)
+        self.prompt_list_widget.setUniformItemSizes(True)
         self.prompt_list_widget.setFixedHeight(200) 
-        self.prompt_list_widget.addItem("Nincs prompt fájl betöltve.") 
         self.prompt_list_widget.setStyleSheet("""
-            QListWidget {
+            QListView {
                 border: 1px solid #555; border-radius: 4px;
                 background-color: #2E2E2E; color: white;
             }
-            QListWidget::item { padding: 3px; }
-            QListWidget::item:selected { background-color: #4CAF50; color: white; }
+            QListView::item { padding: 3px; }
+            QListView::item:selected { background-color: #4CAF50; color: white; }
         """)
         self.layout.addWidget(self.prompt_list_widget)
         
@@ -133,38 +143,11 @@ class PromptInputWidget(QWidget):
             return True
         return self.vpn_toggle_button.isChecked()
 
-    def _count_lines_in_file(self, file_path):
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                lines = [line for line in f if line.strip()]
-            return len(lines)
-        except Exception as e:
-            print(f"Hiba a sorok számolása közben ({file_path}): {e}")
-            return 0
-
-    def _read_prompts_for_display(self, file_path):
-        prompts = []
-        if not file_path or not os.path.exists(file_path):
-            return prompts
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                for line in f:
-                    stripped_line = line.strip()
-                    if stripped_line:
-                        prompts.append(stripped_line)
-            return prompts
-        except Exception as e:
-            print(f"Hiba a promptok listájának beolvasása közben ({file_path}): {e}")
-            return []
-
     def populate_prompt_list(self, file_path):
-        self.prompt_list_widget.clear() 
-        prompts_for_display = self._read_prompts_for_display(file_path)
-
-        if prompts_for_display:
-            self.prompt_list_widget.addItems(prompts_for_display)
-        else:
-            self.prompt_list_widget.addItem("A fájl üres, vagy nem tartalmazott feldolgozható promptokat.")
+        """Az előnézet háttérben töltődik: az index felépítése után a _on_prompt_source_loaded frissít."""
+        self._loading = True
+        self.prompt_list_model.set_message("Prompt fájl betöltése...")
+        self.prompt_source_loader.load(file_path)
 
     def select_file(self):
         file_name, _ = QFileDialog.getOpenFileName(self, "Prompt fájl kiválasztása", "", "Text files (*.txt)")
@@ -189,48 +172,77 @@ class PromptInputWidget(QWidget):
         self.file_path_label.setText(f"Kiválasztott fájl: {display_name}")
         print(f"Fájl kiválasztva: {self.selected_file_path}")
 
-        num_lines = self._count_lines_in_file(self.selected_file_path)
-
-        self.start_line_spinbox.blockSignals(True)
-        self.end_line_spinbox.blockSignals(True)
-
-        if num_lines > 0:
-            self.start_line_spinbox.setRange(1, num_lines)
-            self.end_line_spinbox.setRange(1, num_lines)
-
-            current_start = self.start_line_spinbox.value()
-            current_end = self.end_line_spinbox.value()
-            new_start_value = min(max(1, current_start), num_lines)
-            if current_end == 10 and num_lines < 10: # Alapértelmezett 'end' érték, ha kisebb a fájl
-                new_end_value = num_lines
-            else:
-                new_end_value = min(max(1, current_end), num_lines)
-
-            if new_end_value < new_start_value: # Biztosítja, hogy end >= start
-                new_end_value = new_start_value
-
-            self.start_line_spinbox.setValue(new_start_value)
-            self.end_line_spinbox.setValue(new_end_value)
-
-            print(f"Fájl sorainak száma: {num_lines}.")
-        else:
-            self.start_line_spinbox.setRange(1, 1)
-            self.end_line_spinbox.setRange(1, 1)
-            self.start_line_spinbox.setValue(1)
-            self.end_line_spinbox.setValue(1)
-            print("A fájl üres vagy hiba történt. Spinboxok alapértelmezettre (1-1).")
-
-        self.start_line_spinbox.blockSignals(False)
-        self.end_line_spinbox.blockSignals(False)
-
-        self.populate_prompt_list(self.selected_file_path)
-        return True
-
+        self.populate_prompt_list(self.selected_file_path)
+        return True
+
+    def _on_prompt_source_loaded(self, request_id, prompt_source):
+        if not self.prompt_source_loader.is_current(request_id) or not self.selected_file_path:
+            return # Közben másik fájl lett kiválasztva (vagy a kiválasztás törölve)
+        self._loading = False
+        num_lines = prompt_source.count
+
+        self.start_line_spinbox.blockSignals(True)
+        self.end_line_spinbox.blockSignals(True)
+
+        if num_lines > 0:
+            self.start_line_spinbox.setRange(1, num_lines)
+            self.end_line_spinbox.setRange(1, num_lines)
+
+            current_start = self.start_line_spinbox.value()
+            current_end = self.end_line_spinbox.value()
+            new_start_value = min(max(1, current_start), num_lines)
+            if current_end == 10 and num_lines < 10: # Alapértelmezett 'end' érték, ha kisebb a fájl
+                new_end_value = num_lines
+            else:
+                new_end_value = min(max(1, current_end), num_lines)
+
+            if new_end_value < new_start_value: # Biztosítja, hogy end >= start
+                new_end_value = new_start_value
+
+            self.start_line_spinbox.setValue(new_start_value)
+            self.end_line_spinbox.setValue(new_end_value)
+
+            print(f"Fájl sorainak száma: {num_lines}.")
+        else:
+            self.start_line_spinbox.setRange(1, 1)
+            self.end_line_spinbox.setRange(1, 1)
+            self.start_line_spinbox.setValue(1)
+            self.end_line_spinbox.setValue(1)
+            print("A fájl üres vagy hiba történt. Spinboxok alapértelmezettre (1-1).")
+
+        self.start_line_spinbox.blockSignals(False)
+        self.end_line_spinbox.blockSignals(False)
+
+        self.prompt_list_model.set_source(prompt_source)
+
+        if self._pending_line_range is not None:
+            pending_start, pending_end = self._pending_line_range
+            self._pending_line_range = None
+            self.apply_saved_line_range(pending_start, pending_end)
+
+    def _on_prompt_source_failed(self, request_id, error_message):
+        if not self.prompt_source_loader.is_current(request_id):
+            return
+        self._loading = False
+        print(f"Hiba a prompt fájl betöltése közben ({self.selected_file_path}): {error_message}")
+        self._pending_line_range = None
+        self.prompt_list_model.set_message("A fájl üres, vagy nem tartalmazott feldolgozható promptokat.")
+        self.start_line_spinbox.blockSignals(True)
+        self.end_line_spinbox.blockSignals(True)
+        self.start_line_spinbox.setRange(1, 1)
+        self.end_line_spinbox.setRange(1, 1)
+        self.start_line_spinbox.blockSignals(False)
+        self.end_line_spinbox.blockSignals(False)
+
+    def is_loading(self) -> bool:
+        return self._loading
+
     def _reset_file_selection(self):
         self.selected_file_path = ""
         self.file_path_label.setText("Prompt fájl (.txt): Még nincs kiválasztva")
-        self.prompt_list_widget.clear()
-        self.prompt_list_widget.addItem("Nincs prompt fájl betöltve.")
+        self._loading = False
+        self._pending_line_range = None
+        self.prompt_list_model.set_message("Nincs prompt fájl betöltve.")
 
         self.start_line_spinbox.blockSignals(True)
         self.end_line_spinbox.blockSignals(True)
@@ -280,6 +292,11 @@ class PromptInputWidget(QWidget):
         if not isinstance(start_line, int) or not isinstance(end_line, int):
             return
 
+        if self._loading:
+            # A fájl sorainak száma még nem ismert (a spinbox tartomány még a régi): betöltés után alkalmazzuk
+            self._pending_line_range = (start_line, end_line)
+            return
+
         min_start = self.start_line_spinbox.minimum()
         max_start = self.start_line_spinbox.maximum()
         min_end = self.end_line_spinbox.minimum()
@@ -0,0 +1,118 @@
+# gui/widgets/prompt_list_model.py
+import threading
+from collections import OrderedDict
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QObject, Qt, Signal
+
+from core.prompt_source import open_prompt_source
+
+
+class PromptListModel(QAbstractListModel):
+    """
+    Lista modell a prompt előnézethez egy sor-indexelt PromptSource fölött.
+
+    Nem tárol elemenként objektumot: a sorok fetchMore-ral, kötegenként válnak láthatóvá,
+    a szövegek pedig blokkonként, igény szerint olvasódnak be a fájlból (kis LRU gyorsítótárral).
+    Forrás nélkül egyetlen tájékoztató sort mutat (pl. "Nincs prompt fájl betöltve.").
+    """
+
+    FETCH_BATCH_ROWS = 500
+    BLOCK_ROWS = 256
+    MAX_CACHED_BLOCKS = 32
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._source = None
+        self._loaded_rows = 0
+        self._message = "Nincs prompt fájl betöltve."
+        self._blocks = OrderedDict()
+
+    def set_message(self, message):
+        self.beginResetModel()
+        self._source = None
+        self._loaded_rows = 0
+        self._message = message
+        self._blocks.clear()
+        self.endResetModel()
+
+    def set_source(self, source, empty_message="A fájl üres, vagy nem tartalmazott feldolgozható promptokat."):
+        if source is None or source.count == 0:
+            self.set_message(empty_message)
+            return
+        self.beginResetModel()
+        self._source = source
+        self._loaded_rows = min(source.count, self.FETCH_BATCH_ROWS)
+        self._message = None
+        self._blocks.clear()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return self._loaded_rows if self._source is not None else 1
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._source is not None and self._loaded_rows < self._source.count
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        new_rows = min(self.FETCH_BATCH_ROWS, self._source.count - self._loaded_rows)
+        self.beginInsertRows(QModelIndex(), self._loaded_rows, self._loaded_rows + new_rows - 1)
+        self._loaded_rows += new_rows
+        self.endInsertRows()
+
+    def _row_text(self, row):
+        block_index = row // self.BLOCK_ROWS
+        block = self._blocks.get(block_index)
+        if block is None:
+            first_line = block_index * self.BLOCK_ROWS + 1
+            try:
+                block = self._source.lines(first_line, first_line + self.BLOCK_ROWS - 1)
+            except OSError as e:
+                print(f"PromptListModel: Hiba a prompt sorok olvasásakor: {e}")
+                block = []
+            self._blocks[block_index] = block
+            while len(self._blocks) > self.MAX_CACHED_BLOCKS:
+                self._blocks.popitem(last=False)
+        else:
+            self._blocks.move_to_end(block_index)
+        offset = row - block_index * self.BLOCK_ROWS
+        return block[offset] if offset < len(block) else ""
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if self._source is None:
+            return self._message if index.row() == 0 else None
+        return self._row_text(index.row())
+
+
+class PromptSourceLoader(QObject):
+    """A prompt fájl indexének felépítése háttérszálon; az eredmény signalon érkezik a GUI szálra."""
+
+    loaded = Signal(int, object) # (kérés azonosító, PromptSource)
+    failed = Signal(int, str) # (kérés azonosító, hibaüzenet)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._request_id = 0
+
+    def load(self, file_path):
+        """Új betöltés indítása; a visszaadott azonosítóval a korábbi, elavult eredmények kiszűrhetők."""
+        self._request_id += 1
+        request_id = self._request_id
+        threading.Thread(target=self._run, args=(request_id, file_path), daemon=True,
+                         name="prompt_source_loader").start()
+        return request_id
+
+    def _run(self, request_id, file_path):
+        try:
+            source = open_prompt_source(file_path)
+        except Exception as e:
+            self.failed.emit(request_id, str(e))
+            return
+        self.loaded.emit(request_id, source)
+
+    def is_current(self, request_id):
+        return request_id == self._request_id
@@ -1,18 +1,27 @@
 # main.py
 import sys
+import multiprocessing
 from PySide6.QtWidgets import QApplication
 from gui.main_window import MainWindow
+from core.ocr_service import get_ocr_service
 
 def run_app():
     """
     Inicializálja és elindítja a PySide6 alkalmazást.
     """
+    # Az EasyOCR modell betöltése háttérben indul, hogy az ablak azonnal megjelenjen
+    get_ocr_service().start()
     app = QApplication(sys.argv)
     main_win = MainWindow()
     main_win.show()
-    sys.exit(app.exec())
+    exit_code = app.exec()
+    get_ocr_service().shutdown()
+    sys.exit(exit_code)
 
 if __name__ == '__main__':
+    # Az OCR munkafolyamatok (core/ocr_worker_pool.py) miatt szükséges a fagyasztott (exe) buildekben
+    multiprocessing.freeze_support()
+
     # Ide jöhetnek kezdeti beállítások, pl. naplózás konfigurálása
     # from utils.logger import setup_logging
     # setup_logging() # Ezt majd később implementáljuk
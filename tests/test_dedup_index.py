@@ -0,0 +1,74 @@
+# tests/test_dedup_index.py
+import os
+
+import numpy as np
+import pytest
+
+from core.dedup_index import DedupIndex, image_perceptual_hash, prompt_key
+
+
+@pytest.fixture
+def index(tmp_path):
+    dedup_index = DedupIndex(str(tmp_path / "db" / "dedup.sqlite"))
+    yield dedup_index
+    dedup_index.close()
+
+
+def _file(tmp_path, name, content=b"x"):
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_find_exact_ignores_missing_files_and_excluded_path(tmp_path, index):
+    first = _file(tmp_path, "a.png")
+    second = _file(tmp_path, "b.png")
+    index.add("sha-1", first)
+    index.add("sha-1", second)
+    assert index.find_exact("sha-1") == first
+    assert index.find_exact("sha-1", exclude_path=first) == second
+    os.remove(first)
+    assert index.find_exact("sha-1") == second
+    assert index.find_exact("sha-2") is None
+    assert index.count() == 2
+
+
+def test_output_for_prompt_uses_stripped_prompt_and_latest_file(tmp_path, index):
+    older = _file(tmp_path, "older.png")
+    newer = _file(tmp_path, "newer.png")
+    index.add("sha-1", older, prompt_no=1, prompt_text="egy macska")
+    index.add("sha-2", newer, prompt_no=1, prompt_text="  egy macska ")
+    assert prompt_key("egy macska") == prompt_key(" egy macska  ")
+    assert index.output_for_prompt("egy macska") == newer
+    assert index.output_for_prompt("egy kutya") is None
+
+
+def test_find_near_orders_by_distance(tmp_path, index):
+    near = _file(tmp_path, "near.png")
+    far = _file(tmp_path, "far.png")
+    index.add("sha-1", near, phash=format(0b1111, "x"))
+    index.add("sha-2", far, phash=format(0b1111 << 20, "x"))
+    assert index.find_near(format(0b0111, "x")) == [(near, 1)]
+    assert index.find_near(format(0b0111, "x"), max_distance=64) == [(near, 1), (far, 7)]
+    assert index.find_near(None) == []
+
+
+def test_index_reloads_from_disk(tmp_path):
+    db_path = str(tmp_path / "dedup.sqlite")
+    path = _file(tmp_path, "a.png")
+    first = DedupIndex(db_path)
+    first.add("sha-1", path, phash="f")
+    first.close()
+    reopened = DedupIndex(db_path)
+    assert reopened.find_exact("sha-1") == path
+    assert reopened.find_near("f") == [(path, 0)]
+    reopened.close()
+
+
+def test_perceptual_hash_of_image(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    gradient = np.tile(np.arange(0, 256, 2, dtype=np.uint8), (64, 1))
+    path = str(tmp_path / "gradient.png")
+    Image.fromarray(gradient).save(path)
+    assert image_perceptual_hash(path) == image_perceptual_hash(path)
+    assert image_perceptual_hash(_file(tmp_path, "broken.png", b"not an image")) is None
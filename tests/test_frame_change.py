@@ -0,0 +1,91 @@
+# tests/test_frame_change.py
+import numpy as np
+
+from utils.frame_diff import FrameChangeDetector
+from utils.frame_hash import block_average_hash, block_difference_hash, hamming_distance
+
+
+def _frame(value=40, height=100, width=100):
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+def test_first_frame_becomes_reference():
+    detector = FrameChangeDetector(downsample=1)
+    assert detector.compare(_frame()) is None
+    assert detector.compare(_frame()) == 0.0
+
+
+def test_changed_block_ratio():
+    detector = FrameChangeDetector(downsample=1, pixel_tolerance=12)
+    detector.set_reference(_frame())
+    changed = _frame()
+    changed[:10, :10] = 200
+    ratio = detector.compare(changed)
+    assert ratio == 0.01
+    assert detector.is_change(ratio)
+
+
+def test_noise_below_tolerance_is_ignored():
+    detector = FrameChangeDetector(downsample=1, pixel_tolerance=12)
+    detector.set_reference(_frame(40))
+    assert detector.compare(_frame(50)) == 0.0
+    assert not detector.is_change(0.0)
+    assert not detector.is_change(None)
+
+
+def test_color_mode_detects_single_channel_change():
+    detector = FrameChangeDetector(downsample=1, grayscale=False, pixel_tolerance=12)
+    detector.set_reference(_frame())
+    changed = _frame()
+    changed[:50, :, 2] = 200
+    assert detector.compare(changed) == 0.5
+
+
+def test_compare_keeps_reference_update_replaces_it():
+    detector = FrameChangeDetector(downsample=1)
+    detector.set_reference(_frame(40))
+    assert detector.compare(_frame(200)) == 1.0
+    assert detector.compare(_frame(200)) == 1.0
+    assert detector.update(_frame(200)) == 1.0
+    assert detector.update(_frame(200)) == 0.0
+
+
+def test_downsample_and_shape_change_reset_reference():
+    detector = FrameChangeDetector(downsample=2)
+    detector.set_reference(_frame())
+    changed = _frame()
+    changed[::2, ::2] = 200
+    assert detector.compare(changed) == 1.0
+    assert detector.compare(_frame(height=60)) is None
+    assert detector.compare(_frame(height=60)) == 0.0
+
+
+def test_reset_forgets_reference():
+    detector = FrameChangeDetector(downsample=1)
+    detector.set_reference(_frame())
+    detector.reset()
+    assert detector.compare(_frame(200)) is None
+
+
+def _gradient_frame(shift=0):
+    x = (np.arange(128) + shift) % 128
+    gray = np.tile(np.sin(x / 7.0) * 100 + 120, (96, 1)).astype(np.uint8)
+    return np.repeat(gray[..., None], 3, axis=2)
+
+
+def test_frame_hash_identical_and_shifted_content():
+    base = block_difference_hash(_gradient_frame())
+    assert block_difference_hash(_gradient_frame()) == base
+    assert hamming_distance(base, block_difference_hash(_gradient_frame(shift=20))) > 0
+    assert base.bit_length() <= 16 * 16
+    assert block_average_hash(_gradient_frame(), hash_size=8).bit_length() <= 64
+
+
+def test_frame_hash_small_region_uses_sampling():
+    tiny = np.arange(5 * 7, dtype=np.uint8).reshape(5, 7)
+    assert isinstance(block_difference_hash(tiny, hash_size=8), int)
+
+
+def test_hamming_distance():
+    assert hamming_distance(0b1011, 0b0001) == 2
+    assert hamming_distance(0, 0) == 0
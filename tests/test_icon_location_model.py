@@ -0,0 +1,38 @@
+# tests/test_icon_location_model.py
+from core.icon_location_model import IconLocationModel
+
+
+def test_no_prediction_without_hits():
+    model = IconLocationModel()
+    assert model.predict() is None
+    assert model.search_regions() == []
+
+
+def test_predict_is_median_and_respects_bounds():
+    model = IconLocationModel()
+    for x, y in [(100, 200), (110, 210), (900, 205), (105, 800)]:
+        model.record_hit(x, y, persist=False)
+    assert model.predict() == (110, 210)
+    assert model.predict(bounds=(0, 0, 500, 500)) == (110, 210)
+    assert model.predict(bounds=(800, 0, 200, 400)) == (900, 205)
+    assert model.predict(bounds=(0, 900, 100, 100)) is None
+
+
+def test_search_regions_widen_and_clip_to_bounds():
+    model = IconLocationModel(base_margin_px=10, widen_factor=3.0)
+    model.record_hit(50, 50, persist=False)
+    narrow, wide = model.search_regions(bounds=(0, 0, 1000, 1000), icon_size=(20, 16))
+    assert narrow == (20, 20, 60, 60) # Margó: 10 + 20 (ikon) + 0 (szórás)
+    assert wide == (0, 0, 140, 140)   # 90 px margó, a határoló régióra vágva
+    assert model.search_regions(bounds=(0, 0, 1000, 1000), levels=1) == [(40, 40, 20, 20)]
+
+
+def test_history_is_bounded_and_persisted(tmp_path):
+    history_path = str(tmp_path / "icon_hits.json")
+    model = IconLocationModel(history_path, max_hits=3)
+    for x in range(5):
+        model.record_hit(x, x, predicted=x % 2 == 0)
+    model.record_miss()
+    assert model.hits == [(2, 2), (3, 3), (4, 4)]
+    assert (model.predicted_hits, model.predicted_misses) == (3, 1)
+    assert IconLocationModel(history_path, max_hits=2).hits == [(3, 3), (4, 4)]
@@ -0,0 +1,114 @@
+# tests/test_mask_ops.py
+from collections import deque
+
+import numpy as np
+import pytest
+
+from utils.mask_ops import color_mask, find_runs, first_true, label_components, run_bounds
+
+
+def _mask(*rows):
+    return np.array([[c == "#" for c in row] for row in rows], dtype=bool)
+
+
+def _flood_fill_components(mask):
+    """Egyszerű 4-szomszédos BFS referencia: [(terület, bal, felső, jobb, alsó, súlypont x, súlypont y), ...]."""
+    height, width = mask.shape
+    seen = np.zeros_like(mask)
+    components = []
+    for y in range(height):
+        for x in range(width):
+            if not mask[y, x] or seen[y, x]:
+                continue
+            queue, pixels = deque([(y, x)]), []
+            seen[y, x] = True
+            while queue:
+                cy, cx = queue.popleft()
+                pixels.append((cy, cx))
+                for ny, nx in ((cy - 1, cx), (cy + 1, cx), (cy, cx - 1), (cy, cx + 1)):
+                    if 0 <= ny < height and 0 <= nx < width and mask[ny, nx] and not seen[ny, nx]:
+                        seen[ny, nx] = True
+                        queue.append((ny, nx))
+            ys = [p[0] for p in pixels]
+            xs = [p[1] for p in pixels]
+            components.append((len(pixels), min(xs), min(ys), max(xs), max(ys),
+                               round(sum(xs) / len(xs), 6), round(sum(ys) / len(ys), 6)))
+    return sorted(components)
+
+
+def _as_tuples(components):
+    return sorted((c["area"], c["left"], c["top"], c["right"], c["bottom"],
+                   round(c["center_x"], 6), round(c["center_y"], 6)) for c in components)
+
+
+def test_color_mask_exact_and_tolerance():
+    frame = np.array([[[255, 255, 255], [250, 255, 255], [0, 0, 0]]], dtype=np.uint8)
+    assert color_mask(frame, (255, 255, 255)).tolist() == [[True, False, False]]
+    assert color_mask(frame, (255, 255, 255), tolerance=5).tolist() == [[True, True, False]]
+
+
+def test_first_true():
+    assert first_true([]) == -1
+    assert first_true([False, False]) == -1
+    assert first_true([False, True, True]) == 1
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_run_bounds_matches_pixel_walk(seed):
+    line = np.random.default_rng(seed).random(37) < 0.7
+    for index in range(line.size):
+        start = index
+        while start > 0 and line[start - 1]:
+            start -= 1
+        end = index
+        while end < line.size - 1 and line[end + 1]:
+            end += 1
+        assert run_bounds(line, index) == (start, end)
+
+
+def test_find_runs_on_hand_made_mask():
+    rows, starts, ends = find_runs(_mask(
+        "##..#",
+        ".....",
+        "#####",
+        ".#.#.",
+    ))
+    assert list(zip(rows.tolist(), starts.tolist(), ends.tolist())) == [
+        (0, 0, 2), (0, 4, 5), (2, 0, 5), (3, 1, 2), (3, 3, 4)]
+
+
+def test_label_components_on_hand_made_mask():
+    mask = _mask(
+        "##....#",
+        "##...##",
+        "......#",
+        "#.#....",
+        ".#.....",
+    )
+    components = label_components(mask)
+    assert [c["area"] for c in components] == [4, 4, 1, 1, 1] # Az átlós szomszédok nem kapcsolódnak
+    assert (components[0]["left"], components[0]["top"], components[0]["right"], components[0]["bottom"]) == (0, 0, 1, 1)
+    assert (components[1]["left"], components[1]["top"], components[1]["right"], components[1]["bottom"]) == (5, 0, 6, 2)
+    assert components[0]["center_x"] == 0.5 and components[0]["center_y"] == 0.5
+    assert [c["area"] for c in label_components(mask, min_area=2)] == [4, 4]
+
+
+def test_label_components_u_shape_merges_into_one():
+    mask = _mask(
+        "#...#",
+        "#...#",
+        "#####",
+    )
+    components = label_components(mask)
+    assert len(components) == 1 and components[0]["area"] == 9
+
+
+def test_label_components_empty_mask():
+    assert label_components(np.zeros((4, 4), dtype=bool)) == []
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_label_components_matches_flood_fill(seed):
+    rng = np.random.default_rng(seed)
+    mask = rng.random((int(rng.integers(1, 25)), int(rng.integers(1, 25)))) < rng.uniform(0.2, 0.7)
+    assert _as_tuples(label_components(mask)) == _flood_fill_components(mask)
@@ -0,0 +1,71 @@
+# tests/test_prompt_source.py
+import os
+
+import pytest
+
+from core.prompt_source import PromptSource, build_line_index
+
+
+def _write(tmp_path, text, name="prompts.txt"):
+    path = tmp_path / name
+    path.write_bytes(text.encode("utf-8"))
+    return str(path)
+
+
+def _text_mode_prompts(path):
+    """A korábbi soronkénti beolvasás: a str.strip() után nem üres sorok."""
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+SAMPLE_TEXT = ("első prompt\r\n"
+               "\r\n"
+               "   \t \n"
+               "\u00a0 \u00a0\n"  # Csak NBSP
+               "\u3000 \u3000\r\n" # Csak ideografikus szóköz
+               "  második, ékezetes prompt  \n"
+               "\x1c\n"
+               "\u00a0harmadik\u00a0\n" # A szélső NBSP is levágódik
+               "utolsó, sorvég nélkül")
+
+
+def test_index_matches_text_mode_reading(tmp_path):
+    path = _write(tmp_path, SAMPLE_TEXT)
+    source = PromptSource(path, use_disk_cache=False)
+    expected = _text_mode_prompts(path)
+    assert expected == ["első prompt", "második, ékezetes prompt", "harmadik", "utolsó, sorvég nélkül"]
+    assert source.count == len(expected)
+    assert source.lines(1, source.count) == expected
+    assert [source.line(n) for n in range(1, source.count + 1)] == expected
+
+
+@pytest.mark.parametrize("chunk_bytes", [1, 3, 7, 64])
+def test_chunked_index_matches_single_block(tmp_path, chunk_bytes):
+    path = _write(tmp_path, SAMPLE_TEXT * 5)
+    single = build_line_index(path)
+    chunked = build_line_index(path, chunk_bytes=chunk_bytes)
+    assert single[0].tolist() == chunked[0].tolist()
+    assert single[1].tolist() == chunked[1].tolist()
+
+
+def test_line_and_range_bounds(tmp_path):
+    source = PromptSource(_write(tmp_path, "a\nb\n\nc\n"), use_disk_cache=False)
+    assert source.line(0) is None and source.line(4) is None
+    assert source.line(3) == "c"
+    assert source.lines(2, 99) == ["b", "c"]
+    assert source.lines(3, 2) == []
+    assert len(PromptSource(_write(tmp_path, "", "empty.txt"), use_disk_cache=False)) == 0
+
+
+def test_disk_cache_is_reused_and_invalidated(tmp_path):
+    path = _write(tmp_path, "a\nb\n")
+    source = PromptSource(path)
+    assert os.path.exists(source.index_path)
+    assert PromptSource(path).lines(1, 2) == ["a", "b"]
+    with open(path, "ab") as f:
+        f.write(b"\xc2\xa0\nc\n")
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1_000_000))
+    assert source.is_stale()
+    assert source.refresh()
+    assert source.lines(1, 10) == ["a", "b", "c"]
+    assert PromptSource(path).count == 3
@@ -0,0 +1,81 @@
+# tests/test_timing_model.py
+import pytest
+
+from core.timing_model import TimingModel
+
+
+def _model(tmp_path=None, **kwargs):
+    store_path = str(tmp_path / "timing.json") if tmp_path is not None else None
+    return TimingModel(store_path=store_path, **kwargs)
+
+
+def test_effective_wait_needs_min_samples():
+    model = _model(min_samples=5)
+    for _ in range(4):
+        model.record("generation", 2.0, persist=False)
+    assert model.effective_wait("generation", 10.0) == 10.0
+    model.record("generation", 2.0, persist=False)
+    assert model.effective_wait("generation", 10.0) == pytest.approx(2.0 * 1.25)
+
+
+def test_effective_wait_percentile_and_clamping():
+    model = _model(min_samples=3, percentile=0.5, safety_margin=2.0)
+    for duration in (1.0, 2.0, 3.0):
+        model.record("tool_open", duration, persist=False)
+    assert model.effective_wait("tool_open", 10.0) == pytest.approx(4.0)
+    assert model.effective_wait("tool_open", 3.0) == 3.0 # Soha nem hosszabb az alapértelmezettnél
+    assert model.effective_wait("tool_open", 10.0, min_s=5.0) == 5.0
+
+
+def test_suggest_mode_waits_default_off_mode_does_not_record():
+    suggest_model = _model(mode="suggest", min_samples=1)
+    suggest_model.record("generation", 1.0, persist=False)
+    assert suggest_model.suggest("generation", 10.0) == pytest.approx(1.25)
+    assert suggest_model.effective_wait("generation", 10.0) == 10.0
+    off_model = _model(mode="off", min_samples=1)
+    off_model.record("generation", 1.0, persist=False)
+    assert off_model.samples("generation") == []
+    off_model.record("generation", 1.0, persist=False, force=True)
+    assert off_model.samples("generation") == [1.0]
+
+
+def test_censored_sample_restores_default_until_next_ready():
+    model = _model(min_samples=1)
+    model.record("download", 1.0, persist=False)
+    assert model.effective_wait("download", 10.0) == pytest.approx(1.25)
+    model.record("download", 1.25, persist=False, censored=True)
+    assert model.effective_wait("download", 10.0) == 10.0
+    model.record("download", 4.0, persist=False)
+    assert model.effective_wait("download", 10.0) < 10.0
+
+
+def test_samples_persist_and_reload(tmp_path):
+    model = _model(tmp_path, min_samples=1, max_samples=3)
+    for duration in (1.0, 2.0, 3.0, 4.0):
+        model.record("generation", duration)
+    model.record("tool_open", 2.0, censored=True)
+    reloaded = _model(tmp_path, min_samples=1)
+    assert reloaded.samples("generation") == [2.0, 3.0, 4.0]
+    assert reloaded.effective_wait("tool_open", 9.0) == 9.0
+
+
+def test_wait_returns_ready_and_records_sample():
+    model = _model(min_samples=1)
+    outcome, elapsed_s = model.wait("probe", 1.0, ready_check=lambda: True, poll_s=0.01)
+    assert outcome == "ready" and elapsed_s < 1.0
+    assert len(model.samples("probe")) == 1
+
+
+def test_wait_timeout_records_censored_sample():
+    model = _model(min_samples=1)
+    outcome, _elapsed_s = model.wait("probe", 0.05, ready_check=lambda: False, poll_s=0.01)
+    assert outcome == "elapsed"
+    assert len(model.samples("probe")) == 1
+    assert model.effective_wait("probe", 0.05) == 0.05
+
+
+def test_wait_without_ready_check_records_nothing_and_honours_stop():
+    model = _model(min_samples=1)
+    assert model.wait("plain", 0.02, poll_s=0.01)[0] == "elapsed"
+    assert model.samples("plain") == []
+    assert model.wait("plain", 5.0, check_stop=lambda: True, poll_s=0.01)[0] == "stopped"
@@ -0,0 +1,172 @@
+# tests/test_ui_scanner.py
+import glob
+import os
+
+import numpy as np
+import pytest
+
+from utils.screen_index import ScreenIndex
+from utils.ui_scanner import PROMPT_AREA_WHITE_COLOR_TUPLE, find_prompt_area_dynamically
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "automation_assets")
+
+
+def _silent(msg, is_error=False):
+    pass
+
+
+def find_prompt_area_per_pixel(frame):
+    """
+    A vektorizálás előtti, pixelenkénti keresés (a naplózás nélkül), a pyautogui.pixel() helyett
+    a képkockából olvasva. Ehhez hasonlítjuk a maszk alapú find_prompt_area_dynamically()-t.
+    """
+    screen_height, screen_width = frame.shape[:2]
+
+    def is_white(x, y):
+        if not (0 <= x < screen_width and 0 <= y < screen_height):
+            return False
+        return tuple(int(c) for c in frame[y, x, :3]) == PROMPT_AREA_WHITE_COLOR_TUPLE
+
+    seed_x = screen_width // 2
+    seed_y = -1
+    scan_start_y_for_seed = int(screen_height * 0.60)
+    scan_end_y_for_seed = int(screen_height * 0.90)
+    for y_current in range(scan_start_y_for_seed, scan_end_y_for_seed, 20):
+        if is_white(seed_x, y_current):
+            seed_y = y_current
+            break
+    if seed_y == -1:
+        for y_current in range(screen_height - 20, scan_start_y_for_seed, -20):
+            if y_current < 0:
+                break
+            if is_white(seed_x, y_current):
+                seed_y = y_current
+                break
+    if seed_y == -1:
+        target_y = int(screen_height * 0.73)
+        found_seed_in_row = False
+        for x_offset in range(0, screen_width // 4, 10):
+            for sign in [0, 1, -1]:
+                if x_offset == 0 and sign != 0:
+                    continue
+                current_x = seed_x + x_offset * sign
+                if 0 <= current_x < screen_width and is_white(current_x, target_y):
+                    seed_x, seed_y = current_x, target_y
+                    found_seed_in_row = True
+                    break
+            if found_seed_in_row:
+                break
+        if not found_seed_in_row:
+            return None
+
+    l_x = seed_x
+    while l_x > 0 and is_white(l_x - 1, seed_y):
+        l_x -= 1
+    r_x = seed_x
+    while r_x < screen_width - 1 and is_white(r_x + 1, seed_y):
+        r_x += 1
+    horizontal_mid_x = (l_x + r_x) // 2
+    t_y = seed_y
+    while t_y > 0 and is_white(horizontal_mid_x, t_y - 1):
+        t_y -= 1
+    b_y = seed_y
+    while b_y < screen_height - 1 and is_white(horizontal_mid_x, b_y + 1):
+        b_y += 1
+
+    if not (r_x > l_x and b_y > t_y):
+        return None
+    width = r_x - l_x + 1
+    height = b_y - t_y + 1
+    if not (int(screen_width * 0.30) <= width <= int(screen_width * 0.90) and
+            int(screen_height * 0.10) <= height <= int(screen_height * 0.35)):
+        return None
+    return {'x': l_x, 'y': t_y, 'width': width, 'height': height,
+            'center_x': l_x + width // 2, 'center_y': t_y + height // 2}
+
+
+def find_prompt_area_vectorized(frame):
+    height, width = frame.shape[:2]
+    return find_prompt_area_dynamically(width, height, notify_callback=_silent, screen_index=ScreenIndex(frame))
+
+
+def _frame(width=1920, height=1080, background=(32, 33, 36)):
+    frame = np.empty((height, width, 3), dtype=np.uint8)
+    frame[...] = background
+    return frame
+
+
+def _white(frame, left, top, width, height):
+    frame[top:top + height, left:left + width] = 255
+
+
+def _assert_equivalent(frame):
+    expected = find_prompt_area_per_pixel(frame)
+    assert find_prompt_area_vectorized(frame) == expected
+    return expected
+
+
+def test_centered_prompt_field_found_scanning_down():
+    frame = _frame()
+    _white(frame, 460, 700, 1000, 250)
+    assert _assert_equivalent(frame) == {'x': 460, 'y': 700, 'width': 1000, 'height': 250,
+                                         'center_x': 960, 'center_y': 825}
+
+
+def test_prompt_field_below_scan_range_found_scanning_up():
+    frame = _frame()
+    _white(frame, 400, 970, 1100, 110)
+    result = _assert_equivalent(frame)
+    assert result is not None and result['y'] == 970
+
+
+def test_off_center_prompt_field_found_by_horizontal_search():
+    frame = _frame()
+    _white(frame, 1000, 620, 700, 300)
+    result = _assert_equivalent(frame)
+    assert result is not None and result['x'] == 1000
+
+
+def test_non_rectangular_field_uses_middle_column_for_height():
+    frame = _frame()
+    _white(frame, 300, 700, 1300, 200)
+    _white(frame, 900, 650, 80, 50) # Kiugrás a középső oszlop környékén
+    frame[760, 300:1600] = (200, 200, 200) # Nem fehér vonal a mag sora alatt
+    _assert_equivalent(frame)
+
+
+@pytest.mark.parametrize("left, top, width, height", [
+    (900, 700, 120, 250),  # Túl keskeny
+    (100, 700, 1800, 250), # Túl széles
+    (460, 700, 1000, 40),  # Túl alacsony
+])
+def test_field_with_unexpected_size_is_rejected(left, top, width, height):
+    frame = _frame()
+    _white(frame, left, top, min(width, 1920 - left), height)
+    assert _assert_equivalent(frame) is None
+
+
+def test_no_white_pixels_returns_none():
+    assert _assert_equivalent(_frame()) is None
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_random_layouts_match_per_pixel_search(seed):
+    rng = np.random.default_rng(seed)
+    width, height = [(1920, 1080), (1280, 720), (1366, 768)][seed % 3]
+    frame = _frame(width, height, background=tuple(int(c) for c in rng.integers(0, 250, 3)))
+    for _ in range(int(rng.integers(0, 4))):
+        box_w = int(rng.integers(20, width))
+        box_h = int(rng.integers(5, height // 2))
+        _white(frame, int(rng.integers(0, width - box_w + 1)), int(rng.integers(0, height - box_h + 1)), box_w, box_h)
+    noise = rng.random((height, width)) < 0.002
+    frame[noise] = 255
+    frame[rng.random((height, width)) < 0.002] = (254, 255, 255)
+    _assert_equivalent(frame)
+
+
+@pytest.mark.parametrize("path", sorted(glob.glob(os.path.join(ASSETS_DIR, "debug_ocr_fail_*fullscreen*.png")))[:5])
+def test_recorded_screenshots_match_per_pixel_search(path):
+    Image = pytest.importorskip("PIL.Image")
+    with Image.open(path) as image:
+        frame = np.asarray(image.convert("RGB"))
+    _assert_equivalent(frame)
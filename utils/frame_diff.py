@@ -0,0 +1,124 @@
+# utils/frame_diff.py
+import numpy as np
+
+# Szürkeárnyalatos súlyok (ITU-R BT.601, 8 bites fixpontos alakban: összegük 256)
+_GRAY_WEIGHTS = (77, 150, 29)
+
+
+class FrameChangeDetector:
+    """
+    Képkocka-különbség motor uint8 RGB tömbökre (pl. ScreenCapture.grab() kimenete).
+
+    - downsample: minden n-edik sort/oszlopot vizsgálja (nézet, nincs másolás)
+    - grayscale: szürkeárnyalatban hasonlít (3x kevesebb munka, kevésbé zajérzékeny)
+    - pixel_tolerance: ekkora (0-255) eltérés alatt a pixel nem számít változottnak,
+      így az élsimítás / spinner zaj nem jelez mozgást
+    - changed_ratio_threshold: a megváltozott pixelek aránya, amitől "változásnak" tekintjük
+
+    A pufferek az első képkockánál jönnek létre, és amíg a méret nem változik,
+    minden további képkockánál újrahasznosulnak.
+    """
+
+    def __init__(self, downsample=2, grayscale=True, pixel_tolerance=12, changed_ratio_threshold=0.001):
+        self.downsample = max(1, int(downsample))
+        self.grayscale = bool(grayscale)
+        self.pixel_tolerance = int(pixel_tolerance)
+        self.changed_ratio_threshold = float(changed_ratio_threshold)
+        self._shape = None
+        self._current = None
+        self._reference = None
+        self._scratch = None
+        self._diff = None
+        self._mask = None
+        self._channel_mask = None
+        self._has_reference = False
+        self.last_ratio = None
+
+    def reset(self):
+        """Elfelejti a referencia képkockát (a pufferek megmaradnak)."""
+        self._has_reference = False
+        self.last_ratio = None
+
+    def _allocate(self, shape):
+        self._shape = shape
+        height, width = shape
+        if self.grayscale:
+            self._current = np.empty((height, width), dtype=np.int32)
+            self._reference = np.empty((height, width), dtype=np.int32)
+            self._scratch = np.empty((height, width), dtype=np.int32)
+            self._diff = np.empty((height, width), dtype=np.int32)
+            self._channel_mask = None
+        else:
+            self._current = np.empty((height, width, 3), dtype=np.int16)
+            self._reference = np.empty((height, width, 3), dtype=np.int16)
+            self._scratch = None
+            self._diff = np.empty((height, width, 3), dtype=np.int16)
+            self._channel_mask = np.empty((height, width, 3), dtype=bool)
+        self._mask = np.empty((height, width), dtype=bool)
+        self._has_reference = False
+
+    def _load(self, frame, target):
+        view = frame[::self.downsample, ::self.downsample]
+        if self.grayscale:
+            if view.ndim == 2:
+                target[...] = view
+                return
+            np.multiply(view[..., 0], _GRAY_WEIGHTS[0], out=target, dtype=np.int32)
+            np.multiply(view[..., 1], _GRAY_WEIGHTS[1], out=self._scratch, dtype=np.int32)
+            target += self._scratch
+            np.multiply(view[..., 2], _GRAY_WEIGHTS[2], out=self._scratch, dtype=np.int32)
+            target += self._scratch
+            np.right_shift(target, 8, out=target)
+        else:
+            target[...] = view[..., :3]
+
+    def _prepare(self, frame):
+        shape = frame[::self.downsample, ::self.downsample].shape[:2]
+        if shape != self._shape:
+            self._allocate(shape)
+        self._load(frame, self._current)
+
+    def _changed_ratio(self):
+        np.subtract(self._current, self._reference, out=self._diff)
+        np.abs(self._diff, out=self._diff)
+        if self.grayscale:
+            np.greater(self._diff, self.pixel_tolerance, out=self._mask)
+        else:
+            np.greater(self._diff, self.pixel_tolerance, out=self._channel_mask)
+            np.logical_or.reduce(self._channel_mask, axis=2, out=self._mask)
+        if self._mask.size == 0:
+            return 0.0
+        return np.count_nonzero(self._mask) / self._mask.size
+
+    def set_reference(self, frame):
+        self._prepare(frame)
+        self._current, self._reference = self._reference, self._current
+        self._has_reference = True
+
+    def compare(self, frame):
+        """
+        A képkockát a referenciához hasonlítja, és visszaadja a megváltozott pixelek arányát.
+        A referencia NEM frissül. Ha még nincs referencia, ez a képkocka lesz az, és None-t ad.
+        """
+        if frame is None:
+            return None
+        if not self._has_reference or frame[::self.downsample, ::self.downsample].shape[:2] != self._shape:
+            self.set_reference(frame)
+            return None
+        self._prepare(frame)
+        self.last_ratio = self._changed_ratio()
+        return self.last_ratio
+
+    def update(self, frame):
+        """Mint a compare(), de utána az aktuális képkocka lesz az új referencia (egymást követő képkockák)."""
+        ratio = self.compare(frame)
+        if ratio is not None:
+            self._current, self._reference = self._reference, self._current
+        return ratio
+
+    def is_change(self, ratio):
+        return ratio is not None and ratio >= self.changed_ratio_threshold
+
+    def has_changed(self, frame):
+        """Kényelmi függvény: update() + küszöb ellenőrzés."""
+        return self.is_change(self.update(frame))
@@ -0,0 +1,117 @@
+# utils/frame_hash.py
+from collections import deque
+
+import numpy as np
+
+
+def _to_gray(frame):
+    if frame.ndim == 2:
+        return frame.astype(np.float32)
+    return frame[..., 0] * 0.299 + frame[..., 1] * 0.587 + frame[..., 2] * 0.114
+
+
+def _block_means(gray, rows, cols):
+    """A képet rows x cols blokkra osztja, és visszaadja a blokkok átlagát (a maradék sorokat/oszlopokat levágja)."""
+    height, width = gray.shape
+    if height < rows or width < cols:
+        # Túl kicsi régió a blokkokhoz: legközelebbi pixel mintavételezés
+        row_index = np.arange(rows) * height // rows
+        col_index = np.arange(cols) * width // cols
+        return gray[np.ix_(row_index, col_index)].astype(np.float32)
+    block_h = height // rows
+    block_w = width // cols
+    cropped = gray[:block_h * rows, :block_w * cols]
+    return cropped.reshape(rows, block_h, cols, block_w).mean(axis=(1, 3))
+
+
+def block_average_hash(frame, hash_size=8):
+    """
+    Klasszikus átlag-hash: hash_size x hash_size blokk, a bit 1, ha a blokk világosabb az átlagnál.
+    Eredmény: hash_size*hash_size bites Python int.
+    """
+    means = _block_means(_to_gray(frame), hash_size, hash_size)
+    bits = (means > means.mean()).ravel()
+    return _pack_bits(bits)
+
+
+def block_difference_hash(frame, hash_size=16):
+    """
+    Blokk-átlag alapú gradiens (dHash): a bit 1, ha a blokk világosabb a jobb oldali szomszédjánál.
+    Mozgásra érzékenyebb, mint az átlag-hash, ezért ezt használjuk a stabilitás figyeléséhez.
+    """
+    means = _block_means(_to_gray(frame), hash_size, hash_size + 1)
+    bits = (means[:, 1:] > means[:, :-1]).ravel()
+    return _pack_bits(bits)
+
+
+def _pack_bits(bits):
+    packed = np.packbits(bits.astype(np.uint8))
+    return int.from_bytes(packed.tobytes(), "big")
+
+
+def hamming_distance(hash_a, hash_b):
+    return bin(hash_a ^ hash_b).count("1")
+
+
+class HashStabilityDetector:
+    """
+    Stabilitás-figyelő, ami képkockák helyett csak azok tömör hash-ét tárolja.
+
+    Az update() az új képkocka hash-ét az utolsó változás óta látott hash-ek ablakával
+    veti össze (legfeljebb window_size elem), és a legnagyobb Hamming-távolságot adja
+    vissza. Ha ez nagyobb, mint distance_threshold, az "mozgás", és az ablak újraindul.
+    Így a lassú, lépésenként kicsi eltolódás is mozgásnak számít.
+
+    Az interfész megegyezik a FrameChangeDetector-éval (update / is_change / reset),
+    ezért a figyelő ciklus bármelyikkel működik. A history minden képkockáról egy
+    (időbélyeg, hash, távolság) hármast tárol naplózáshoz.
+    """
+
+    def __init__(self, hash_size=16, distance_threshold=3, window_size=16, clock=None):
+        self.hash_size = int(hash_size)
+        self.distance_threshold = int(distance_threshold)
+        self._window = deque(maxlen=max(1, int(window_size)))
+        self._clock = clock
+        self.history = []
+        self.last_hash = None
+        self.last_ratio = None
+
+    def reset(self):
+        self._window.clear()
+        self.history = []
+        self.last_hash = None
+        self.last_ratio = None
+
+    def compute_hash(self, frame):
+        return block_difference_hash(frame, self.hash_size)
+
+    def update(self, frame, timestamp=None):
+        if frame is None:
+            return None
+        current_hash = self.compute_hash(frame)
+        if timestamp is None and self._clock is not None:
+            timestamp = self._clock()
+        distance = None
+        if self._window:
+            distance = max(hamming_distance(current_hash, h) for h in self._window)
+            if distance > self.distance_threshold:
+                self._window.clear()
+        self._window.append(current_hash)
+        self.history.append((timestamp, current_hash, distance))
+        self.last_hash = current_hash
+        self.last_ratio = distance
+        return distance
+
+    def is_change(self, distance):
+        return distance is not None and distance > self.distance_threshold
+
+    def history_for_log(self, start_time=None):
+        """JSON-ba írható előzmény: [relatív idő (s), hash hex, távolság]."""
+        hex_width = (self.hash_size * self.hash_size + 3) // 4
+        entries = []
+        for timestamp, frame_hash, distance in self.history:
+            relative = None
+            if timestamp is not None:
+                relative = round(timestamp - start_time, 3) if start_time is not None else timestamp
+            entries.append([relative, format(frame_hash, f"0{hex_width}x"), distance])
+        return entries
@@ -0,0 +1,107 @@
+# utils/mask_ops.py
+import numpy as np
+
+
+def color_mask(frame, color, tolerance=0):
+    """Logikai maszk: a pixel színe csatornánként legfeljebb tolerance eltéréssel egyezik a célszínnel."""
+    rgb = frame[..., :3]
+    if tolerance <= 0:
+        return np.all(rgb == np.asarray(color[:3], dtype=rgb.dtype), axis=-1)
+    diff = np.abs(rgb.astype(np.int16) - np.asarray(color[:3], dtype=np.int16))
+    return np.all(diff <= int(tolerance), axis=-1)
+
+
+def first_true(values):
+    """Az első igaz elem indexe egy 1D logikai tömbben, vagy -1."""
+    values = np.asarray(values, dtype=bool)
+    if values.size == 0 or not values.any():
+        return -1
+    return int(np.argmax(values))
+
+
+def run_bounds(line_mask, index):
+    """
+    Az index pozícióból mindkét irányba növesztett igaz szakasz (run) zárt határai egy 1D maszkban.
+    Megegyezik a pixelenkénti "amíg a szomszéd igaz, lépj tovább" növesztéssel (az index maga nem számít).
+    """
+    line_mask = np.asarray(line_mask, dtype=bool)
+    before = np.flatnonzero(~line_mask[:index])
+    after = np.flatnonzero(~line_mask[index + 1:])
+    start = int(before[-1]) + 1 if before.size else 0
+    end = index + int(after[0]) if after.size else line_mask.size - 1
+    return start, end
+
+
+def find_runs(mask):
+    """
+    Soronkénti igaz szakaszok (run-length kódolás) egy 2D maszkban.
+    Visszatérés: (sorok, kezdetek, végek) tömbök, soronként balról jobbra rendezve; a vég kizáró index.
+    """
+    mask = np.asarray(mask, dtype=bool)
+    height, width = mask.shape
+    padded = np.zeros((height, width + 2), dtype=np.int8)
+    padded[:, 1:-1] = mask
+    edges = np.diff(padded, axis=1)
+    rows, starts = np.nonzero(edges == 1)
+    _end_rows, ends = np.nonzero(edges == -1)
+    return rows, starts, ends
+
+
+def _find_root(parents, index):
+    root = index
+    while parents[root] != root:
+        root = parents[root]
+    while parents[index] != root:
+        parents[index], index = root, parents[index]
+    return root
+
+
+def label_components(mask, min_area=1):
+    """
+    4-szomszédos összefüggő komponensek egy 2D logikai maszkban (scipy nélkül).
+    A sorok szakaszait (find_runs) az átfedő szomszédos sorok szakaszaival union-find köti össze.
+    Visszatérés: terület szerint csökkenő lista, elemei dict-ek:
+      area, left, top, right, bottom (zárt határok), center_x, center_y (súlypont)
+    """
+    rows, starts, ends = find_runs(mask)
+    run_count = rows.size
+    if run_count == 0:
+        return []
+    parents = list(range(run_count))
+    row_starts = np.searchsorted(rows, np.arange(mask.shape[0] + 1))
+    row_list, start_list, end_list = rows.tolist(), starts.tolist(), ends.tolist()
+    for row in range(1, mask.shape[0]):
+        prev_i, prev_end = row_starts[row - 1], row_starts[row]
+        cur_i, cur_end = row_starts[row], row_starts[row + 1]
+        while prev_i < prev_end and cur_i < cur_end:
+            if start_list[prev_i] < end_list[cur_i] and start_list[cur_i] < end_list[prev_i]:
+                root_a, root_b = _find_root(parents, prev_i), _find_root(parents, cur_i)
+                if root_a != root_b:
+                    parents[max(root_a, root_b)] = min(root_a, root_b)
+            if end_list[prev_i] <= end_list[cur_i]:
+                prev_i += 1
+            else:
+                cur_i += 1
+    roots = np.array([_find_root(parents, i) for i in range(run_count)])
+    _unique_roots, labels = np.unique(roots, return_inverse=True)
+    lengths = (ends - starts).astype(np.float64)
+    areas = np.bincount(labels, weights=lengths)
+    sum_x = np.bincount(labels, weights=lengths * (starts + ends - 1) / 2.0)
+    sum_y = np.bincount(labels, weights=lengths * rows)
+    component_count = areas.size
+    lefts = np.full(component_count, np.iinfo(np.int64).max); np.minimum.at(lefts, labels, starts)
+    rights = np.full(component_count, -1); np.maximum.at(rights, labels, ends - 1)
+    tops = np.full(component_count, np.iinfo(np.int64).max); np.minimum.at(tops, labels, rows)
+    bottoms = np.full(component_count, -1); np.maximum.at(bottoms, labels, rows)
+    components = []
+    for label in np.argsort(-areas, kind="stable"):
+        if areas[label] < min_area:
+            continue
+        components.append({
+            "area": int(areas[label]),
+            "left": int(lefts[label]), "top": int(tops[label]),
+            "right": int(rights[label]), "bottom": int(bottoms[label]),
+            "center_x": float(sum_x[label] / areas[label]),
+            "center_y": float(sum_y[label] / areas[label]),
+        })
+    return components
@@ -0,0 +1,264 @@
+# utils/screen_capture.py
+import glob
+import os
+import threading
+import time
+
+import numpy as np
+
+try:
+    import mss
+except ImportError:
+    mss = None
+
+try:
+    import pyautogui
+except ImportError:
+    pyautogui = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+class MssCaptureBackend:
+    """
+    Hosszú életű 'mss' alapú képernyő-rögzítő (Windows: GDI/BitBlt, Linux: XShm).
+    Az mss példány szálhoz kötött, ezért szálanként egyszer hozzuk létre, és utána
+    minden grab() hívás ugyanazt a példányt használja.
+    """
+    name = "mss"
+
+    def __init__(self):
+        if mss is None:
+            raise RuntimeError("Az 'mss' könyvtár nincs telepítve.")
+        self._local = threading.local()
+
+    def _grabber(self):
+        grabber = getattr(self._local, "grabber", None)
+        if grabber is None:
+            grabber = mss.mss()
+            self._local.grabber = grabber
+        return grabber
+
+    def screen_size(self):
+        monitor = self._grabber().monitors[1]
+        return monitor["width"], monitor["height"]
+
+    def grab(self, region=None):
+        grabber = self._grabber()
+        if region is None:
+            monitor = grabber.monitors[1]
+            area = {"left": monitor["left"], "top": monitor["top"],
+                    "width": monitor["width"], "height": monitor["height"]}
+        else:
+            left, top, width, height = region
+            area = {"left": int(left), "top": int(top), "width": int(width), "height": int(height)}
+        shot = grabber.grab(area)
+        # BGRA -> RGB, összefüggő másolatként, hogy a hívó nyugodtan tárolhassa
+        frame = np.frombuffer(shot.bgra, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+        return np.ascontiguousarray(frame[:, :, 2::-1])
+
+    def close(self):
+        grabber = getattr(self._local, "grabber", None)
+        if grabber is not None:
+            try:
+                grabber.close()
+            except Exception:
+                pass
+            self._local.grabber = None
+
+
+class PyAutoGuiCaptureBackend:
+    """Fallback: minden hívás egy új pyautogui.screenshot()."""
+    name = "pyautogui"
+
+    def __init__(self):
+        if pyautogui is None:
+            raise RuntimeError("A 'pyautogui' könyvtár nincs telepítve.")
+
+    def screen_size(self):
+        size = pyautogui.size()
+        return size[0], size[1]
+
+    def grab(self, region=None):
+        if region is None:
+            image = pyautogui.screenshot()
+        else:
+            image = pyautogui.screenshot(region=tuple(int(v) for v in region))
+        return np.asarray(image.convert("RGB"), dtype=np.uint8)
+
+    def close(self):
+        pass
+
+
+class FakeFrameCaptureBackend:
+    """
+    Teszt/benchmark backend: egy mappa PNG képkockáit játssza vissza (név szerinti
+    sorrendben), így a figyelő ciklusok képernyő nélkül is futtathatók és mérhetők.
+    Minden grab() a következő képkockát adja (a végén elölről kezdi, ha loop=True),
+    a régiót a teljes képkockából vágja ki.
+    """
+    name = "fake"
+
+    def __init__(self, frames_dir, loop=True, pattern="*.png"):
+        if Image is None:
+            raise RuntimeError("A 'Pillow' könyvtár szükséges a fake backendhez.")
+        frame_paths = sorted(glob.glob(os.path.join(frames_dir, pattern)))
+        if not frame_paths:
+            raise RuntimeError(f"Nem található képkocka a(z) '{frames_dir}' mappában ({pattern}).")
+        self.frame_paths = frame_paths
+        self.loop = loop
+        # A képkockákat egyszer dekódoljuk, hogy a benchmark a rögzítést mérje, ne a PNG dekódolást
+        self._frames = [np.asarray(Image.open(p).convert("RGB"), dtype=np.uint8) for p in frame_paths]
+        self._position = 0
+        self._lock = threading.Lock()
+
+    def screen_size(self):
+        height, width = self._frames[0].shape[:2]
+        return width, height
+
+    def _next_frame(self):
+        with self._lock:
+            frame = self._frames[self._position]
+            if self._position < len(self._frames) - 1:
+                self._position += 1
+            elif self.loop:
+                self._position = 0
+        return frame
+
+    def grab(self, region=None):
+        frame = self._next_frame()
+        if region is None:
+            return frame.copy()
+        left, top, width, height = (int(v) for v in region)
+        frame_height, frame_width = frame.shape[:2]
+        x0, y0 = max(0, left), max(0, top)
+        x1, y1 = min(frame_width, left + width), min(frame_height, top + height)
+        output = np.zeros((height, width, 3), dtype=np.uint8)
+        if x1 > x0 and y1 > y0:
+            output[y0 - top:y1 - top, x0 - left:x1 - left] = frame[y0:y1, x0:x1]
+        return output
+
+    def rewind(self):
+        with self._lock:
+            self._position = 0
+
+    def close(self):
+        pass
+
+
+BACKENDS = {
+    "mss": MssCaptureBackend,
+    "pyautogui": PyAutoGuiCaptureBackend,
+    "fake": FakeFrameCaptureBackend,
+}
+
+
+class ScreenCapture:
+    """
+    Egységes képernyő-rögzítő: grab(region) -> (magasság, szélesség, 3) uint8 RGB tömb.
+    A region formátuma megegyezik a pyautogui-éval: (left, top, width, height).
+
+    backend="auto" esetén az 'mss' backendet választja, ha elérhető, különben a
+    pyautogui-t. Ha az mss rögzítés futás közben hibát ad, egyszer átvált a pyautogui
+    fallbackre.
+    """
+
+    def __init__(self, backend="auto", **backend_kwargs):
+        self.backend = self._create_backend(backend, backend_kwargs)
+        self.grab_count = 0
+        self.total_grab_time_s = 0.0
+
+    @staticmethod
+    def _create_backend(backend_name, backend_kwargs):
+        if backend_name == "auto":
+            for candidate in ("mss", "pyautogui"):
+                try:
+                    return BACKENDS[candidate]()
+                except Exception as e:
+                    print(f"ScreenCapture INFO: '{candidate}' backend nem elérhető: {e}")
+            raise RuntimeError("Egyetlen képernyő-rögzítő backend sem érhető el.")
+        if backend_name not in BACKENDS:
+            raise ValueError(f"Ismeretlen képernyő-rögzítő backend: '{backend_name}'")
+        return BACKENDS[backend_name](**backend_kwargs)
+
+    @property
+    def backend_name(self):
+        return self.backend.name
+
+    def screen_size(self):
+        return self.backend.screen_size()
+
+    def grab(self, region=None):
+        start_time = time.perf_counter()
+        try:
+            frame = self.backend.grab(region)
+        except Exception as e:
+            if self.backend.name != "mss" or pyautogui is None:
+                raise
+            print(f"ScreenCapture FIGYELEM: mss rögzítés sikertelen ({e}), váltás pyautogui backendre.")
+            self.backend.close()
+            self.backend = PyAutoGuiCaptureBackend()
+            frame = self.backend.grab(region)
+        self.grab_count += 1
+        self.total_grab_time_s += time.perf_counter() - start_time
+        return frame
+
+    def grab_image(self, region=None):
+        """PIL képként adja vissza a rögzítést (pl. hibakeresési képek mentéséhez)."""
+        return Image.fromarray(self.grab(region))
+
+    def average_grab_time_ms(self):
+        if not self.grab_count:
+            return 0.0
+        return self.total_grab_time_s / self.grab_count * 1000.0
+
+    def close(self):
+        self.backend.close()
+
+
+_default_capture = None
+_default_capture_lock = threading.Lock()
+
+
+def get_default_screen_capture():
+    """Az alkalmazás szintű, megosztott ScreenCapture példány (lusta létrehozással)."""
+    global _default_capture
+    with _default_capture_lock:
+        if _default_capture is None:
+            _default_capture = ScreenCapture()
+        return _default_capture
+
+
+def set_default_screen_capture(capture):
+    global _default_capture
+    with _default_capture_lock:
+        _default_capture = capture
+
+
+def benchmark_capture(capture, region=None, iterations=200):
+    """Lefuttat 'iterations' darab grab() hívást, és visszaadja az átlagos időt (ms)."""
+    start_time = time.perf_counter()
+    for _ in range(iterations):
+        capture.grab(region)
+    elapsed_s = time.perf_counter() - start_time
+    return elapsed_s / max(1, iterations) * 1000.0
+
+
+if __name__ == '__main__':
+    import sys
+
+    # Használat: python -m utils.screen_capture [png_mappa] [iterációk]
+    frames_dir = sys.argv[1] if len(sys.argv) > 1 else None
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    if frames_dir:
+        bench_capture = ScreenCapture(backend="fake", frames_dir=frames_dir)
+    else:
+        bench_capture = ScreenCapture()
+    bench_width, bench_height = bench_capture.screen_size()
+    bench_region = (bench_width // 3, bench_height // 3, bench_width // 3, bench_height // 3)
+    for label, region in (("teljes képernyő", None), ("régió", bench_region)):
+        avg_ms = benchmark_capture(bench_capture, region, iterations)
+        print(f"[{bench_capture.backend_name}] {label}: {avg_ms:.3f} ms / grab ({iterations} iteráció)")
@@ -0,0 +1,156 @@
+# utils/screen_index.py
+import time
+
+import numpy as np
+
+from utils.mask_ops import color_mask, label_components
+from utils.screen_capture import get_default_screen_capture
+
+
+class ScreenIndex:
+    """
+    UI elem index egyetlen teljes képernyős képkockából.
+
+    Az elem index (elements) lustán, az első lekérdezéskor épül: a színeket csatornánként
+    2**quant_bits szintre kvantálja, és a leggyakoribb max_colors kvantált színre kiszámolja az
+    összefüggő komponenseket (befoglaló téglalap, terület, kitöltöttség, oldalarány, súlypont).
+    Ez egy teljes képkockán több száz ms, ezért csak elrendezés-változás utáni újrakereséshez való.
+    A pontos színekre (pl. egzakt fehér, gomb szín) a lokátorok gyorsítótárazott maszkot /
+    komponenseket kapnak (mask / components), amihez a teljes index nem épül fel.
+    """
+
+    def __init__(self, frame, origin=(0, 0), quant_bits=4, max_colors=16, min_component_area=20):
+        self.frame = frame
+        self.origin = origin
+        self.height, self.width = frame.shape[:2]
+        self.quant_bits = int(quant_bits)
+        self.max_colors = int(max_colors)
+        self.min_component_area = int(min_component_area)
+        self.created = time.time()
+        self._mask_cache = {}
+        self._component_cache = {}
+        self._elements = None
+        self.build_time_ms = None
+
+    @classmethod
+    def capture(cls, screen_capture=None, region=None, **kwargs):
+        """Új index a (megosztott) ScreenCapture friss képkockájából."""
+        screen_capture = screen_capture or get_default_screen_capture()
+        frame = screen_capture.grab(region)
+        origin = (region[0], region[1]) if region else (0, 0)
+        return cls(frame, origin=origin, **kwargs)
+
+    def age_s(self):
+        return time.time() - self.created
+
+    def _quantized_keys(self):
+        shift = 8 - self.quant_bits
+        rgb = self.frame[..., :3] >> shift
+        return (rgb[..., 0].astype(np.int32) << (2 * self.quant_bits)) | \
+               (rgb[..., 1].astype(np.int32) << self.quant_bits) | rgb[..., 2].astype(np.int32)
+
+    def _key_to_color(self, key):
+        """A kvantált szín középértéke (R, G, B)."""
+        levels = 1 << self.quant_bits
+        step = 1 << (8 - self.quant_bits)
+        channels = ((key >> (2 * self.quant_bits)) & (levels - 1), (key >> self.quant_bits) & (levels - 1), key & (levels - 1))
+        return tuple(int(c * step + step // 2) for c in channels)
+
+    @property
+    def elements(self):
+        """A kvantált színű elemek (az első hozzáféréskor épül fel)."""
+        if self._elements is None:
+            start_time = time.time()
+            self._elements = self._build()
+            self.build_time_ms = (time.time() - start_time) * 1000
+        return self._elements
+
+    def _build(self):
+        elements = []
+        keys = self._quantized_keys()
+        counts = np.bincount(keys.ravel(), minlength=1 << (3 * self.quant_bits))
+        dominant_keys = np.argsort(-counts)[:self.max_colors]
+        for key in dominant_keys:
+            if counts[key] < self.min_component_area:
+                break
+            for component in label_components(keys == key, min_area=self.min_component_area):
+                elements.append(self._describe(component, color=self._key_to_color(int(key)), color_key=int(key)))
+        elements.sort(key=lambda element: -element["area"])
+        return elements
+
+    def _describe(self, component, color=None, color_key=None, offset=(0, 0)):
+        left = component["left"] + offset[0]
+        top = component["top"] + offset[1]
+        width = component["right"] - component["left"] + 1
+        height = component["bottom"] - component["top"] + 1
+        return {
+            "x": left + self.origin[0], "y": top + self.origin[1], "width": width, "height": height,
+            "area": component["area"],
+            "fill_ratio": component["area"] / float(width * height),
+            "aspect": width / float(height),
+            "center_x": int(round(component["center_x"] + offset[0])) + self.origin[0],
+            "center_y": int(round(component["center_y"] + offset[1])) + self.origin[1],
+            "color": color, "color_key": color_key,
+        }
+
+    def _local_region(self, region):
+        """Képernyő koordinátás (left, top, width, height) régió a képkockán belüli szeletre vágva."""
+        if region is None:
+            return 0, 0, self.width, self.height
+        left = max(0, int(region[0]) - self.origin[0])
+        top = max(0, int(region[1]) - self.origin[1])
+        right = min(self.width, int(region[0]) - self.origin[0] + int(region[2]))
+        bottom = min(self.height, int(region[1]) - self.origin[1] + int(region[3]))
+        return left, top, max(0, right - left), max(0, bottom - top)
+
+    def crop(self, region):
+        """A képkocka egy régiója (nézet, nincs másolás)."""
+        left, top, width, height = self._local_region(region)
+        return self.frame[top:top + height, left:left + width]
+
+    def mask(self, color, tolerance=0):
+        """Teljes képkockás színmaszk (gyorsítótárazva)."""
+        key = (tuple(color[:3]), int(tolerance))
+        if key not in self._mask_cache:
+            self._mask_cache[key] = color_mask(self.frame, color, tolerance)
+        return self._mask_cache[key]
+
+    def components(self, color, tolerance=0, region=None, min_area=1):
+        """A színnel egyező összefüggő komponensek a régión belül (a régió határán vágva), terület szerint csökkenő sorrendben."""
+        local = self._local_region(region)
+        cache_key = (tuple(color[:3]), int(tolerance), local, int(min_area))
+        if cache_key not in self._component_cache:
+            left, top, width, height = local
+            region_mask = self.mask(color, tolerance)[top:top + height, left:left + width]
+            self._component_cache[cache_key] = [
+                self._describe(component, color=tuple(color[:3]), offset=(left, top))
+                for component in label_components(region_mask, min_area=min_area)
+            ] if region_mask.any() else []
+        return self._component_cache[cache_key]
+
+    def largest_component(self, color, tolerance=0, region=None, min_area=1):
+        found = self.components(color, tolerance, region, min_area)
+        return found[0] if found else None
+
+    def find_elements(self, color=None, tolerance=16, region=None, min_area=None, min_fill_ratio=0.0,
+                      aspect_range=None):
+        """Az előre kiszámolt (kvantált színű) elemek szűrése szín, régió, méret és alak szerint."""
+        results = []
+        min_area = self.min_component_area if min_area is None else min_area
+        for element in self.elements:
+            if element["area"] < min_area or element["fill_ratio"] < min_fill_ratio:
+                continue
+            if color is not None and max(abs(a - b) for a, b in zip(element["color"], color[:3])) > tolerance:
+                continue
+            if aspect_range and not (aspect_range[0] <= element["aspect"] <= aspect_range[1]):
+                continue
+            if region is not None and not (region[0] <= element["center_x"] < region[0] + region[2] and
+                                           region[1] <= element["center_y"] < region[1] + region[3]):
+                continue
+            results.append(element)
+        return results
+
+    def describe(self):
+        if self._elements is None:
+            return f"{self.width}x{self.height} képkocka, elem index még nem épült fel"
+        return f"{self.width}x{self.height} képkocka, {len(self._elements)} elem, felépítés {self.build_time_ms:.0f} ms"
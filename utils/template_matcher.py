@@ -0,0 +1,292 @@
+# utils/template_matcher.py
+import os
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+# A pyautogui.locateOnScreen pontos egyezéséhez közeli alapértelmezett küszöb
+DEFAULT_THRESHOLD = 0.9
+# DPI / nagyítás változások lefedése; az 1.0 mindig elsőként fut
+DEFAULT_SCALES = (1.0, 0.9, 1.1, 0.8, 1.25)
+
+
+def to_gray(image):
+    """RGB / RGBA / szürke tömb -> float32 szürkeárnyalat (ITU-R BT.601)."""
+    image = np.asarray(image)
+    if image.ndim == 2:
+        return image.astype(np.float32)
+    rgb = image[..., :3].astype(np.float32)
+    return rgb[..., 0] * 0.299 + rgb[..., 1] * 0.587 + rgb[..., 2] * 0.114
+
+
+def downsample2(array):
+    """2x2 blokk-átlagos felezés (a páratlan utolsó sor/oszlop elhagyásával)."""
+    height, width = array.shape[0] // 2 * 2, array.shape[1] // 2 * 2
+    cropped = array[:height, :width]
+    return (cropped[0::2, 0::2] + cropped[1::2, 0::2] + cropped[0::2, 1::2] + cropped[1::2, 1::2]) * 0.25
+
+
+def _fast_length(n):
+    """A legkisebb n-nél nem kisebb 2^a * 3^b * 5^c alakú szám (gyors FFT méret)."""
+    best = 1 << max(0, (n - 1).bit_length())
+    power5 = 1
+    while power5 < best:
+        power35 = power5
+        while power35 < best:
+            candidate = power35
+            while candidate < n:
+                candidate *= 2
+            best = min(best, candidate)
+            power35 *= 3
+        power5 *= 5
+    return best
+
+
+class _FftImage:
+    """Egy keresési kép (és négyzete) FFT-je, a több sablon / skála közti újrahasznosításhoz."""
+
+    def __init__(self, image, kernel_shape):
+        self.image = image
+        self.shape = (_fast_length(image.shape[0] + kernel_shape[0] - 1),
+                      _fast_length(image.shape[1] + kernel_shape[1] - 1))
+        self.spectrum = np.fft.rfft2(image, self.shape)
+        self._square_spectrum = None
+
+    def square_spectrum(self):
+        if self._square_spectrum is None:
+            self._square_spectrum = np.fft.rfft2(self.image * self.image, self.shape)
+        return self._square_spectrum
+
+    def fits(self, kernel_shape):
+        return (self.image.shape[0] + kernel_shape[0] - 1 <= self.shape[0] and
+                self.image.shape[1] + kernel_shape[1] - 1 <= self.shape[1])
+
+    def correlate(self, kernel, spectrum=None):
+        """'valid' kereszt-korreláció: out[y, x] = sum(kép[y+i, x+j] * kernel[i, j])."""
+        kernel_spectrum = np.fft.rfft2(kernel[::-1, ::-1], self.shape)
+        full = np.fft.irfft2((self.spectrum if spectrum is None else spectrum) * kernel_spectrum, self.shape)
+        height, width = kernel.shape
+        return full[height - 1:self.image.shape[0], width - 1:self.image.shape[1]]
+
+
+def _window_sums(image, height, width):
+    """Minden height x width ablak összege integrálképpel ('valid' méretben)."""
+    integral = np.zeros((image.shape[0] + 1, image.shape[1] + 1), dtype=np.float64)
+    np.cumsum(np.cumsum(image, axis=0), axis=1, out=integral[1:, 1:])
+    return (integral[height:, width:] - integral[:-height, width:]
+            - integral[height:, :-width] + integral[:-height, :-width])
+
+
+class _PreparedTemplate:
+    """Egy sablon egy skálán és pyramis szinten: nulla átlagú (maszkolt) szürke kép és normája."""
+
+    def __init__(self, gray, mask):
+        self.gray = gray
+        self.mask = mask
+        self.height, self.width = gray.shape
+        self.full_mask = bool(mask.all())
+        self.count = float(mask.sum())
+        mean = float((gray * mask).sum() / max(self.count, 1.0))
+        self.zero_mean = (gray - mean) * mask
+        self.norm = float(np.sqrt((self.zero_mean ** 2).sum()))
+
+
+class Template:
+    """
+    Előfeldolgozott sablon: skálánként és pyramis szintenként előre kiszámolt szürke tömbök.
+    Az átlátszó (alfa = 0) pixelek maszkolva vannak, így nem rontják a korrelációt.
+    """
+
+    def __init__(self, rgba, name=None, scales=DEFAULT_SCALES, max_levels=2, min_size=8, source_path=None):
+        self.name = name or "template"
+        self.source_path = source_path
+        rgba = np.asarray(rgba)
+        self.rgb = rgba[..., :3] if rgba.ndim == 3 else rgba
+        self.size = (rgba.shape[1], rgba.shape[0])
+        alpha = rgba[..., 3] if (rgba.ndim == 3 and rgba.shape[2] == 4) else None
+        self.scales = tuple(scales) if scales else (1.0,)
+        self.variants = {}
+        for scale in self.scales:
+            gray, mask = self._scaled(rgba, alpha, scale)
+            if min(gray.shape) < 3:
+                continue
+            levels = [_PreparedTemplate(gray, mask)]
+            while len(levels) <= max_levels and min(levels[-1].gray.shape) // 2 >= min_size:
+                levels.append(_PreparedTemplate(downsample2(levels[-1].gray), downsample2(levels[-1].mask) > 0.99))
+            self.variants[scale] = levels
+
+    @staticmethod
+    def _scaled(rgba, alpha, scale):
+        if abs(scale - 1.0) < 1e-6:
+            gray = to_gray(rgba)
+            mask = alpha > 0 if alpha is not None else np.ones(gray.shape, dtype=bool)
+            return gray.astype(np.float64), mask.astype(np.float64)
+        width = max(1, int(round(rgba.shape[1] * scale)))
+        height = max(1, int(round(rgba.shape[0] * scale)))
+        image = Image.fromarray(rgba).resize((width, height), Image.BILINEAR)
+        resized = np.asarray(image)
+        gray = to_gray(resized)
+        if alpha is not None:
+            mask = np.asarray(Image.fromarray(alpha).resize((width, height), Image.BILINEAR)) > 127
+        else:
+            mask = np.ones(gray.shape, dtype=bool)
+        return gray.astype(np.float64), mask.astype(np.float64)
+
+    @classmethod
+    def from_file(cls, path, name=None, **kwargs):
+        image = Image.open(path)
+        image = image.convert("RGBA" if ("A" in image.getbands() or "transparency" in image.info) else "RGB")
+        return cls(np.asarray(image), name=name or os.path.splitext(os.path.basename(path))[0],
+                   source_path=path, **kwargs)
+
+
+_template_cache = {}
+_template_cache_lock = threading.Lock()
+
+
+def load_template(path, **kwargs):
+    """Sablon betöltése gyorsítótárból (kulcs: abszolút út, módosítási idő, paraméterek)."""
+    abs_path = os.path.abspath(path)
+    key = (abs_path, os.path.getmtime(abs_path), tuple(sorted(kwargs.items())))
+    with _template_cache_lock:
+        template = _template_cache.get(key)
+        if template is None:
+            template = Template.from_file(abs_path, **kwargs)
+            _template_cache[key] = template
+        return template
+
+
+class TemplateMatch:
+    def __init__(self, left, top, width, height, score, scale):
+        self.left, self.top, self.width, self.height = int(left), int(top), int(width), int(height)
+        self.score = float(score)
+        self.scale = scale
+
+    @property
+    def center(self):
+        return self.left + self.width // 2, self.top + self.height // 2
+
+    def as_box(self):
+        return self.left, self.top, self.width, self.height
+
+    def __repr__(self):
+        return f"TemplateMatch(left={self.left}, top={self.top}, width={self.width}, height={self.height}, score={self.score:.3f}, scale={self.scale})"
+
+
+def _ncc_map(fft_image, prepared):
+    """Normalizált kereszt-korreláció térkép (-1..1) a teljes keresési képen."""
+    numerator = fft_image.correlate(prepared.zero_mean)
+    if prepared.full_mask:
+        window_sum = _window_sums(fft_image.image, prepared.height, prepared.width)
+        window_square_sum = _window_sums(fft_image.image * fft_image.image, prepared.height, prepared.width)
+    else:
+        window_sum = fft_image.correlate(prepared.mask)
+        window_square_sum = fft_image.correlate(prepared.mask, spectrum=fft_image.square_spectrum())
+    variance = window_square_sum - window_sum * window_sum / max(prepared.count, 1.0)
+    denominator = np.sqrt(np.maximum(variance, 0.0)) * prepared.norm
+    scores = np.zeros_like(numerator)
+    valid = denominator > 1e-6 * max(prepared.norm, 1.0)
+    scores[valid] = numerator[valid] / denominator[valid]
+    return scores
+
+
+def _top_peaks(scores, count, suppress_h, suppress_w):
+    """A count legnagyobb csúcs (y, x, érték) egyszerű nem-maximum elnyomással."""
+    scores = scores.copy()
+    peaks = []
+    for _ in range(count):
+        index = int(np.argmax(scores))
+        y, x = divmod(index, scores.shape[1])
+        value = scores[y, x]
+        if not np.isfinite(value) or value <= -1.0:
+            break
+        peaks.append((y, x, float(value)))
+        scores[max(0, y - suppress_h):y + suppress_h + 1, max(0, x - suppress_w):x + suppress_w + 1] = -np.inf
+    return peaks
+
+
+class TemplateMatcher:
+    """
+    Többskálás, durvától finomig (kép pyramis) normalizált kereszt-korrelációs sablonkereső.
+
+    A legdurvább pyramis szinten FFT-vel a teljes keresési képen számol, a legjobb jelölteket
+    (candidates) pedig teljes felbontáson, kis ablakban finomítja. Skálánként sorban halad
+    (1.0 elsőként), és early_accept feletti pontszámnál megáll. Az eredmény pontszáma 0..1 közötti
+    "konfidencia", összevethető a pyautogui locate confidence paraméterével.
+    """
+
+    def __init__(self, max_levels=2, candidates=5, coarse_margin=0.25, early_accept=0.97):
+        self.max_levels = int(max_levels)
+        self.candidates = int(candidates)
+        self.coarse_margin = float(coarse_margin)
+        self.early_accept = float(early_accept)
+        self.last_search_ms = None
+
+    def match(self, template, haystack, threshold=DEFAULT_THRESHOLD, origin=(0, 0), scales=None):
+        """
+        A sablon legjobb előfordulása a haystack (RGB vagy szürke tömb) képen, vagy None.
+        Az origin a haystack bal felső sarkának képernyő koordinátája (régiós rögzítésnél).
+        """
+        start_time = time.time()
+        haystack_gray = to_gray(haystack).astype(np.float64)
+        pyramid = [haystack_gray]
+        best = None
+        spectra = {}
+        for scale in (scales or template.scales):
+            levels = template.variants.get(scale)
+            if not levels:
+                continue
+            full = levels[0]
+            if full.height > haystack_gray.shape[0] or full.width > haystack_gray.shape[1]:
+                continue
+            level = min(len(levels) - 1, self.max_levels)
+            while len(pyramid) <= level:
+                pyramid.append(downsample2(pyramid[-1]))
+            coarse = levels[level]
+            while level > 0 and (coarse.height > pyramid[level].shape[0] or coarse.width > pyramid[level].shape[1]):
+                level -= 1
+                coarse = levels[level]
+            fft_image = spectra.get(level)
+            if fft_image is None or not fft_image.fits(coarse.gray.shape):
+                fft_image = _FftImage(pyramid[level], coarse.gray.shape)
+                spectra[level] = fft_image
+            coarse_scores = _ncc_map(fft_image, coarse)
+            factor = 1 << level
+            for y, x, coarse_score in _top_peaks(coarse_scores, self.candidates if level else 1,
+                                                 max(1, coarse.height // 2), max(1, coarse.width // 2)):
+                if coarse_score < threshold - self.coarse_margin * (1 if level else 0):
+                    break
+                if level == 0:
+                    candidate = (coarse_score, x, y)
+                else:
+                    candidate = self._refine(haystack_gray, full, x * factor, y * factor, factor + 1)
+                if candidate and (best is None or candidate[0] > best[0]):
+                    best = (candidate[0], candidate[1], candidate[2], full.width, full.height, scale)
+            if best and best[0] >= self.early_accept:
+                break
+        self.last_search_ms = (time.time() - start_time) * 1000
+        if best is None or best[0] < threshold:
+            return None
+        score, x, y, width, height, scale = best
+        return TemplateMatch(x + origin[0], y + origin[1], width, height, min(1.0, score), scale)
+
+    def _refine(self, haystack_gray, prepared, approx_x, approx_y, radius):
+        left = max(0, approx_x - radius)
+        top = max(0, approx_y - radius)
+        right = min(haystack_gray.shape[1], approx_x + radius + prepared.width)
+        bottom = min(haystack_gray.shape[0], approx_y + radius + prepared.height)
+        patch = haystack_gray[top:bottom, left:right]
+        if patch.shape[0] < prepared.height or patch.shape[1] < prepared.width:
+            return None
+        scores = _ncc_map(_FftImage(patch, prepared.gray.shape), prepared)
+        index = int(np.argmax(scores))
+        y, x = divmod(index, scores.shape[1])
+        return float(scores[y, x]), left + x, top + y
+
+    def locate_on_screen(self, template, screen_capture, region=None, threshold=DEFAULT_THRESHOLD, scales=None):
+        """A pyautogui.locateOnScreen helyettesítője: egy rögzítés + match(); képernyő koordinátákat ad."""
+        haystack = screen_capture.grab(region)
+        origin = (region[0], region[1]) if region else (0, 0)
+        return self.match(template, haystack, threshold=threshold, origin=origin, scales=scales)
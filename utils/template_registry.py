@@ -0,0 +1,139 @@
+# utils/template_registry.py
+import os
+import re
+import threading
+import time
+
+import numpy as np
+
+from utils.template_matcher import DEFAULT_SCALES, Template
+
+# A regisztrált sablonok álnév szerint: fájl a projekt gyökeréhez képest, a várható keresési terület
+# a képernyő arányában (left, top, width, height; None = nincs becslés), és hogy induláskor
+# dekódolódjon-e (preload). Csak ezek töltődnek be; a mappákban lévő képernyőképek nem sablonok.
+# A preload nélküli sablonok az első lekérdezéskor dekódolódnak (jelenleg nincs hívójuk).
+TEMPLATES = {
+    "download_icon": {"path": os.path.join("utils", "letoltes ikon.png"),
+                      "search_region": (0.15, 0.10, 0.70, 0.62), "preload": True},
+    "kh_button": {"path": os.path.join("automation_assets", "kh_gomb_sablon.png"),
+                  "search_region": (0.05, 0.70, 0.45, 0.25), "preload": True},
+    "generate_arrow": {"path": os.path.join("automation_assests", "generate_nyil_gomb.png"),
+                       "search_region": (0.45, 0.55, 0.50, 0.40), "preload": False},
+    "prompt_field_active": {"path": os.path.join("automation_assests", "prompt_mezo_aktiv.png"),
+                            "search_region": (0.10, 0.50, 0.80, 0.45), "preload": False},
+}
+
+
+def template_name_from_path(path):
+    """Fájlnévből képzett sablon név: kisbetűs, ékezet nélküli, aláhúzással tagolt (pl. 'letoltes_ikon')."""
+    stem = os.path.splitext(os.path.basename(path))[0].lower()
+    stem = stem.translate(str.maketrans("áéíóöőúüű", "aeiooouuu"))
+    return re.sub(r"[^a-z0-9]+", "_", stem).strip("_")
+
+
+def edge_map(gray):
+    """Gradiens nagyság (egyszerű központi differenciák) a szürke sablonból."""
+    gradient_y, gradient_x = np.gradient(gray.astype(np.float32))
+    return np.hypot(gradient_x, gradient_y)
+
+
+class TemplateEntry:
+    def __init__(self, name, path, template, search_region=None, alias=None):
+        self.name = name
+        self.alias = alias
+        self.path = path
+        self.template = template
+        self.search_region = search_region
+        base_gray = template.variants[1.0][0].gray if 1.0 in template.variants else None
+        self.gray = base_gray
+        self.edges = edge_map(base_gray) if base_gray is not None else None
+        self.pyramid = [level.gray for level in template.variants.get(1.0, [])]
+
+    def absolute_search_region(self, screen_width, screen_height):
+        """A metaadatban megadott arányos keresési terület képernyő pixelekben, vagy None."""
+        if not self.search_region:
+            return None
+        left, top, width, height = self.search_region
+        return (int(left * screen_width), int(top * screen_height),
+                max(1, int(width * screen_width)), max(1, int(height * screen_height)))
+
+
+class TemplateRegistry:
+    """
+    A projekt sablonképeinek nyilvántartása.
+
+    Induláskor (discover) felveszi a TEMPLATES sablonjait; a preload jelölésűeket egyszer dekódolja,
+    és előre kiszámolja a szürke / él tömböket és a TemplateMatcher skálánkénti pyramisait. A többi
+    az első lekérdezéskor dekódolódik. A futás közben csak név / álnév szerinti lekérdezés történik
+    (get / entry / search_region), fájlrendszer és PIL dekódolás nélkül.
+    """
+
+    def __init__(self, scales=DEFAULT_SCALES):
+        self.scales = scales
+        self._entries = {}
+        self._aliases = {}
+        self._pending = {} # Még nem dekódolt sablonok: név -> (út, keresési terület, álnév)
+        self._lock = threading.Lock()
+        self.load_time_ms = 0.0
+
+    @classmethod
+    def discover(cls, project_root, templates=TEMPLATES, **kwargs):
+        registry = cls(**kwargs)
+        start_time = time.time()
+        for alias, meta in templates.items():
+            template_path = os.path.join(project_root, meta["path"])
+            if os.path.isfile(template_path):
+                registry.register(template_path, search_region=meta.get("search_region"), alias=alias,
+                                  preload=meta.get("preload", True))
+            else:
+                print(f"TemplateRegistry: Sablon fájl nem található: {template_path}")
+        registry.load_time_ms = (time.time() - start_time) * 1000
+        print(f"TemplateRegistry: {len(registry._entries)} sablon betöltve ({registry.load_time_ms:.0f} ms): {', '.join(registry.names())}"
+              f"{'; igény szerint: ' + ', '.join(sorted(registry._pending)) if registry._pending else ''}")
+        return registry
+
+    def register(self, path, name=None, search_region=None, alias=None, preload=True):
+        name = name or template_name_from_path(path)
+        if not preload:
+            with self._lock:
+                self._pending[name] = (path, search_region, alias)
+                if alias:
+                    self._aliases[alias] = name
+            return None
+        try:
+            template = Template.from_file(path, name=name, scales=self.scales)
+        except Exception as e:
+            print(f"TemplateRegistry: Hiba a sablon betöltésekor ({path}): {e}")
+            return None
+        entry = TemplateEntry(name, path, template, search_region=search_region, alias=alias)
+        with self._lock:
+            self._entries[name] = entry
+            self._pending.pop(name, None)
+            if entry.alias:
+                self._aliases[entry.alias] = name
+        return entry
+
+    def names(self):
+        with self._lock:
+            return sorted(self._entries)
+
+    def entry(self, name):
+        """Sablon bejegyzés név vagy álnév alapján (None, ha nincs ilyen); a még nem dekódolt sablon itt töltődik be."""
+        with self._lock:
+            name = self._aliases.get(name, name)
+            entry = self._entries.get(name)
+            pending = self._pending.pop(name, None) if entry is None else None
+        if pending is not None:
+            path, search_region, alias = pending
+            entry = self.register(path, name=name, search_region=search_region, alias=alias)
+        return entry
+
+    def get(self, name):
+        """Az előfeldolgozott Template név vagy álnév alapján (None, ha nincs ilyen)."""
+        entry = self.entry(name)
+        return entry.template if entry else None
+
+    def search_region(self, name, screen_width, screen_height):
+        """A sablon várható keresési területe képernyő pixelekben (left, top, width, height), vagy None."""
+        entry = self.entry(name)
+        return entry.absolute_search_region(screen_width, screen_height) if entry else None
@@ -1,13 +1,23 @@
 # utils/ui_scanner.py
-import pyautogui
 import time
 
+import numpy as np
+
+try:
+    import pyautogui
+except ImportError:
+    pyautogui = None # A maszk alapú keresők (ScreenIndex) nélküle is működnek
+
+from utils.mask_ops import first_true, run_bounds
+from utils.screen_index import ScreenIndex
+
 # Színkonstansok
 PROMPT_AREA_WHITE_COLOR_TUPLE = (255, 255, 255) # Egzakt fehér
 # A PROMPT_AREA_MIN_BRIGHTNESS konstansra így már nincs szükség, ha csak egzakt fehéret keresünk.
 
 # FONTOS: Ellenőrizd ezt a színt a generálás gombon a pyautogui.mouseInfo() segítségével!
 GENERATE_BUTTON_COLOR_TARGET = (41, 25, 32) 
+GENERATE_BUTTON_COLOR_TOLERANCE = 12 # Csatornánkénti megengedett eltérés (színprofil eltolódás ellen)
 
 def get_screen_size_util():
     return pyautogui.size()
@@ -25,9 +35,23 @@ def is_color_prompt_area_like(color_tuple): # <<< MÓDOSÍTOTT FÜGGVÉNY
     if color_tuple is None: return False
     return color_tuple == PROMPT_AREA_WHITE_COLOR_TUPLE # Csak az egzakt fehéret fogadja el
 
-def find_prompt_area_dynamically(screen_width, screen_height, notify_callback=None):
+def find_prompt_area_dynamically(screen_width, screen_height, notify_callback=None, screen_index=None):
+    """
+    A prompt mező (egzakt fehér terület) dinamikus keresése egyetlen képernyőképen.
+    A mag pixel keresése és a határok növesztése logikai maszkon, vektorizáltan történik;
+    a keresési sorrend és az eredmény (prompt_rect dict) megegyezik a korábbi pixelenkénti kereséssel.
+    A screen_index (ScreenIndex) megadható, egyébként egy friss teljes képernyős index készül.
+    """
     if notify_callback is None:
-        notify_callback = lambda msg, error=False: print(f"UI_SCANNER: {msg}")
+        notify_callback = lambda msg, is_error=False: print(f"UI_SCANNER: {msg}")
+
+    scan_start_time = time.time()
+    if screen_index is None:
+        screen_index = ScreenIndex.capture()
+    if screen_index.height != screen_height or screen_index.width != screen_width:
+        notify_callback(f"Figyelmeztetés: a képernyőkép mérete ({screen_index.width}x{screen_index.height}) eltér a megadott képernyőmérettől ({screen_width}x{screen_height}).", is_error=True)
+        screen_height, screen_width = screen_index.height, screen_index.width
+    white_mask = screen_index.mask(PROMPT_AREA_WHITE_COLOR_TUPLE)
 
     seed_x = screen_width // 2
     seed_y = -1
@@ -37,74 +61,52 @@ def find_prompt_area_dynamically(screen_width, screen_height, notify_callback=No
     
     notify_callback(f"Prompt terület 'mag' pixelének keresése (cél szín: {PROMPT_AREA_WHITE_COLOR_TUPLE}) X={seed_x} oszlopban, Y tartomány: [{scan_start_y_for_seed} - {scan_end_y_for_seed}]")
 
-    # 1. Lefelé pásztázás a "mag" pixelért
-    for y_current in range(scan_start_y_for_seed, scan_end_y_for_seed, 20):
-        color = get_pixel_color_safe_util(seed_x, y_current, screen_width, screen_height)
-        if notify_callback and y_current % (20*2) == 0 : # Ritkított logolás
-            notify_callback(f"  Lefelé pásztázás Y={y_current}, talált szín: {color}")
-        if is_color_prompt_area_like(color): # Most már csak (255,255,255)-re lesz True
-            seed_y = y_current
-            notify_callback(f"Fehér 'mag' pixel (lefelé pásztázva) található itt: ({seed_x}, {seed_y})")
-            break
-        # time.sleep(0.005) # Kivéve a gyorsaság miatt
+    # 1. Lefelé pásztázás a "mag" pixelért (20 px-es lépésközzel, egy oszlopmaszk szeleten)
+    rows_down = np.arange(scan_start_y_for_seed, scan_end_y_for_seed, 20)
+    rows_down = rows_down[(rows_down >= 0) & (rows_down < screen_height)]
+    hit = first_true(white_mask[rows_down, seed_x])
+    if hit >= 0:
+        seed_y = int(rows_down[hit])
+        notify_callback(f"Fehér 'mag' pixel (lefelé pásztázva) található itt: ({seed_x}, {seed_y})")
 
     # 2. Ha lefelé nem találtuk, felfelé az aljától
     if seed_y == -1:
         notify_callback("Lefelé pásztázás sikertelen a középső X oszlopban. Felfelé pásztázás az aljától...", is_error=False)
-        scan_start_y_bottom_up = screen_height - 20 
         # A felső határ legyen a korábbi lefelé pásztázás kezdőpontja
-        scan_end_y_bottom_up_limit = scan_start_y_for_seed 
-        for y_current in range(scan_start_y_bottom_up, scan_end_y_bottom_up_limit, -20):
-            if y_current < 0 : break
-            color = get_pixel_color_safe_util(seed_x, y_current, screen_width, screen_height)
-            if notify_callback and y_current % (20*2) == 0 :
-                notify_callback(f"  Felfelé pásztázás Y={y_current}, talált szín: {color}")
-            if is_color_prompt_area_like(color):
-                seed_y = y_current
-                notify_callback(f"Fehér 'mag' pixel (felfelé pásztázva) található itt: ({seed_x}, {seed_y})")
-                break
-            # time.sleep(0.005)
+        rows_up = np.arange(screen_height - 20, scan_start_y_for_seed, -20)
+        rows_up = rows_up[rows_up >= 0]
+        hit = first_true(white_mask[rows_up, seed_x])
+        if hit >= 0:
+            seed_y = int(rows_up[hit])
+            notify_callback(f"Fehér 'mag' pixel (felfelé pásztázva) található itt: ({seed_x}, {seed_y})")
 
     # 3. Ha a középső X oszlopban nem találtunk magot, kiterjesztett keresés X irányban
     if seed_y == -1:
         notify_callback(f"Függőleges pásztázás X={seed_x}-ben sikertelen. Kiterjesztett keresés X irányban Y={int(screen_height * 0.73)} körül...", is_error=False)
-        # Egy valószínű Y magasságon (pl. 73%) próbálunk X irányban fehér pixelt keresni
+        # Egy valószínű Y magasságon (pl. 73%) próbálunk X irányban fehér pixelt keresni,
+        # a középtől kifelé haladva (x, x+10, x-10, x+20, ...) - X irányú keresés +/- 25% szélességben
         target_y_for_horizontal_seed_search = int(screen_height * 0.73)
-        found_seed_in_row = False
-        for x_offset in range(0, screen_width // 4, 10): # X irányú keresés +/- 25% szélességben
-            for sign in [0, 1, -1]:
-                if x_offset == 0 and sign != 0: continue
-                current_x = seed_x + x_offset * sign
-                if 0 <= current_x < screen_width:
-                    color = get_pixel_color_safe_util(current_x, target_y_for_horizontal_seed_search, screen_width, screen_height)
-                    if is_color_prompt_area_like(color):
-                        seed_x = current_x # Új X mag
-                        seed_y = target_y_for_horizontal_seed_search # Y mag
-                        notify_callback(f"Fehér 'mag' pixel (oldalsó pásztázással) található itt: ({seed_x}, {seed_y})")
-                        found_seed_in_row = True
-                        break
-            if found_seed_in_row: break
-        if not found_seed_in_row:
+        offsets = np.arange(10, screen_width // 4, 10)
+        candidate_xs = np.empty(1 + 2 * offsets.size, dtype=np.int64)
+        candidate_xs[0] = seed_x
+        candidate_xs[1::2] = seed_x + offsets
+        candidate_xs[2::2] = seed_x - offsets
+        candidate_xs = candidate_xs[(candidate_xs >= 0) & (candidate_xs < screen_width)]
+        hit = first_true(white_mask[target_y_for_horizontal_seed_search, candidate_xs])
+        if hit < 0:
             notify_callback("Nem található fehér 'mag' pixel a prompt terület azonosításához (kiterjesztett keresés sem).", is_error=True)
             return None
+        seed_x = int(candidate_xs[hit]) # Új X mag
+        seed_y = target_y_for_horizontal_seed_search # Y mag
+        notify_callback(f"Fehér 'mag' pixel (oldalsó pásztázással) található itt: ({seed_x}, {seed_y})")
     
     notify_callback(f"Fehér 'mag' pont véglegesítve: ({seed_x}, {seed_y}). Határok keresése...")
     
-    # Határok "kiterjesztése" a mag ponttól (pixelenként)
-    l_x = seed_x
-    while l_x > 0 and is_color_prompt_area_like(get_pixel_color_safe_util(l_x - 1, seed_y, screen_width, screen_height)):
-        l_x -= 1
-    r_x = seed_x
-    while r_x < screen_width - 1 and is_color_prompt_area_like(get_pixel_color_safe_util(r_x + 1, seed_y, screen_width, screen_height)):
-        r_x += 1
-    
+    # Határok "kiterjesztése" a mag ponttól: a sor, majd a középső oszlop összefüggő fehér szakasza
+    l_x, r_x = run_bounds(white_mask[seed_y, :], seed_x)
     horizontal_mid_x = (l_x + r_x) // 2
-    t_y = seed_y
-    while t_y > 0 and is_color_prompt_area_like(get_pixel_color_safe_util(horizontal_mid_x, t_y - 1, screen_width, screen_height)):
-        t_y -= 1
-    b_y = seed_y
-    while b_y < screen_height - 1 and is_color_prompt_area_like(get_pixel_color_safe_util(horizontal_mid_x, b_y + 1, screen_width, screen_height)):
-        b_y += 1
+    t_y, b_y = run_bounds(white_mask[:, horizontal_mid_x], seed_y)
+    notify_callback(f"Prompt terület keresés ideje: {(time.time() - scan_start_time) * 1000:.1f} ms")
 
     if r_x > l_x and b_y > t_y:
         width = r_x - l_x + 1
@@ -130,13 +132,19 @@ def find_prompt_area_dynamically(screen_width, screen_height, notify_callback=No
         notify_callback(f"Nem sikerült érvényes határokat találni a prompt területhez. L:{l_x} R:{r_x} T:{t_y} B:{b_y}", is_error=True)
         return None
 
-# ... (a find_generate_button_dynamic és a többi rész az ui_scanner.py-ban változatlan marad) ...
-def find_generate_button_dynamic(prompt_rect, screen_width, screen_height, notify_callback=None):
+def find_generate_button_dynamic(prompt_rect, screen_width, screen_height, notify_callback=None,
+                                 color_tolerance=GENERATE_BUTTON_COLOR_TOLERANCE, min_blob_area=4, screen_index=None):
+    """
+    A generálás gomb keresése a prompt terület jobb alsó részében (szélesség 25%, magasság 50%).
+    A ScreenIndex-ből színtávolság maszkot kér (csatornánként color_tolerance eltérés megengedett),
+    és a részterületen belüli legnagyobb összefüggő egyező folt súlypontját adja vissza.
+    A screen_index megadható (pl. a prompt terület kereséséből), egyébként a részterület friss rögzítéséből készül.
+    """
     if not prompt_rect:
         if notify_callback: notify_callback("Generálás gomb keresés: Nincs érvényes prompt terület.", is_error=True)
         return None
     if notify_callback is None:
-        notify_callback = lambda msg, error=False: print(f"UI_SCANNER: {msg}")
+        notify_callback = lambda msg, is_error=False: print(f"UI_SCANNER: {msg}")
 
     x_scan_start = prompt_rect['x'] + prompt_rect['width'] - 1
     x_scan_width_percentage = 0.25 
@@ -146,21 +154,31 @@ def find_generate_button_dynamic(prompt_rect, screen_width, screen_height, notif
     y_scan_height_percentage = 0.50 
     y_end_limit = prompt_rect['y'] + int(prompt_rect['height'] * (1 - y_scan_height_percentage))
 
-    notify_callback(f"Generálás gomb keresése ({GENERATE_BUTTON_COLOR_TARGET} színnel) X:[{x_scan_start}->{x_end_limit}], Y:[{y_scan_start}->{y_end_limit}] tartományban.")
-
-    pixel_scan_count = 0
-    for x_current in range(x_scan_start, max(prompt_rect['x']-1, x_end_limit -1), -1): 
-        for y_current in range(y_scan_start, max(prompt_rect['y']-1, y_end_limit -1), -1): 
-            pixel_scan_count +=1
-            if pixel_scan_count % 500 == 0: 
-                notify_callback(f"  Gen.gomb scan: ({x_current},{y_current})")
-
-            color = get_pixel_color_safe_util(x_current, y_current, screen_width, screen_height)
-            if color == GENERATE_BUTTON_COLOR_TARGET:
-                notify_callback(f"Generálás gomb színe ({GENERATE_BUTTON_COLOR_TARGET}) MEGTALÁLVA itt: ({x_current}, {y_current})")
-                click_x = max(0, x_current - 2)
-                click_y = max(0, y_current - 2)
-                return (click_x, click_y)
+    notify_callback(f"Generálás gomb keresése ({GENERATE_BUTTON_COLOR_TARGET} színnel, tolerancia: {color_tolerance}) X:[{x_scan_start}->{x_end_limit}], Y:[{y_scan_start}->{y_end_limit}] tartományban.")
+
+    left = max(0, prompt_rect['x'], x_end_limit)
+    top = max(0, prompt_rect['y'], y_end_limit)
+    right = min(screen_width - 1, x_scan_start)
+    bottom = min(screen_height - 1, y_scan_start)
+    if right < left or bottom < top:
+        notify_callback("Generálás gomb keresés: A keresési terület üres (a prompt terület a képernyőn kívül esik?).", is_error=True)
+        return None
+
+    scan_start_time = time.time()
+    search_region = (left, top, right - left + 1, bottom - top + 1)
+    if screen_index is None:
+        screen_index = ScreenIndex.capture(region=search_region, max_colors=0)
+    blobs = screen_index.components(GENERATE_BUTTON_COLOR_TARGET, tolerance=color_tolerance,
+                                    region=search_region, min_area=min_blob_area)
+    scan_ms = (time.time() - scan_start_time) * 1000
+
+    if blobs:
+        blob = blobs[0]
+        click_x, click_y = blob['center_x'], blob['center_y']
+        notify_callback(f"Generálás gomb színe ({GENERATE_BUTTON_COLOR_TARGET}) MEGTALÁLVA: legnagyobb folt {blob['area']} px "
+                        f"({len(blobs)} folt), súlypont: ({click_x}, {click_y}) [{scan_ms:.1f} ms]")
+        return (click_x, click_y)
     
-    notify_callback(f"Generálás gomb színe ({GENERATE_BUTTON_COLOR_TARGET}) nem található a relatív régióban ({pixel_scan_count} pixel ellenőrizve).", is_error=True)
+    notify_callback(f"Generálás gomb színe ({GENERATE_BUTTON_COLOR_TARGET}) nem található a relatív régióban "
+                    f"({search_region[2] * search_region[3]} pixel ellenőrizve, min. folt: {min_blob_area} px).", is_error=True)
     return None